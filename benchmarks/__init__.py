@@ -0,0 +1 @@
+# Micro-benchmarks for the harness's own Python code
@@ -0,0 +1,29 @@
+# __main__.py - python -m benchmarks [name prefix ...]
+import sys
+
+from benchmarks import harness
+from benchmarks import bench_compare, bench_datagen, bench_results, bench_report  # noqa: F401 (registers benchmarks)
+
+
+def main(prefixes):
+    """
+    Run the selected micro-benchmarks, save them as JSON and compare them with
+    the baseline. Returns 1 when a case regressed, so CI can fail on it.
+    """
+    benchmarks = harness.select(prefixes)
+    if not benchmarks:
+        print(f"No benchmarks match {prefixes}")
+        return 2
+    baseline = harness.load_baseline()
+    results = harness.run_benchmarks(benchmarks)
+    path = harness.save_results(results)
+    print(f"\nResults saved to {path}")
+    if baseline is None:
+        return 0
+    rows = harness.compare(results, baseline)
+    harness.print_comparison(rows, baseline)
+    return 1 if any(r["regressed"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
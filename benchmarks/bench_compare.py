@@ -0,0 +1,100 @@
+# bench_compare.py - result comparison: row hashing, fingerprints, semantic and static equivalence
+import os
+import datetime
+from decimal import Decimal
+
+from src.core.compare_utils import fingerprint_query, row_hash
+from src.core.offline_db import parse_test_queries
+from src.core.sql_canon import canonicalize, statically_equivalent
+from src.experiments.accuracy_experiment import is_semantically_equivalent
+from benchmarks.harness import REPO_ROOT, benchmark
+
+# Distinct rows materialized per case; larger results repeat them, so memory
+# stays flat up to 10M rows while every row still goes through the hash.
+BLOCK_ROWS = 10_000
+FETCH_BATCH = 1000
+
+
+def result_block(rows=BLOCK_ROWS):
+    """ORDERS-shaped rows with the value types fetched from Oracle (NUMBER, CHAR, DATE, NULL)."""
+    base = datetime.datetime(1996, 1, 1)
+    return [
+        (i, f"Cust#{i % 1500:<10}", Decimal(1500 + i % 100000) / 100, base + datetime.timedelta(days=i % 365),
+         float(i % 97) / 7, None if i % 11 == 0 else f"comment {i}")
+        for i in range(rows)
+    ]
+
+
+class ResultCursor:
+    """Cursor stand-in streaming `rows` rows from a block with fetchmany (the accuracy fetch loop)."""
+
+    def __init__(self, rows, block, reverse=False):
+        self.rows = rows
+        self.block = block[::-1] if reverse else block
+        self.arraysize = FETCH_BATCH
+        self._served = rows
+
+    def execute(self, sql, parameters=None):
+        self._served = 0
+
+    def fetchmany(self, size=None):
+        size = min(size or self.arraysize, self.rows - self._served)
+        if size <= 0:
+            return []
+        start = self._served % len(self.block)
+        batch = self.block[start:start + size]
+        if len(batch) < size:
+            batch = batch + self.block[:size - len(batch)]
+        self._served += size
+        return batch
+
+
+@benchmark("compare.row_hash")
+def bench_row_hash(size):
+    block = result_block(min(size, BLOCK_ROWS))
+
+    def run():
+        for start in range(0, size, len(block)):
+            for row in block[:size - start]:
+                row_hash(row)
+    return run
+
+
+@benchmark("compare.fingerprint_query")
+def bench_fingerprint_query(size):
+    cursor = ResultCursor(size, result_block(min(size, BLOCK_ROWS)))
+    return lambda: fingerprint_query(cursor, "SELECT * FROM ORDERS", batch_size=FETCH_BATCH)
+
+
+@benchmark("compare.semantic_equivalence")
+def bench_semantic_equivalence(size):
+    """Both sides fingerprinted (rows in opposite order) and compared, as for one accuracy query."""
+    block = result_block(min(size, BLOCK_ROWS))
+    ai_cursor, gt_cursor = ResultCursor(size, block, reverse=True), ResultCursor(size, block)
+    sql = "SELECT * FROM ORDERS"
+
+    def run():
+        ai_fp = fingerprint_query(ai_cursor, sql, batch_size=FETCH_BATCH)
+        gt_fp = fingerprint_query(gt_cursor, sql, batch_size=FETCH_BATCH)
+        assert is_semantically_equivalent(ai_fp, gt_fp, sql, sql)
+    return run
+
+
+def _query_pairs():
+    queries = parse_test_queries(os.path.join(REPO_ROOT, "TPCH_22_QUERIES.txt"))
+    pairs = []
+    for _, _, gt_sql, _ in queries:
+        pairs += [(gt_sql, gt_sql), (f"SELECT * FROM ({gt_sql})", gt_sql), (f"SELECT COUNT(*) FROM ({gt_sql})", gt_sql)]
+    return pairs
+
+
+@benchmark("canon.statically_equivalent", sizes=(66,), unit="pairs")
+def bench_statically_equivalent(size):
+    """Cold canonicalization of the TPC-H ground truths against equal, rewritten and wrong variants."""
+    pairs = _query_pairs()[:size]
+
+    def run():
+        canonicalize.cache_clear()
+        for ai_sql, gt_sql in pairs:
+            statically_equivalent(ai_sql, gt_sql)
+    return run
@@ -0,0 +1,49 @@
+# bench_datagen.py - data_setup generation throughput, without a database
+from collections import deque
+
+import data_setup
+from src.core import config
+from src.core.offline_db import BASE_DATE
+from benchmarks.harness import Skip, benchmark
+
+# Tables with the most rows per scale factor dominate load time
+TABLES = ("LINEITEM", "ORDERS", "PARTSUPP")
+
+
+def _keys(table, size):
+    first_key = data_setup.TABLES[table][3]
+    return range(first_key, first_key + size)
+
+
+def _consume(iterable):
+    deque(iterable, maxlen=0)
+
+
+def _register(table):
+    generate, chunk = data_setup.TABLES[table][2], data_setup.TABLES[table][5]
+
+    @benchmark(f"datagen.rows.{table}")
+    def bench_rows(size):
+        """Row tuples as insert_data produces them, in bulk_insert's executemany chunks."""
+        keys = _keys(table, size)
+        return lambda: _consume(data_setup.iter_chunks(generate(keys, BASE_DATE), chunk))
+
+    @benchmark(f"datagen.columns.{table}")
+    def bench_columns(size):
+        """NumPy column batches of SETUP_BATCH_ROWS keys (SETUP_GENERATOR=numpy)."""
+        keys = _keys(table, size)
+        return lambda: _consume(data_setup.column_batches(table, keys, BASE_DATE, config.SETUP_BATCH_ROWS))
+
+    @benchmark(f"datagen.frames.{table}")
+    def bench_frames(size):
+        """Column batches converted to pyarrow Tables for ingestion."""
+        if data_setup.pa is None:
+            raise Skip("pyarrow not installed")
+        keys = _keys(table, size)
+        names = [c.strip() for c in data_setup.TABLES[table][0].split(",")]
+        return lambda: _consume(data_setup.to_frame(names, columns)
+                                for columns in data_setup.column_batches(table, keys, BASE_DATE, config.SETUP_BATCH_ROWS))
+
+
+for _table in TABLES:
+    _register(_table)
@@ -0,0 +1,47 @@
+# bench_report.py - main.py report and chart generation
+import os
+
+import pandas as pd
+
+from benchmarks.harness import Skip, benchmark, scratch_dir
+from benchmarks.bench_results import accuracy_rows, latency_rows
+
+# The 22 TPC-H questions, then sweep-sized result sets
+REPORT_SIZES = (22, 1_000, 10_000, 100_000)
+
+
+def _plotting():
+    try:
+        import seaborn  # noqa: F401
+        import matplotlib  # noqa: F401
+    except ImportError as e:  # generate_visualizations needs both
+        raise Skip(f"plotting libraries not installed: {e}")
+
+
+def _frames(size):
+    return pd.DataFrame(accuracy_rows(size)), pd.DataFrame(latency_rows(size))
+
+
+@benchmark("report.summary", sizes=REPORT_SIZES, unit="queries")
+def bench_summary_report(size):
+    import main
+    acc_df, lat_df = _frames(size)
+    return lambda: main.generate_summary_report(acc_df, lat_df)
+
+
+@benchmark("report.visualizations", sizes=REPORT_SIZES[:3], unit="queries")
+def bench_visualizations(size):
+    """generate_visualizations including the 300 dpi PNG, written to a scratch directory."""
+    import main
+    _plotting()
+    acc_df, lat_df = _frames(size)
+    directory = scratch_dir()
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            main.generate_visualizations(acc_df, lat_df)
+        finally:
+            os.chdir(cwd)
+    return run
@@ -0,0 +1,78 @@
+# bench_results.py - experiment result rows, DataFrames, CSV writes and run summaries
+import os
+
+import pandas as pd
+
+from src.core.compare_utils import ResultFingerprint
+from src.core.rate_limit import GenerateCall
+from src.core.run_history import summarize_run
+from src.experiments.accuracy_experiment import build_accuracy_row
+from src.experiments.latency_experiment import build_latency_row
+from benchmarks.harness import benchmark, scratch_dir
+
+# One row per evaluated query: sweeps and repeated benchmark rounds reach 100K
+RESULT_SIZES = (1_000, 10_000, 100_000)
+
+GT_SQL = "SELECT N_NAME, COUNT(*) FROM CUSTOMER JOIN NATION ON C_NATIONKEY = N_NATIONKEY GROUP BY N_NAME"
+AI_SQL = "SELECT N_NAME, COUNT(*) FROM NATION, CUSTOMER WHERE N_NATIONKEY = C_NATIONKEY GROUP BY N_NAME"
+COMPLEXITIES = ("simple", "medium", "complex")
+
+
+def _stream_stats(i):
+    ttlr = 20.0 + i % 50
+    return {'ttfr_ms': ttlr / 2, 'ttlr_ms': ttlr, 'rows': i % 1000, 'rows_per_sec': (i % 1000) / ttlr * 1000,
+            'bytes': (i % 1000) * 120}
+
+
+def accuracy_rows(size):
+    """`size` accuracy result rows built by build_accuracy_row, mixing matches and mismatches."""
+    rows = []
+    for i in range(size):
+        gt_fp = ResultFingerprint(i % 25, i)
+        ai_fp = ResultFingerprint(i % 25, i if i % 5 else i + 1)
+        rows.append(build_accuracy_row(i, f"Question {i}?", GT_SQL, COMPLEXITIES[i % 3], AI_SQL, True,
+                                       ai_fp, gt_fp, 0.8 + i % 7 / 10, generate_call=GenerateCall()))
+    return rows
+
+
+def latency_rows(size):
+    """`size` latency result rows built by build_latency_row."""
+    return [
+        build_latency_row(i, f"Question {i}?", GT_SQL, AI_SQL, 800.0 + i % 400, _stream_stats(i), _stream_stats(i + 1))
+        for i in range(size)
+    ]
+
+
+@benchmark("results.build_accuracy_rows", sizes=RESULT_SIZES)
+def bench_build_accuracy_rows(size):
+    return lambda: accuracy_rows(size)
+
+
+@benchmark("results.build_latency_rows", sizes=RESULT_SIZES)
+def bench_build_latency_rows(size):
+    return lambda: latency_rows(size)
+
+
+def _register_frames(kind, make_rows):
+    @benchmark(f"results.{kind}_frame", sizes=RESULT_SIZES)
+    def bench_frame(size):
+        """pd.DataFrame(results), as save_*_results starts."""
+        rows = make_rows(size)
+        return lambda: pd.DataFrame(rows)
+
+    @benchmark(f"results.{kind}_csv", sizes=RESULT_SIZES)
+    def bench_csv(size):
+        """The results CSV write of save_*_results."""
+        df = pd.DataFrame(make_rows(size))
+        path = os.path.join(scratch_dir(), f"{kind}_results.csv")
+        return lambda: df.to_csv(path, index=False)
+
+    @benchmark(f"results.{kind}_summary", sizes=RESULT_SIZES)
+    def bench_summary(size):
+        """run_history.summarize_run: match rates and latency percentiles stored per run."""
+        df = pd.DataFrame(make_rows(size))
+        return lambda: summarize_run(df)
+
+
+_register_frames("accuracy", accuracy_rows)
+_register_frames("latency", latency_rows)
@@ -0,0 +1,209 @@
+# harness.py
+import gc
+import os
+import glob
+import json
+import time
+import platform
+import statistics
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime, timezone
+
+from src.core import config
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Synthetic result-set sizes; cases above MICROBENCH_MAX_ROWS are not run
+ROW_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+MIN_REPEATS = 3
+MAX_REPEATS = 100
+
+
+class Skip(Exception):
+    """Raised by a benchmark's setup when it cannot run here (e.g. an optional dependency is missing)."""
+
+
+class Benchmark:
+    def __init__(self, name, setup, sizes, unit):
+        self.name = name
+        self.setup = setup
+        self.sizes = sizes
+        self.unit = unit
+
+
+_registry = []
+_scratch = None
+
+
+def benchmark(name, sizes=ROW_SIZES, unit="rows"):
+    """
+    Register `setup(size)` as benchmark `name`, run once per entry of `sizes`.
+
+    setup builds the inputs for one size outside the timed region and returns
+    the zero-argument callable to time. Throughput is reported as `unit`/s.
+    """
+    def register(setup):
+        _registry.append(Benchmark(name, setup, sizes, unit))
+        return setup
+    return register
+
+
+def scratch_dir():
+    """Directory for benchmarks that write files, shared by the run and removed at exit."""
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.TemporaryDirectory(prefix="microbench-")
+    return _scratch.name
+
+
+def select(prefixes=None):
+    """Registered benchmarks whose name starts with one of `prefixes` (all when empty)."""
+    return [b for b in _registry if not prefixes or any(b.name.startswith(p) for p in prefixes)]
+
+
+def measure(run, min_time):
+    """
+    Seconds per call of `run`: one untimed warm-up call, then at least
+    MIN_REPEATS and up to MAX_REPEATS timed calls filling `min_time`. The
+    collector runs between calls and is disabled during them.
+    """
+    run()
+    times = []
+    started = time.perf_counter()
+    while len(times) < MIN_REPEATS or (time.perf_counter() - started < min_time and len(times) < MAX_REPEATS):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return times
+
+
+def run_benchmarks(benchmarks, max_rows=None, min_time=None):
+    """Run every size of `benchmarks` up to `max_rows`; returns one result dict per case."""
+    max_rows = config.MICROBENCH_MAX_ROWS if max_rows is None else max_rows
+    min_time = config.MICROBENCH_MIN_TIME if min_time is None else min_time
+    results = []
+    for bench in benchmarks:
+        for size in bench.sizes:
+            if size > max_rows:
+                continue
+            case = {"name": bench.name, "size": size, "unit": bench.unit}
+            try:
+                run = bench.setup(size)
+            except Skip as e:
+                print(f"{bench.name:40s} {size:>10,}  skipped: {e}")
+                results.append({**case, "skipped": str(e)})
+                continue
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                times = measure(run, min_time)
+            del run
+            median = statistics.median(times)
+            case.update({
+                "repeats": len(times),
+                "min_s": min(times),
+                "median_s": median,
+                "mean_s": statistics.fmean(times),
+                "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "per_second": size / median if median > 0 else None,
+            })
+            results.append(case)
+            print(f"{bench.name:40s} {size:>10,}  median {median * 1000:10.3f} ms  "
+                  f"{case['per_second'] or 0:14,.0f} {bench.unit}/s  (n={len(times)})")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5, cwd=REPO_ROOT).stdout.strip()
+    except Exception:
+        return ""
+
+
+def environment():
+    """Machine and library versions stored with every results file."""
+    import numpy
+    import pandas
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "max_rows": config.MICROBENCH_MAX_ROWS,
+        "min_time": config.MICROBENCH_MIN_TIME,
+    }
+
+
+def save_results(results, directory=None):
+    """Write `results` with environment() to a new JSON file in `directory`; returns its path."""
+    directory = directory or config.MICROBENCH_DIR
+    os.makedirs(directory, exist_ok=True)
+    meta = environment()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(directory, f"{stamp}-{meta['git_commit'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    return path
+
+
+def load_baseline(path=None, directory=None):
+    """The baseline results file (MICROBENCH_BASELINE, else the newest in `directory`), or None."""
+    path = path or config.MICROBENCH_BASELINE
+    if not path:
+        files = sorted(glob.glob(os.path.join(directory or config.MICROBENCH_DIR, "*.json")))
+        if not files:
+            return None
+        path = files[-1]
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    baseline["path"] = path
+    return baseline
+
+
+def compare(results, baseline, tolerance=None):
+    """
+    Compare medians with `baseline` case by case.
+
+    Returns rows (name, size, baseline and current median, change) for the
+    cases present in both; 'regressed' marks a median more than `tolerance`
+    (default MICROBENCH_TOLERANCE) above the baseline.
+    """
+    tolerance = config.MICROBENCH_TOLERANCE if tolerance is None else tolerance
+    previous = {(r["name"], r["size"]): r for r in baseline["results"] if "median_s" in r}
+    rows = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if before is None or "median_s" not in result:
+            continue
+        change = result["median_s"] / before["median_s"] - 1 if before["median_s"] > 0 else 0.0
+        rows.append({
+            "name": result["name"],
+            "size": result["size"],
+            "baseline_s": before["median_s"],
+            "median_s": result["median_s"],
+            "change": change,
+            "regressed": change > tolerance,
+        })
+    return rows
+
+
+def print_comparison(rows, baseline):
+    print(f"\nAgainst {baseline['path']} (commit {baseline['meta'].get('git_commit') or '?'}):")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"  {row['name']:40s} {row['size']:>10,}  {row['baseline_s'] * 1000:10.3f} -> "
+              f"{row['median_s'] * 1000:10.3f} ms  {row['change']:+7.1%}{flag}")
+    regressed = sum(r["regressed"] for r in rows)
+    print(f"{regressed} of {len(rows)} cases regressed by more than {config.MICROBENCH_TOLERANCE:.0%}")
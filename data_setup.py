@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
-import sys, os, random, string
+import sys, os, time, random, string, queue, threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
 from datetime import datetime, timedelta
-sys.path.insert(0, '/Users/sanjaymishra/oracle26ai-eval')
+import numpy as np
+try:
+    import pyarrow as pa
+except ImportError:  # optional: columns fall back to executemany row tuples
+    pa = None
+from src.core import config
 from src.core.db_utils import get_connection
+from src.core.physical_design import apply_profile
 
 r = random.Random(42)
 rc = lambda: ''.join(r.choices(string.ascii_letters + string.digits, k=15))
@@ -16,21 +24,81 @@ CREATE TABLE IF NOT EXISTS PARTSUPP (PS_PARTKEY NUMBER(38,0), PS_SUPPKEY NUMBER(
 CREATE TABLE IF NOT EXISTS CUSTOMER (C_CUSTKEY NUMBER(38,0) NOT NULL PRIMARY KEY, C_NAME VARCHAR2(25), C_ADDRESS VARCHAR2(40), C_NATIONKEY NUMBER(38,0), C_PHONE CHAR(15), C_ACCTBAL NUMBER(15,2), C_MKTSEGMENT CHAR(10), C_COMMENT VARCHAR2(117));
 CREATE TABLE IF NOT EXISTS ORDERS (O_ORDERKEY NUMBER(38,0) NOT NULL PRIMARY KEY, O_CUSTKEY NUMBER(38,0), O_ORDERSTATUS CHAR(1), O_TOTALPRICE NUMBER(15,2), O_ORDERDATE DATE, O_ORDERPRIORITY CHAR(15), O_CLERK CHAR(15), O_SHIPPRIORITY NUMBER(38,0), O_COMMENT VARCHAR2(79));
 CREATE TABLE IF NOT EXISTS LINEITEM (L_ORDERKEY NUMBER(38,0), L_PARTKEY NUMBER(38,0), L_SUPPKEY NUMBER(38,0), L_LINENUMBER NUMBER(38,0), L_QUANTITY NUMBER(15,2), L_EXTENDEDPRICE NUMBER(15,2), L_DISCOUNT NUMBER(15,2), L_TAX NUMBER(15,2), L_RETURNFLAG CHAR(1), L_LINESTATUS CHAR(1), L_SHIPDATE DATE, L_COMMITDATE DATE, L_RECEIPTDATE DATE, L_SHIPMODE CHAR(10), L_SHIPINSTRUCT CHAR(25), L_COMMENT VARCHAR2(44));
+CREATE TABLE IF NOT EXISTS LOAD_CHECKPOINT (TABLE_NAME VARCHAR2(30) NOT NULL, CHUNK_START NUMBER(38,0) NOT NULL, CHUNK_STOP NUMBER(38,0) NOT NULL, ROW_COUNT NUMBER(38,0), SCALE_FACTOR NUMBER, UNIT_ROWS NUMBER(38,0), BASE_DATE DATE, LOADED_AT TIMESTAMP DEFAULT SYSTIMESTAMP, PRIMARY KEY (TABLE_NAME, CHUNK_START));
 CREATE TABLE IF NOT EXISTS NL_SQL_TEST_QUERIES (query_id NUMBER(38,0) PRIMARY KEY, nl_question VARCHAR2(500), ground_truth_sql VARCHAR2(2000), complexity CHAR(10), category VARCHAR2(50));
 """
 
-def bulk_insert(cursor, table, cols, sql, data, chunk=1000, nolog=True):
- 
+def iter_chunks(rows, size):
+    """Yield lists of up to `size` rows from any iterable."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def prefetch_chunks(chunks, depth):
+    """
+    Produce chunks on a background thread, at most `depth` ahead of the consumer.
+
+    Row generation then overlaps with executemany round trips while memory
+    stays bounded by `depth` chunks. Producer errors are re-raised here.
+    """
+    done = object()
+    buffer = queue.Queue(maxsize=depth)
+    failure = []
+
+    def produce():
+        try:
+            for chunk in chunks:
+                buffer.put(chunk)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            buffer.put(done)
+
+    threading.Thread(target=produce, name="data-producer", daemon=True).start()
+    while True:
+        chunk = buffer.get()
+        if chunk is done:
+            break
+        yield chunk
+    if failure:
+        raise failure[0]
+
+def bulk_insert(cursor, table, cols, sql, data, chunk=1000, nolog=True, prefetch=None,
+                hint="", label=None):
+    """
+    Insert rows from `data` (a list or any iterable, e.g. a generator) in chunks of `chunk`.
+
+    Rows are pulled lazily, so peak memory is a few chunks regardless of table
+    size. With `prefetch` > 0 (default SETUP_PREFETCH_CHUNKS) the next chunks
+    are generated on a producer thread while the current one is inserted.
+    `label` replaces the table name in progress lines.
+
+    Inserts are conventional unless `hint` says otherwise: APPEND is ignored
+    by INSERT ... VALUES, and APPEND_VALUES (direct path) fails with ORA-12838
+    on the next chunk of the same transaction and locks the table exclusively
+    until commit, serializing parallel loaders. SETUP_INGEST=direct_path is
+    the direct-path option.
+    """
+    label = label or table
+    prefetch = config.SETUP_PREFETCH_CHUNKS if prefetch is None else prefetch
     if nolog:
         cursor.execute(f"ALTER TABLE {table} NOLOGGING")
-    for i in range(0, len(data), chunk):
-        chunk_data = data[i:i+chunk]
-        cursor.executemany(f"INSERT /*+ APPEND PARALLEL(8) */ INTO {table} ({cols}) VALUES ({sql})", chunk_data)
-        if i % 100000 == 0 and i > 0:
-            print(f"    {table}: {i:,} rows")
+    chunks = iter_chunks(data, chunk)
+    if prefetch > 0:
+        chunks = prefetch_chunks(chunks, prefetch)
+    total = 0
+    for chunk_data in chunks:
+        cursor.executemany(f"INSERT {hint + ' ' if hint else ''}INTO {table} ({cols}) VALUES ({sql})", chunk_data)
+        if (total + len(chunk_data)) // 100000 > total // 100000:
+            print(f"    {label}: {total + len(chunk_data):,} rows")
+        total += len(chunk_data)
     if nolog:
         cursor.execute(f"ALTER TABLE {table} LOGGING")
-    print(f"  [OK] {table}: {len(data):,} rows")
+    print(f"  [OK] {label}: {total:,} rows")
+    return total
 
 def create_tables(cursor):
     for stmt in CREATE_TABLES_SQL.split(';'):
@@ -40,57 +108,332 @@ def create_tables(cursor):
                 cursor.execute(stmt)
             except:
                 pass
+    try:
+        # LOAD_CHECKPOINT created before UNIT_ROWS was recorded
+        cursor.execute("ALTER TABLE LOAD_CHECKPOINT ADD (UNIT_ROWS NUMBER(38,0))")
+    except:
+        pass
 
 def truncate_tables(cursor):
-    for tbl in ['LINEITEM', 'ORDERS', 'CUSTOMER', 'PARTSUPP', 'PART', 'SUPPLIER', 'NATION', 'REGION']:
+    for tbl in ['LINEITEM', 'ORDERS', 'CUSTOMER', 'PARTSUPP', 'PART', 'SUPPLIER', 'NATION', 'REGION', 'LOAD_CHECKPOINT']:
         try:
             cursor.execute(f"TRUNCATE TABLE {tbl}")
         except:
             pass
 
-def insert_data(cursor):
-
-    base_date = datetime.now() - timedelta(days=365)
-    
-    # REGION (5)
-    bulk_insert(cursor, "REGION", "R_REGIONKEY, R_NAME, R_COMMENT",
-                ":1, :2, :3", [(i, f'Region#{i}', rc()) for i in range(5)])
-    
-    # NATION (25)
-    nations = [(i, f'Nation#{i}', i % 5, rc()) for i in range(25)]
-    bulk_insert(cursor, "NATION", "N_NATIONKEY, N_NAME, N_REGIONKEY, N_COMMENT",
-                ":1, :2, :3, :4", nations)
-    
-    # SUPPLIER (10K)
-    sup = [(i, f'Sup#{i}', f'Addr{i}', i%25, f'Ph{i}', 5000+i, rc()) for i in range(1, 10001)]
-    bulk_insert(cursor, "SUPPLIER", "S_SUPPKEY, S_NAME, S_ADDRESS, S_NATIONKEY, S_PHONE, S_ACCTBAL, S_COMMENT",
-                ":1, :2, :3, :4, :5, :6, :7", sup)
-    
-    # PART (20K)
-    part = [(i, f'Part#{i}', 'Mfg1', 'B1', 'Type1', 10, 'Bag', 900+(i%500), rc()) for i in range(1, 20001)]
-    bulk_insert(cursor, "PART", "P_PARTKEY, P_NAME, P_MFGR, P_BRAND, P_TYPE, P_SIZE, P_CONTAINER, P_RETAILPRICE, P_COMMENT",
-                ":1, :2, :3, :4, :5, :6, :7, :8, :9", part)
-    
-    # PARTSUPP (80K)
-    ps = [(i, (i%10000)+1, 100+(i%8000), 50+(i%100), rc()) for i in range(1, 80001)]
-    bulk_insert(cursor, "PARTSUPP", "PS_PARTKEY, PS_SUPPKEY, PS_AVAILQTY, PS_SUPPLYCOST, PS_COMMENT",
-                ":1, :2, :3, :4, :5", ps)
-    
-    # CUSTOMER (150K)
-    cust = [(i, f'Cust#{i}', f'Addr{i}', i%25, f'Ph{i}', 1000+(i%100000), 'Seg', rc()) for i in range(1, 150001)]
-    bulk_insert(cursor, "CUSTOMER", "C_CUSTKEY, C_NAME, C_ADDRESS, C_NATIONKEY, C_PHONE, C_ACCTBAL, C_MKTSEGMENT, C_COMMENT",
-                ":1, :2, :3, :4, :5, :6, :7, :8", cust)
-    
-    # ORDERS (700K)
-    ord = [(i, (i%150000)+1, 'O', 1500+(i%100000), base_date+timedelta(days=i%365), 'P1', 'C1', 0, rc()) for i in range(1, 700001)]
-    bulk_insert(cursor, "ORDERS", "O_ORDERKEY, O_CUSTKEY, O_ORDERSTATUS, O_TOTALPRICE, O_ORDERDATE, O_ORDERPRIORITY, O_CLERK, O_SHIPPRIORITY, O_COMMENT",
-                ":1, :2, :3, :4, :5, :6, :7, :8, :9", ord)
-    
-    # LINEITEM (4M)
-    li = [(i, ((i-1)//6)+1, base_date+timedelta(days=i%365), (i%20000)+1, (i%10000)+1, 10.0, 200+(i%100000), 0.05, 0.02, 'N', 'O',
-           base_date+timedelta(days=(i%365)+30), base_date+timedelta(days=(i%365)+45), 'Truck', 'Deliver', rc()) for i in range(1, 4000001)]
-    bulk_insert(cursor, "LINEITEM", "L_ORDERKEY, L_LINENUMBER, L_SHIPDATE, L_PARTKEY, L_SUPPKEY, L_QUANTITY, L_EXTENDEDPRICE, L_DISCOUNT, L_TAX, L_RETURNFLAG, L_LINESTATUS, L_COMMITDATE, L_RECEIPTDATE, L_SHIPMODE, L_SHIPINSTRUCT, L_COMMENT",
-                ":1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13, :14, :15, :16", li, chunk=5000)
+# Row generators: each yields one tuple per key in `keys`, so nothing is
+# materialized beyond the chunk bulk_insert is currently filling. Foreign keys
+# wrap at the referenced table's row count for the configured scale factor, so
+# the rows of SCALED_FK_TABLES depend on it (see check_resumable).
+
+def gen_region(keys, base_date):
+    for i in keys:
+        yield (i, f'Region#{i}', rc())
+
+def gen_nation(keys, base_date):
+    for i in keys:
+        yield (i, f'Nation#{i}', i % 5, rc())
+
+def gen_supplier(keys, base_date):
+    for i in keys:
+        yield (i, f'Sup#{i}', f'Addr{i}', i%25, f'Ph{i}', 5000+i, rc())
+
+def gen_part(keys, base_date):
+    for i in keys:
+        yield (i, f'Part#{i}', 'Mfg1', 'B1', 'Type1', 10, 'Bag', 900+(i%500), rc())
+
+def gen_partsupp(keys, base_date):
+    n_sup = table_rows("SUPPLIER")
+    for i in keys:
+        yield (i, (i%n_sup)+1, 100+(i%8000), 50+(i%100), rc())
+
+def gen_customer(keys, base_date):
+    for i in keys:
+        yield (i, f'Cust#{i}', f'Addr{i}', i%25, f'Ph{i}', 1000+(i%100000), 'Seg', rc())
+
+def gen_orders(keys, base_date):
+    n_cust = table_rows("CUSTOMER")
+    for i in keys:
+        yield (i, (i%n_cust)+1, 'O', 1500+(i%100000), base_date+timedelta(days=i%365), 'P1', 'C1', 0, rc())
+
+def gen_lineitem(keys, base_date):
+    n_part, n_sup = table_rows("PART"), table_rows("SUPPLIER")
+    for i in keys:
+        yield (i, ((i-1)//6)+1, base_date+timedelta(days=i%365), (i%n_part)+1, (i%n_sup)+1, 10.0, 200+(i%100000), 0.05, 0.02, 'N', 'O',
+               base_date+timedelta(days=(i%365)+30), base_date+timedelta(days=(i%365)+45), 'Truck', 'Deliver', rc())
+
+# Column generators: the same tables as above, built as one NumPy array per
+# column for a whole batch of keys. Comments come from a NumPy generator
+# seeded per (SETUP_SEED, table, block of COLUMN_BLOCK keys), so a key always
+# gets the same comment however the keys are batched or split across workers.
+
+COLUMN_BLOCK = 10000
+_ALPHABET = np.frombuffer((string.ascii_letters + string.digits).encode(), dtype=np.uint8)
+
+def rand_strings(rng, n, k=15):
+    """`n` random alphanumeric strings of length `k` as a NumPy str array."""
+    codes = _ALPHABET[rng.integers(0, len(_ALPHABET), size=(n, k))]
+    return codes.view(f"S{k}").ravel().astype(f"U{k}")
+
+def block_comments(table, keys, seed=None):
+    """Comments for the sorted key array `keys`, generated block by block."""
+    seed = config.SETUP_SEED if seed is None else seed
+    table_id = list(TABLES).index(table)
+    blocks = keys // COLUMN_BLOCK
+    parts = []
+    for block in np.unique(blocks):
+        rng = np.random.default_rng([seed, table_id, int(block)])
+        comments = rand_strings(rng, COLUMN_BLOCK)
+        parts.append(comments[keys[blocks == block] - block * COLUMN_BLOCK])
+    return np.concatenate(parts)
+
+def _tag(prefix, keys):
+    return np.char.add(prefix, keys.astype(str))
+
+def _const(value, keys):
+    return np.full(len(keys), value)
+
+def _days(base_date, offsets):
+    return np.datetime64(base_date, "us") + offsets.astype("timedelta64[D]")
+
+def cols_region(keys, base_date):
+    return [keys, _tag('Region#', keys), block_comments("REGION", keys)]
+
+def cols_nation(keys, base_date):
+    return [keys, _tag('Nation#', keys), keys % 5, block_comments("NATION", keys)]
+
+def cols_supplier(keys, base_date):
+    return [keys, _tag('Sup#', keys), _tag('Addr', keys), keys % 25, _tag('Ph', keys), 5000 + keys,
+            block_comments("SUPPLIER", keys)]
+
+def cols_part(keys, base_date):
+    return [keys, _tag('Part#', keys), _const('Mfg1', keys), _const('B1', keys), _const('Type1', keys),
+            _const(10, keys), _const('Bag', keys), 900 + keys % 500, block_comments("PART", keys)]
+
+def cols_partsupp(keys, base_date):
+    return [keys, keys % table_rows("SUPPLIER") + 1, 100 + keys % 8000, 50 + keys % 100, block_comments("PARTSUPP", keys)]
+
+def cols_customer(keys, base_date):
+    return [keys, _tag('Cust#', keys), _tag('Addr', keys), keys % 25, _tag('Ph', keys), 1000 + keys % 100000,
+            _const('Seg', keys), block_comments("CUSTOMER", keys)]
+
+def cols_orders(keys, base_date):
+    return [keys, keys % table_rows("CUSTOMER") + 1, _const('O', keys), 1500 + keys % 100000, _days(base_date, keys % 365),
+            _const('P1', keys), _const('C1', keys), _const(0, keys), block_comments("ORDERS", keys)]
+
+def cols_lineitem(keys, base_date):
+    day = keys % 365
+    return [keys, (keys - 1) // 6 + 1, _days(base_date, day), keys % table_rows("PART") + 1, keys % table_rows("SUPPLIER") + 1,
+            _const(10.0, keys), 200 + keys % 100000, _const(0.05, keys), _const(0.02, keys),
+            _const('N', keys), _const('O', keys), _days(base_date, day + 30), _days(base_date, day + 45),
+            _const('Truck', keys), _const('Deliver', keys), block_comments("LINEITEM", keys)]
+
+COLUMN_GENERATORS = {
+    "REGION": cols_region, "NATION": cols_nation, "SUPPLIER": cols_supplier, "PART": cols_part,
+    "PARTSUPP": cols_partsupp, "CUSTOMER": cols_customer, "ORDERS": cols_orders, "LINEITEM": cols_lineitem,
+}
+
+def column_batches(table, keys, base_date, batch):
+    """Yield lists of column arrays for `keys` (a range), `batch` keys at a time."""
+    make_columns = COLUMN_GENERATORS[table]
+    for lo in range(keys.start, keys.stop, batch):
+        yield make_columns(np.arange(lo, min(lo + batch, keys.stop), dtype=np.int64), base_date)
+
+def to_frame(names, columns):
+    """A pyarrow Table for DataFrame ingestion, or row tuples when pyarrow is not installed."""
+    if pa is not None:
+        return pa.table(dict(zip(names, columns)))
+    return list(zip(*(column.tolist() for column in columns)))
+
+def bulk_insert_columns(cursor, table, cols, sql, batches, nolog=True, hint="",
+                        label=None, prefetch=None):
+    """
+    Insert column batches (lists of NumPy arrays in `cols` order).
+
+    SETUP_INGEST 'executemany' binds each batch as an Arrow table (or row
+    tuples without pyarrow); 'direct_path' sends it through
+    Connection.direct_path_load instead of INSERT statements. `hint` as in
+    bulk_insert.
+    """
+    label = label or table
+    prefetch = config.SETUP_PREFETCH_CHUNKS if prefetch is None else prefetch
+    names = [c.strip() for c in cols.split(",")]
+    direct = config.SETUP_INGEST == "direct_path"
+    if nolog:
+        cursor.execute(f"ALTER TABLE {table} NOLOGGING")
+    frames = (to_frame(names, columns) for columns in batches)
+    if prefetch > 0:
+        frames = prefetch_chunks(frames, prefetch)
+    total = 0
+    for frame in frames:
+        rows = frame.num_rows if pa is not None else len(frame)
+        if direct:
+            connection = cursor.connection
+            connection.direct_path_load(connection.username, table, names, frame)
+        else:
+            cursor.executemany(f"INSERT {hint + ' ' if hint else ''}INTO {table} ({cols}) VALUES ({sql})", frame)
+        if (total + rows) // 100000 > total // 100000:
+            print(f"    {label}: {total + rows:,} rows")
+        total += rows
+    if nolog:
+        cursor.execute(f"ALTER TABLE {table} LOGGING")
+    print(f"  [OK] {label}: {total:,} rows")
+    return total
+
+def load_table(cursor, table, keys, base_date, **kwargs):
+    """Load `keys` of `table` with the row or column generator selected by SETUP_GENERATOR."""
+    cols, binds, gen, _, _, chunk = TABLES[table]
+    if config.SETUP_GENERATOR == "numpy":
+        batches = column_batches(table, keys, base_date, config.SETUP_BATCH_ROWS)
+        return bulk_insert_columns(cursor, table, cols, binds, batches, **kwargs)
+    return bulk_insert(cursor, table, cols, binds, gen(keys, base_date), chunk=chunk, **kwargs)
+
+# table -> (columns, binds, row generator, first key, rows at scale factor 1, chunk size), in load order
+TABLES = {
+    "REGION": ("R_REGIONKEY, R_NAME, R_COMMENT", ":1, :2, :3", gen_region, 0, 5, 1000),
+    "NATION": ("N_NATIONKEY, N_NAME, N_REGIONKEY, N_COMMENT", ":1, :2, :3, :4", gen_nation, 0, 25, 1000),
+    "SUPPLIER": ("S_SUPPKEY, S_NAME, S_ADDRESS, S_NATIONKEY, S_PHONE, S_ACCTBAL, S_COMMENT",
+                 ":1, :2, :3, :4, :5, :6, :7", gen_supplier, 1, 10000, 1000),
+    "PART": ("P_PARTKEY, P_NAME, P_MFGR, P_BRAND, P_TYPE, P_SIZE, P_CONTAINER, P_RETAILPRICE, P_COMMENT",
+             ":1, :2, :3, :4, :5, :6, :7, :8, :9", gen_part, 1, 20000, 1000),
+    "PARTSUPP": ("PS_PARTKEY, PS_SUPPKEY, PS_AVAILQTY, PS_SUPPLYCOST, PS_COMMENT",
+                 ":1, :2, :3, :4, :5", gen_partsupp, 1, 80000, 1000),
+    "CUSTOMER": ("C_CUSTKEY, C_NAME, C_ADDRESS, C_NATIONKEY, C_PHONE, C_ACCTBAL, C_MKTSEGMENT, C_COMMENT",
+                 ":1, :2, :3, :4, :5, :6, :7, :8", gen_customer, 1, 150000, 1000),
+    "ORDERS": ("O_ORDERKEY, O_CUSTKEY, O_ORDERSTATUS, O_TOTALPRICE, O_ORDERDATE, O_ORDERPRIORITY, O_CLERK, O_SHIPPRIORITY, O_COMMENT",
+               ":1, :2, :3, :4, :5, :6, :7, :8, :9", gen_orders, 1, 700000, 1000),
+    "LINEITEM": ("L_ORDERKEY, L_LINENUMBER, L_SHIPDATE, L_PARTKEY, L_SUPPKEY, L_QUANTITY, L_EXTENDEDPRICE, L_DISCOUNT, L_TAX, L_RETURNFLAG, L_LINESTATUS, L_COMMITDATE, L_RECEIPTDATE, L_SHIPMODE, L_SHIPINSTRUCT, L_COMMENT",
+                 ":1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13, :14, :15, :16", gen_lineitem, 1, 4000000, 5000),
+}
+
+# Fixed-size dimension tables, as in TPC-H
+FIXED_SIZE_TABLES = ("REGION", "NATION")
+# Tables whose foreign keys wrap at a scaled parent table's row count
+SCALED_FK_TABLES = ("PARTSUPP", "ORDERS", "LINEITEM")
+
+def table_rows(table, scale=None):
+    """Row count of `table` at `scale` (default SETUP_SCALE)."""
+    scale = config.SETUP_SCALE if scale is None else scale
+    base_rows = TABLES[table][4]
+    return base_rows if table in FIXED_SIZE_TABLES else max(1, int(round(base_rows * scale)))
+
+def table_keys(table, scale=None):
+    first_key = TABLES[table][3]
+    return range(first_key, first_key + table_rows(table, scale))
+
+# Checkpoints: every load unit (a key range of at most SETUP_CHECKPOINT_ROWS,
+# aligned to multiples of that size from the first key) is committed together
+# with its LOAD_CHECKPOINT row, so a rerun skips exactly the committed units.
+# The unit size and scale factor are recorded with each unit: a resume needs
+# the same unit size (unit starts seed the row generator and decide which keys
+# a committed unit covers), and a scale top-up is refused once SCALED_FK_TABLES
+# have rows, since their foreign keys would differ from a fresh load.
+
+def read_checkpoints(cursor):
+    """Return ({table: [(start, stop, scale, unit_rows), ...]}, base_date or None) from LOAD_CHECKPOINT."""
+    cursor.execute("SELECT table_name, chunk_start, chunk_stop, scale_factor, unit_rows, base_date "
+                   "FROM LOAD_CHECKPOINT ORDER BY table_name, chunk_start")
+    loaded, base_date = {}, None
+    for table, start, stop, scale, unit_rows, unit_base_date in cursor.fetchall():
+        loaded.setdefault(table, []).append((start, stop, scale, unit_rows))
+        base_date = base_date or unit_base_date
+    return loaded, base_date
+
+def check_resumable(loaded, scale=None, unit_rows=None):
+    """
+    Raise ValueError when the committed units in `loaded` cannot be resumed or
+    topped up at `scale` with units of `unit_rows` (SETUP_RESET=1 reloads instead).
+    """
+    scale = config.SETUP_SCALE if scale is None else scale
+    unit_rows = unit_rows or config.SETUP_CHECKPOINT_ROWS
+    problems = []
+    for table, units in loaded.items():
+        sizes = {size for _, _, _, size in units}
+        if None in sizes:
+            problems.append(f"{table} has units without a recorded unit size")
+        elif sizes != {unit_rows}:
+            problems.append(f"{table} was loaded in units of {', '.join(map(str, sorted(sizes)))} rows, "
+                            f"SETUP_CHECKPOINT_ROWS is {unit_rows}")
+        scales = {float(s) for _, _, s, _ in units if s is not None}
+        if table in SCALED_FK_TABLES and scales - {scale}:
+            problems.append(f"{table} was loaded at scale factor {', '.join(map(str, sorted(scales)))}; "
+                            f"its foreign keys depend on the scale, so it cannot be topped up to {scale}")
+    if problems:
+        raise ValueError("Cannot resume the load from LOAD_CHECKPOINT (set SETUP_RESET=1 to reload):\n  "
+                         + "\n  ".join(problems))
+
+def plan_units(loaded, scale=None, unit_rows=None):
+    """List the (table, start, stop) units still missing for `scale`, given the committed ranges in `loaded`."""
+    unit_rows = unit_rows or config.SETUP_CHECKPOINT_ROWS
+    units = []
+    for table in TABLES:
+        keys = table_keys(table, scale)
+        done = sorted((start, stop) for start, stop, *_ in loaded.get(table, []))
+        for lo in range(keys.start, keys.stop, unit_rows):
+            start, stop = lo, min(lo + unit_rows, keys.stop)
+            for done_start, done_stop in done:
+                if done_start <= start < done_stop:
+                    start = done_stop
+            if start < stop:
+                units.append((table, start, stop))
+    return units
+
+def load_unit(cursor, table, start, stop, base_date, scale=None, unit_rows=None, **kwargs):
+    """
+    Load keys [start, stop) of `table`, record the checkpoint and commit both together.
+
+    The row generator is reseeded from the table and unit start, so any unit
+    can be regenerated on its own with identical rows.
+    """
+    scale = config.SETUP_SCALE if scale is None else scale
+    unit_rows = unit_rows or config.SETUP_CHECKPOINT_ROWS
+    r.seed(f"{table}:{start}")
+    rows = load_table(cursor, table, range(start, stop), base_date, nolog=False,
+                      label=f"{table}[{start}:{stop}]", **kwargs)
+    cursor.execute(
+        "INSERT INTO LOAD_CHECKPOINT (TABLE_NAME, CHUNK_START, CHUNK_STOP, ROW_COUNT, SCALE_FACTOR, UNIT_ROWS, BASE_DATE) "
+        "VALUES (:1, :2, :3, :4, :5, :6, :7)", (table, start, stop, rows, scale, unit_rows, base_date))
+    cursor.connection.commit()
+    return rows
+
+def set_logging(cursor, enabled):
+    # Toggled once around the whole load: ALTER TABLE commits implicitly, so it
+    # must not run between a unit's rows and its checkpoint row.
+    for table in TABLES:
+        cursor.execute(f"ALTER TABLE {table} {'LOGGING' if enabled else 'NOLOGGING'}")
+
+def insert_data(cursor, units, base_date):
+    for table, start, stop in units:
+        load_unit(cursor, table, start, stop, base_date)
+
+def load_range(table, start, stop, base_date):
+    """Process-pool task: load one unit on a dedicated connection (see load_unit)."""
+    began = time.time()
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            rows = load_unit(cursor, table, start, stop, base_date)
+    return table, start, stop, rows, time.time() - began
+
+def parallel_insert_data(cursor, units, base_date, workers):
+    """
+    Load `units` with a pool of `workers` processes, each on its own connection.
+
+    Units of different tables load concurrently and large tables are spread
+    over workers unit by unit; every unit commits with its own checkpoint.
+    """
+    tasks = sorted(units, key=lambda t: t[2] - t[1], reverse=True)  # largest units first
+    began = time.time()
+    loaded = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(load_range, table, start, stop, base_date) for table, start, stop in tasks]
+        for future in as_completed(futures):
+            table, start, stop, rows, seconds = future.result()
+            loaded[table] = loaded.get(table, 0) + rows
+            print(f"  [DONE] {table}[{start}:{stop}]: {rows:,} rows in {seconds:.1f}s "
+                  f"({rows / seconds if seconds else 0:,.0f} rows/s)")
+    elapsed = time.time() - began
+    total = sum(loaded.values())
+    print(f"\nLoaded {total:,} rows with {workers} workers in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
 
 def verify(cursor):
     """Count rows in all tables"""
@@ -108,13 +451,33 @@ def main():
         with get_connection() as conn:
             with conn.cursor() as cur:
                 create_tables(cur)
-                truncate_tables(cur)
+                loaded, base_date = read_checkpoints(cur)
+                if config.SETUP_RESET or not loaded:
+                    truncate_tables(cur)
+                    loaded, base_date = {}, None
+                else:
+                    check_resumable(loaded)
+                    print(f"Resuming: {sum(len(v) for v in loaded.values())} units already committed")
+                # Kept from the first run so resumed and topped-up rows share the same dates
+                base_date = base_date or (datetime.now() - timedelta(days=365)).replace(microsecond=0)
                 verify(cur)
-                print("\nInserting data...")
-                insert_data(cur)
-                conn.commit()
+                units = plan_units(loaded)
+                pending = sum(stop - start for _, start, stop in units)
+                print(f"\nScale factor {config.SETUP_SCALE}: {len(units)} units, {pending:,} rows to load")
+                set_logging(cur, False)
+                try:
+                    if config.SETUP_WORKERS > 1:
+                        print(f"\nInserting data with {config.SETUP_WORKERS} worker processes...")
+                        parallel_insert_data(cur, units, base_date, config.SETUP_WORKERS)
+                    else:
+                        print("\nInserting data...")
+                        insert_data(cur, units, base_date)
+                finally:
+                    set_logging(cur, True)
                 print("\nVerifying...")
                 verify(cur)
+                if config.SETUP_DESIGN_PROFILE:
+                    apply_profile(cur, config.SETUP_DESIGN_PROFILE)
         print("\n[SUCCESS] Setup complete!\n")
     except Exception as e:
         print(f"[ERROR] {e}")
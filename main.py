@@ -1,20 +1,20 @@
 # main.py - Comprehensive Oracle 26 AI Evaluation Suite
-import pandas as pd
-import sys
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
 from datetime import datetime
 
-sys.path.insert(0, '/Users/sanjaymishra/oracle26ai-eval')
-
-from src.core.db_utils import get_connection
-from src.experiments.accuracy_experiment import run_accuracy_test
-from src.experiments.latency_experiment import run_latency_test
+from src.core.generate_cache import get_generate_cache
+from src.core.gt_cache import get_gt_cache
+from src.core.tracing import get_tracer, load_trace, summarize_trace
+from src.core.run_history import get_run_history, load_latest, detect_regressions
+from src.core.rate_limit import get_scheduler
 from src.core import config
 
 def generate_visualizations(acc_df, lat_df):
     """Generate comprehensive visualizations"""
+    # Plotting libraries load in seconds, so they are imported only when charts are drawn
+    import numpy as np
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     sns.set_style("whitegrid")
     fig, axes = plt.subplots(2, 3, figsize=(18, 10))
     fig.suptitle('Oracle 26 AI Query Evaluation - Complete Results', fontsize=16, fontweight='bold')
@@ -65,9 +65,9 @@ def generate_visualizations(acc_df, lat_df):
     
     # GRAPH 3: Latency Distribution
     ax = axes[0, 2]
-    ax.hist(lat_df['total_latency_ms'], bins=10, color='#1abc9c', alpha=0.7, edgecolor='black')
-    ax.axvline(lat_df['total_latency_ms'].mean(), color='red', linestyle='--', linewidth=2, label=f"Mean: {lat_df['total_latency_ms'].mean():.0f}ms")
-    ax.axvline(lat_df['total_latency_ms'].median(), color='orange', linestyle='--', linewidth=2, label=f"Median: {lat_df['total_latency_ms'].median():.0f}ms")
+    ax.hist(lat_df['total_ai_latency_ms'], bins=10, color='#1abc9c', alpha=0.7, edgecolor='black')
+    ax.axvline(lat_df['total_ai_latency_ms'].mean(), color='red', linestyle='--', linewidth=2, label=f"Mean: {lat_df['total_ai_latency_ms'].mean():.0f}ms")
+    ax.axvline(lat_df['total_ai_latency_ms'].median(), color='orange', linestyle='--', linewidth=2, label=f"Median: {lat_df['total_ai_latency_ms'].median():.0f}ms")
     ax.set_xlabel('Total Latency (ms)', fontweight='bold')
     ax.set_ylabel('Frequency', fontweight='bold')
     ax.set_title('Query Latency Distribution', fontweight='bold')
@@ -78,7 +78,7 @@ def generate_visualizations(acc_df, lat_df):
     x = np.arange(len(lat_df.head(10)))
     width = 0.35
     ax.bar(x - width/2, lat_df['llm_latency_ms'].head(10), width, label='LLM Generation', color='#e74c3c')
-    ax.bar(x + width/2, lat_df['oracle_exe_ms'].head(10), width, label='Oracle Execution', color='#3498db')
+    ax.bar(x + width/2, lat_df['ai_exe_ms'].head(10), width, label='Oracle Execution', color='#3498db')
     ax.set_ylabel('Latency (ms)', fontweight='bold')
     ax.set_xlabel('Top 10 Queries', fontweight='bold')
     ax.set_title('LLM vs Oracle Execution (Top 10)', fontweight='bold')
@@ -116,8 +116,8 @@ def generate_visualizations(acc_df, lat_df):
     print("Saved comprehensive visualization: evaluation_complete.png")
     plt.close()
 
-def generate_summary_report(acc_df, lat_df):
-    """Generate comprehensive summary report with dynamic data"""
+def generate_summary_report(acc_df, lat_df, trace_df=None):
+    """Generate comprehensive summary report with dynamic data (plus span breakdown when traced)"""
     report = []
     report.append("\n" + "-"*80)
     report.append("ORACLE 26 AI EVALUATION - COMPREHENSIVE RESULTS REPORT")
@@ -158,14 +158,14 @@ def generate_summary_report(acc_df, lat_df):
     # SECTION 2: LATENCY ANALYSIS
     report.append("\nLATENCY ANALYSIS")
     report.append("-" * 80)
-    report.append(f"Mean Latency: {lat_df['total_latency_ms'].mean():.2f} ms")
-    report.append(f"Median Latency: {lat_df['total_latency_ms'].median():.2f} ms")
-    report.append(f"P95 Latency: {lat_df['total_latency_ms'].quantile(0.95):.2f} ms")
-    report.append(f"P99 Latency: {lat_df['total_latency_ms'].quantile(0.99):.2f} ms")
+    report.append(f"Mean Latency: {lat_df['total_ai_latency_ms'].mean():.2f} ms")
+    report.append(f"Median Latency: {lat_df['total_ai_latency_ms'].median():.2f} ms")
+    report.append(f"P95 Latency: {lat_df['total_ai_latency_ms'].quantile(0.95):.2f} ms")
+    report.append(f"P99 Latency: {lat_df['total_ai_latency_ms'].quantile(0.99):.2f} ms")
     
     report.append("\n  LATENCY BREAKDOWN:")
-    report.append(f"    Average LLM Generation Time: {lat_df['llm_latency_ms'].mean():.2f} ms ({lat_df['llm_latency_ms'].mean() / lat_df['total_latency_ms'].mean() * 100:.1f}% of total)")
-    report.append(f"    Average Oracle Execution Time: {lat_df['oracle_exe_ms'].mean():.2f} ms ({lat_df['oracle_exe_ms'].mean() / lat_df['total_latency_ms'].mean() * 100:.1f}% of total)")
+    report.append(f"    Average LLM Generation Time: {lat_df['llm_latency_ms'].mean():.2f} ms ({lat_df['llm_latency_ms'].mean() / lat_df['total_ai_latency_ms'].mean() * 100:.1f}% of total)")
+    report.append(f"    Average Oracle Execution Time: {lat_df['ai_exe_ms'].mean():.2f} ms ({lat_df['ai_exe_ms'].mean() / lat_df['total_ai_latency_ms'].mean() * 100:.1f}% of total)")
     report.append(f"    Average LLM Overhead Ratio: {lat_df['overhead_ratio'].mean():.2f}x")
     
     # SECTION 3: KEY INSIGHTS
@@ -173,10 +173,10 @@ def generate_summary_report(acc_df, lat_df):
     report.append("-" * 80)
     
     # Best and worst performers
-    fastest_query = lat_df.loc[lat_df['total_latency_ms'].idxmin()]
-    slowest_query = lat_df.loc[lat_df['total_latency_ms'].idxmax()]
-    report.append(f"Fastest Query (Q{fastest_query['query_id']}): {fastest_query['total_latency_ms']:.2f} ms")
-    report.append(f"Slowest Query (Q{slowest_query['query_id']}): {slowest_query['total_latency_ms']:.2f} ms")
+    fastest_query = lat_df.loc[lat_df['total_ai_latency_ms'].idxmin()]
+    slowest_query = lat_df.loc[lat_df['total_ai_latency_ms'].idxmax()]
+    report.append(f"Fastest Query (Q{fastest_query['query_id']}): {fastest_query['total_ai_latency_ms']:.2f} ms")
+    report.append(f"Slowest Query (Q{slowest_query['query_id']}): {slowest_query['total_ai_latency_ms']:.2f} ms")
     
     # Accuracy insights
     failed_queries = acc_df[acc_df['ai_success'] == False]
@@ -191,7 +191,7 @@ def generate_summary_report(acc_df, lat_df):
     
     success_rate = acc_df['ai_success'].mean()
     semantic_rate = acc_df['semantic_match'].mean() if 'semantic_match' in acc_df.columns else 0
-    p95_latency = lat_df['total_latency_ms'].quantile(0.95)
+    p95_latency = lat_df['total_ai_latency_ms'].quantile(0.95)
     
     assessments = []
     if success_rate >= 0.95:
@@ -218,18 +218,48 @@ def generate_summary_report(acc_df, lat_df):
     for assessment in assessments:
         report.append(f"  {assessment}")
     
+    # SECTION 5: TRACE BREAKDOWN
+    if trace_df is not None and not trace_df.empty:
+        report.append("\nTRACE BREAKDOWN (per span)")
+        report.append("-" * 80)
+        for name, row in summarize_trace(trace_df).iterrows():
+            report.append(f"  {name:24s}: n={int(row['count']):4d} | total={row['total_ms']:10.1f} ms | "
+                          f"mean={row['mean_ms']:8.1f} ms | p95={row['p95_ms']:8.1f} ms")
+        query_attrs = trace_df[trace_df['name'] == 'query']['attrs']
+        round_trips = sum(a.get('round_trips', 0) for a in query_attrs)
+        if round_trips:
+            to_client = sum(a.get('bytes_to_client', 0) for a in query_attrs)
+            from_client = sum(a.get('bytes_from_client', 0) for a in query_attrs)
+            report.append(f"  Round trips: {round_trips:,} | Bytes to client: {to_client:,} | Bytes from client: {from_client:,}")
+            parses = sum(a.get('parses', 0) for a in query_attrs)
+            hard_parses = sum(a.get('hard_parses', 0) for a in query_attrs)
+            executions = sum(a.get('executions', 0) for a in query_attrs)
+            cache_hits = sum(a.get('server_cursor_cache_hits', 0) for a in query_attrs)
+            per_execution = f"{parses / executions:.3f}" if executions else "n/a"
+            report.append(f"  Parses: {parses:,} (hard: {hard_parses:,}) for {executions:,} executions "
+                          f"({per_execution} per execution, client statement cache) | "
+                          f"Server session cursor cache hits: {cache_hits:,}")
+    
     report.append("\n" + "-"*80)
     
     return "\n".join(report)
 
-def main():
-    print("Starting Oracle 26 AI Comprehensive Evaluation Suite...\n")
-    
+def run_sync_experiments():
+    """Run both experiments on one connection (plus a worker pool when EVAL_WORKERS > 1)."""
+    from src.core.db_utils import get_connection
+    from src.core.pool_utils import create_eval_pool
+    from src.experiments.accuracy_experiment import run_accuracy_test
+    from src.experiments.latency_experiment import run_latency_test
+
     acc_df = None
     lat_df = None
+    pool = None
     
-    # Run experiments with single connection
+    # Run experiments with single connection, plus a worker pool when EVAL_WORKERS > 1
     try:
+        if config.WORKERS > 1:
+            print(f"Using {config.WORKERS} pooled workers")
+            pool = create_eval_pool(config.WORKERS)
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 # EXPERIMENT 1: Accuracy Test
@@ -237,12 +267,12 @@ def main():
                 print("EXPERIMENT 1: ACCURACY & SEMANTIC MATCHING")
                 print("="*80)
                 try:
-                    acc_df = run_accuracy_test(cursor)
+                    acc_df = run_accuracy_test(cursor, pool=pool, workers=config.WORKERS)
                 except Exception as e:
                     print(f"⚠️  Accuracy experiment warning: {e}")
                     print("Attempting to load cached accuracy results...")
                     try:
-                        acc_df = pd.read_csv('accuracy_results.csv')
+                        acc_df = load_latest('accuracy', 'accuracy_results.csv')
                         print(f"Loaded {len(acc_df)} cached accuracy results")
                     except:
                         pass
@@ -253,19 +283,23 @@ def main():
                     print("EXPERIMENT 2: LATENCY BREAKDOWN ANALYSIS")
                     print("="*80)
                     try:
-                        lat_df = run_latency_test(cursor)
+                        if config.BENCH_REPETITIONS > 1:
+                            from src.experiments.latency_benchmark import run_latency_benchmark
+                            lat_df = run_latency_benchmark(cursor)
+                        else:
+                            lat_df = run_latency_test(cursor, pool=pool, workers=config.WORKERS)
                     except KeyboardInterrupt:
                         print("\n⚠️  Latency experiment interrupted by timeout (normal for large result sets)")
                         print("Attempting to load cached latency results...")
                         try:
-                            lat_df = pd.read_csv('latency_results.csv')
+                            lat_df = load_latest('latency', 'latency_results.csv')
                             print(f"✅ Loaded {len(lat_df)} cached latency results")
                         except:
                             pass
                     except Exception as e:
                         print(f"⚠️  Latency experiment error: {e}")
                         try:
-                            lat_df = pd.read_csv('latency_results.csv')
+                            lat_df = load_latest('latency', 'latency_results.csv')
                             print(f"✅ Loaded {len(lat_df)} cached latency results")
                         except:
                             pass
@@ -274,11 +308,63 @@ def main():
         print(f"Connection error: {e}")
         print("Attempting to load cached results...")
         try:
-            acc_df = pd.read_csv('accuracy_results.csv')
-            lat_df = pd.read_csv('latency_results.csv')
+            acc_df = load_latest('accuracy', 'accuracy_results.csv')
+            lat_df = load_latest('latency', 'latency_results.csv')
             print(f"Loaded cached data: {len(acc_df)} accuracy, {len(lat_df)} latency")
         except:
-            return
+            pass
+    finally:
+        if pool is not None:
+            pool.close(force=True)
+    
+    return acc_df, lat_df
+
+def run_async_engine():
+    """Run both experiments with the asyncio engine (EVAL_ENGINE=async)."""
+    import asyncio
+    from src.experiments.async_experiment import run_async_experiments
+    print(f"Using async engine with {config.WORKERS} sessions")
+    try:
+        return asyncio.run(run_async_experiments(config.WORKERS))
+    except Exception as e:
+        print(f"Async experiment error: {e}")
+        return None, None
+
+def report_regressions():
+    """Print run-over-run regressions of the latest accuracy and latency runs in the run history."""
+    history = get_run_history()
+    if history is None:
+        return
+    for kind in ("accuracy", "latency"):
+        try:
+            df = detect_regressions(history, kind)
+        except Exception as e:
+            print(f"Regression check ({kind}) failed: {e}")
+            continue
+        if df.empty:
+            continue
+        regressed = df[df['regressed']]
+        print(f"\nRUN-OVER-RUN ({kind}): {len(regressed)} regressions over {len(df)} metrics")
+        for _, row in regressed.iterrows():
+            print(f"  {row['metric']:28s}: {row['baseline']:.3f} -> {row['current']:.3f} "
+                  f"(median of {int(row['baseline_runs'])} previous runs)")
+
+def main():
+    print("Starting Oracle 26 AI Comprehensive Evaluation Suite...\n")
+    
+    if config.ENGINE == "async":
+        acc_df, lat_df = run_async_engine()
+    else:
+        acc_df, lat_df = run_sync_experiments()
+    
+    cache = get_generate_cache()
+    if cache is not None:
+        print(f"\nGENERATE cache: {cache.stats()}")
+    gt_cache = get_gt_cache()
+    if gt_cache is not None:
+        print(f"Ground-truth cache: {gt_cache.stats()}")
+    print(f"GENERATE scheduler: {get_scheduler().stats()}")
+    report_regressions()
     
     # Only proceed with visualization and report if we have data
     if acc_df is None or lat_df is None:
@@ -300,7 +386,13 @@ def main():
     print("\n" + "="*80)
     print("GENERATING COMPREHENSIVE REPORT")
     print("="*80)
-    report = generate_summary_report(acc_df, lat_df)
+    trace_df = None
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.flush()
+        trace_df = load_trace(tracer.path, tracer.trace_id)
+        print(f"Trace written to: {tracer.path}")
+    report = generate_summary_report(acc_df, lat_df, trace_df)
     print(report)
     
     # Save report to file
@@ -0,0 +1,126 @@
+# cli.py - oracle26ai-eval command line (setup, accuracy, latency, report, plot)
+import sys
+import argparse
+
+# Only the standard library is imported here: every subcommand imports what it
+# needs (python-oracledb, pandas, matplotlib, ...) when it runs, so a scheduler
+# job running one query or one experiment does not pay for the others.
+
+
+def _query_ids(value):
+    """argparse type for --query: comma-separated query ids."""
+    try:
+        return {int(q) for q in value.split(",") if q.strip()}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated query ids, got {value!r}")
+
+
+def _run_experiment(run, query_ids, pooled=True):
+    """
+    Run `run(cursor, query_ids=...)` on one connection, as main.run_sync_experiments
+    does; `pooled` experiments also get pool= and workers= when EVAL_WORKERS > 1.
+    """
+    from src.core import config
+    from src.core.db_utils import get_connection
+    from src.core.pool_utils import create_eval_pool
+
+    pool = None
+    try:
+        if pooled and config.WORKERS > 1:
+            print(f"Using {config.WORKERS} pooled workers")
+            pool = create_eval_pool(config.WORKERS)
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                if pooled:
+                    return run(cursor, pool=pool, workers=config.WORKERS, query_ids=query_ids)
+                return run(cursor, query_ids=query_ids)
+    finally:
+        if pool is not None:
+            pool.close(force=True)
+
+
+def _load_results():
+    from src.core.run_history import load_latest
+    return load_latest('accuracy', 'accuracy_results.csv'), load_latest('latency', 'latency_results.csv')
+
+
+def cmd_setup(args):
+    from src.core import config
+    if config.BACKEND == "offline":
+        # The offline database is generated from data_setup's tables in one go (rebuilt on every setup)
+        from src.core.offline_db import build_database
+        build_database(config.OFFLINE_DB_PATH)
+        print(f"\n[SUCCESS] Offline database built: {config.OFFLINE_DB_PATH}\n")
+        return
+    import data_setup
+    data_setup.main()
+
+
+def cmd_accuracy(args):
+    from src.experiments.accuracy_experiment import run_accuracy_test
+    _run_experiment(run_accuracy_test, args.query)
+
+
+def cmd_latency(args):
+    from src.core import config
+    if config.BENCH_REPETITIONS > 1:
+        from src.experiments.latency_benchmark import run_latency_benchmark
+        _run_experiment(run_latency_benchmark, args.query, pooled=False)
+    else:
+        from src.experiments.latency_experiment import run_latency_test
+        _run_experiment(run_latency_test, args.query)
+
+
+def cmd_report(args):
+    import main
+    acc_df, lat_df = _load_results()
+    main.report_regressions()
+    report = main.generate_summary_report(acc_df, lat_df)
+    print(report)
+    with open(args.output, 'w') as f:
+        f.write(report)
+    print(f"\nReport saved to: {args.output}")
+
+
+def cmd_plot(args):
+    import main
+    acc_df, lat_df = _load_results()
+    main.generate_visualizations(acc_df, lat_df)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="oracle26ai-eval",
+        description="Oracle 26 AI evaluation suite. Connection and tuning settings come from the "
+                    "environment / .env (see src/core/config.py).",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    setup = commands.add_parser("setup", help="create and load the TPC-H tables (data_setup.py, or the "
+                                              "offline database when EVAL_BACKEND=offline)")
+    setup.set_defaults(func=cmd_setup)
+
+    for name, func, text in (("accuracy", cmd_accuracy, "run the accuracy & semantic matching experiment"),
+                             ("latency", cmd_latency, "run the latency breakdown experiment "
+                                                      "(repeated benchmark when BENCH_REPETITIONS > 1)")):
+        experiment = commands.add_parser(name, help=text)
+        experiment.add_argument("-q", "--query", type=_query_ids, metavar="IDS",
+                                help="only these query ids, e.g. 3 or 1,5,7")
+        experiment.set_defaults(func=func)
+
+    report = commands.add_parser("report", help="summary report of the latest accuracy and latency results")
+    report.add_argument("-o", "--output", default="evaluation_report.txt", help="report file (%(default)s)")
+    report.set_defaults(func=cmd_report)
+
+    plot = commands.add_parser("plot", help="charts of the latest results (evaluation_complete.png)")
+    plot.set_defaults(func=cmd_plot)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
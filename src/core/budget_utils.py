@@ -0,0 +1,166 @@
+# budget_utils.py
+import os
+import asyncio
+import threading
+
+from . import config
+
+# DPY-4024 / DPI-1067 / DPI-1080: call_timeout exceeded, ORA-01013: cancelled by connection.cancel()
+TIMEOUT_ERRORS = ("DPY-4024", "DPI-1067", "DPI-1080", "ORA-01013")
+
+
+class QueryTimeout(Exception):
+    """A statement exceeded its time budget and was cancelled."""
+
+
+def _clamp(seconds):
+    return min(max(seconds, config.BUDGET_MIN), config.BUDGET_MAX)
+
+
+class QueryBudgets:
+    """
+    Per-query time budgets derived from historical latency.
+
+    `history` maps query_id to the ground-truth execution time in ms (see
+    load_history). A query's budget is BUDGET_MULTIPLIER times that time,
+    clamped to [BUDGET_MIN, BUDGET_MAX] seconds. Without history, generated
+    SQL gets BUDGET_DEFAULT and ground truth BUDGET_MAX, since ground-truth
+    queries are known to finish.
+    """
+
+    def __init__(self, history=None):
+        self.history = history or {}
+
+    def ai_budget(self, qid):
+        gt_ms = self.history.get(qid)
+        if gt_ms is None:
+            return _clamp(config.BUDGET_DEFAULT)
+        return _clamp(gt_ms / 1000 * config.BUDGET_MULTIPLIER)
+
+    def gt_budget(self, qid):
+        gt_ms = self.history.get(qid)
+        if gt_ms is None:
+            return config.BUDGET_MAX
+        return _clamp(gt_ms / 1000 * config.BUDGET_MULTIPLIER)
+
+
+def load_history(path=None):
+    """Read {query_id: gt_exe_ms} from a previous latency_results.csv; empty when unavailable."""
+    path = path or config.BUDGET_HISTORY_FILE
+    if not path or not os.path.exists(path):
+        return {}
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if 'gt_exe_ms' not in df.columns:
+        return {}
+    return df.dropna(subset=['gt_exe_ms']).groupby('query_id')['gt_exe_ms'].median().to_dict()
+
+
+_budgets = None
+_budgets_lock = threading.Lock()
+
+
+def get_budgets():
+    """Return the process-wide QueryBudgets, loading history once."""
+    global _budgets
+    with _budgets_lock:
+        if _budgets is None:
+            _budgets = QueryBudgets(load_history())
+    return _budgets
+
+
+class _Watchdog:
+    """Bounds a block of statements to `seconds` of wall time on one connection."""
+
+    def __init__(self, connection, seconds):
+        self.connection = connection
+        self.seconds = seconds
+        self.fired = False
+
+    def _fire(self):
+        self.fired = True
+        try:
+            self.connection.cancel()
+        except Exception:
+            pass
+
+    def _raise_if_timeout(self, exc):
+        if exc is not None and (self.fired or any(code in str(exc) for code in TIMEOUT_ERRORS)):
+            raise QueryTimeout(f"exceeded {self.seconds:g}s budget") from exc
+
+
+class query_budget(_Watchdog):
+    """
+    Context manager enforcing a time budget on `connection`.
+
+    call_timeout bounds every round trip and a timer calls connection.cancel()
+    when the whole block overruns, so many fast fetch round trips cannot add
+    up past the budget either. Either way QueryTimeout is raised.
+    """
+
+    def __enter__(self):
+        self._previous = self.connection.call_timeout
+        self.connection.call_timeout = int(self.seconds * 1000)
+        self._timer = threading.Timer(self.seconds, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._timer.cancel()
+        try:
+            self.connection.call_timeout = self._previous
+        except Exception:
+            pass
+        self._raise_if_timeout(exc)
+        return False
+
+
+class query_budget_async(_Watchdog):
+    """Async version of query_budget; the watchdog runs on the event loop."""
+
+    async def __aenter__(self):
+        self._previous = self.connection.call_timeout
+        self.connection.call_timeout = int(self.seconds * 1000)
+        self._handle = asyncio.get_running_loop().call_later(self.seconds, self._fire)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._handle.cancel()
+        try:
+            self.connection.call_timeout = self._previous
+        except Exception:
+            pass
+        self._raise_if_timeout(exc)
+        return False
+
+
+def run_with_budget(cursor, run, sql, seconds, label):
+    """
+    Run `run(cursor, sql)` within `seconds`. Returns (result, outcome).
+
+    outcome is 'ok', 'timeout' or 'error'; result is None unless 'ok'.
+    """
+    try:
+        with query_budget(cursor.connection, seconds):
+            return run(cursor, sql), "ok"
+    except QueryTimeout as e:
+        print(f"{label} Timeout: {e}")
+        return None, "timeout"
+    except Exception as e:
+        print(f"{label} Error: {e}")
+        return None, "error"
+
+
+async def run_with_budget_async(cursor, run, sql, seconds, label):
+    """Async version of run_with_budget; `run` is a coroutine function."""
+    try:
+        async with query_budget_async(cursor.connection, seconds):
+            return await run(cursor, sql), "ok"
+    except QueryTimeout as e:
+        print(f"{label} Timeout: {e}")
+        return None, "timeout"
+    except Exception as e:
+        print(f"{label} Error: {e}")
+        return None, "error"
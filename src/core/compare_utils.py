@@ -0,0 +1,245 @@
+# compare_utils.py
+import math
+import hashlib
+import datetime
+from decimal import Decimal
+
+from .tracing import span
+
+_DIGEST_BITS = 128
+_DIGEST_MOD = 1 << _DIGEST_BITS
+
+
+def normalize_value(value):
+    """
+    Map a fetched column value to a canonical string.
+
+    Numbers compare by value (10, 10.0 and Decimal('10.00') are equal; other
+    floats are rounded to 12 significant digits), CHAR padding is ignored and
+    dates use ISO format.
+    """
+    if value is None:
+        return "\x00"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (float, Decimal)):
+        if isinstance(value, float) and not math.isfinite(value):
+            return repr(value)
+        if value == int(value):
+            return str(int(value))
+        return format(float(value), ".12g")
+    if isinstance(value, str):
+        return value.rstrip()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day).isoformat(sep=" ")
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+def row_hash(row):
+    """128-bit hash of one row's normalized values."""
+    encoded = "\x1f".join(normalize_value(v) for v in row).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=_DIGEST_BITS // 8).digest(), "big")
+
+
+class ResultFingerprint:
+    """
+    Order-insensitive multiset hash of a query result.
+
+    The digest is the sum of per-row hashes modulo 2**128, so it can be built
+    one batch at a time and fingerprints of disjoint parts can be merged with
+    `merge`. A count-only fingerprint (digest None) compares by row count.
+    `kind` is 'client' for fingerprints hashed in Python and 'server' for
+    STANDARD_HASH aggregates; digests of different kinds are not comparable.
+    """
+
+    __slots__ = ("row_count", "digest", "kind")
+
+    def __init__(self, row_count=0, digest=0, kind="client"):
+        self.row_count = row_count
+        self.digest = digest
+        self.kind = kind
+
+    @classmethod
+    def from_count(cls, row_count):
+        return cls(row_count, None, "count")
+
+    def update(self, rows):
+        digest = self.digest
+        for row in rows:
+            digest += row_hash(row)
+        self.digest = digest % _DIGEST_MOD
+        self.row_count += len(rows)
+        return self
+
+    def merge(self, other):
+        if self.kind != other.kind:
+            raise ValueError(f"cannot merge {self.kind} and {other.kind} fingerprints")
+        return ResultFingerprint(self.row_count + other.row_count, (self.digest + other.digest) % _DIGEST_MOD, self.kind)
+
+    def matches(self, other):
+        if self.digest is None or other.digest is None:
+            return self.row_count == other.row_count
+        if self.kind != other.kind:
+            raise ValueError(f"cannot compare {self.kind} and {other.kind} fingerprints")
+        return self.row_count == other.row_count and self.digest == other.digest
+
+    def hexdigest(self):
+        return "" if self.digest is None else f"{self.digest:032x}"
+
+    def as_dict(self):
+        return {"row_count": self.row_count, "digest": self.hexdigest() or None, "kind": self.kind}
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = int(data["digest"], 16) if data["digest"] else None
+        return cls(data["row_count"], digest, data["kind"])
+
+    def __eq__(self, other):
+        return isinstance(other, ResultFingerprint) and self.matches(other)
+
+    def __repr__(self):
+        return f"ResultFingerprint(rows={self.row_count}, digest={self.hexdigest() or None})"
+
+
+def fingerprint_query(cursor, sql, batch_size=1000):
+    """Execute `sql` and fingerprint its rows with fetchmany, holding at most one batch in memory."""
+    cursor.arraysize = batch_size
+    with span("execute"):
+        cursor.execute(sql)
+    fingerprint = ResultFingerprint()
+    with span("fetch", arraysize=batch_size) as fetch_span:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            fingerprint.update(rows)
+        fetch_span.set(rows=fingerprint.row_count)
+    return fingerprint
+
+
+async def fingerprint_query_async(cursor, sql, batch_size=1000):
+    """Async version of fingerprint_query."""
+    cursor.arraysize = batch_size
+    with span("execute"):
+        await cursor.execute(sql)
+    fingerprint = ResultFingerprint()
+    with span("fetch", arraysize=batch_size) as fetch_span:
+        while True:
+            rows = await cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            fingerprint.update(rows)
+        fetch_span.set(rows=fingerprint.row_count)
+    return fingerprint
+
+
+# Server-side comparison: Oracle does the diff / hashing and only a few
+# scalars come back to the client.
+
+_DATE_FORMATS = {
+    "DB_TYPE_DATE": "YYYY-MM-DD HH24:MI:SS",
+    "DB_TYPE_TIMESTAMP": "YYYY-MM-DD HH24:MI:SS.FF",
+    "DB_TYPE_TIMESTAMP_TZ": "YYYY-MM-DD HH24:MI:SS.FF TZH:TZM",
+    "DB_TYPE_TIMESTAMP_LTZ": "YYYY-MM-DD HH24:MI:SS.FF",
+}
+
+# ORA-00918: column ambiguously defined, ORA-01489: result of string
+# concatenation is too long. Both mean the hash expression cannot be built for
+# this result shape, not that the query is wrong.
+HASH_UNSUPPORTED_ERRORS = ("ORA-00918", "ORA-01489")
+
+
+class ServerHashUnsupported(Exception):
+    """The result shape cannot be hashed server-side; compare on the client instead."""
+
+
+def server_rows_match(cursor, ai_sql, gt_sql):
+    """
+    Check multiset equality of two results of equal row count with MINUS ALL.
+
+    When both results have the same number of rows, an empty `ai MINUS ALL gt`
+    means they contain exactly the same rows with the same multiplicities.
+    """
+    with span("execute", wrapper="minus"):
+        cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT * FROM ({ai_sql}) MINUS ALL SELECT * FROM ({gt_sql}))"
+        )
+        return cursor.fetchone()[0] == 0
+
+
+def _hash_column_expr(name, type_code):
+    column = '"' + name.replace('"', '""') + '"'
+    date_format = _DATE_FORMATS.get(getattr(type_code, "name", ""))
+    if date_format:
+        return f"NVL(TO_CHAR({column}, '{date_format}'), CHR(0))"
+    return f"NVL(RTRIM(TO_CHAR({column})), CHR(0))"
+
+
+def _check_hashable(description):
+    names = [col[0] for col in description]
+    if len(set(names)) != len(names):
+        raise ServerHashUnsupported("duplicate column names in result")
+
+
+def _raise_if_unsupported(error):
+    if any(code in str(error) for code in HASH_UNSUPPORTED_ERRORS):
+        raise ServerHashUnsupported(str(error)) from error
+
+
+def server_hash_sql(sql, description):
+    """Build the COUNT(*) / SUM(STANDARD_HASH) aggregate for a query with the given description."""
+    row_expr = " || CHR(31) || ".join(_hash_column_expr(col[0], col[1]) for col in description)
+    row_hash_expr = (
+        f"TO_NUMBER(RAWTOHEX(UTL_RAW.SUBSTR(STANDARD_HASH({row_expr}, 'MD5'), 1, 7)), 'XXXXXXXXXXXXXX')"
+    )
+    return f"SELECT COUNT(*), NVL(SUM({row_hash_expr}), 0) FROM ({sql})"
+
+
+def server_fingerprint(cursor, sql):
+    """
+    Fingerprint `sql` on the server with an aggregate hash (STANDARD_HASH + SUM).
+
+    Digests are only comparable with other server fingerprints. Raises
+    ServerHashUnsupported when the result shape cannot be hashed (duplicate
+    column names, rows too wide to concatenate).
+    """
+    cursor.parse(sql)
+    _check_hashable(cursor.description)
+    try:
+        with span("execute", wrapper="hash"):
+            cursor.execute(server_hash_sql(sql, cursor.description))
+            row_count, digest = cursor.fetchone()
+    except Exception as e:
+        _raise_if_unsupported(e)
+        raise
+    return ResultFingerprint(row_count, int(digest) % _DIGEST_MOD, "server")
+
+
+async def server_rows_match_async(cursor, ai_sql, gt_sql):
+    """Async version of server_rows_match."""
+    with span("execute", wrapper="minus"):
+        await cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT * FROM ({ai_sql}) MINUS ALL SELECT * FROM ({gt_sql}))"
+        )
+        row = await cursor.fetchone()
+    return row[0] == 0
+
+
+async def server_fingerprint_async(cursor, sql):
+    """Async version of server_fingerprint."""
+    await cursor.parse(sql)
+    _check_hashable(cursor.description)
+    try:
+        with span("execute", wrapper="hash"):
+            await cursor.execute(server_hash_sql(sql, cursor.description))
+            row_count, digest = await cursor.fetchone()
+    except Exception as e:
+        _raise_if_unsupported(e)
+        raise
+    return ResultFingerprint(row_count, int(digest) % _DIGEST_MOD, "server")
@@ -11,6 +11,148 @@ WALLET_PATH = os.getenv("ORACLE_WALLET_PATH", "/Users/sanjaymishra/downloads/Wal
 WALLET_PWD = os.getenv("ORACLE_WALLET_PWD")
 PROFILE = os.getenv("ORACLE_PROFILE", "EVAL_PROFILE")
 RESULTS_FILE = os.getenv("RESULTS_FILE", "TPCH_Exp_Results.csv")
+WORKERS = int(os.getenv("EVAL_WORKERS", "1"))
+ENGINE = os.getenv("EVAL_ENGINE", "sync")  # 'sync' or 'async'
+# Database backend: 'oracle' (Autonomous Database via python-oracledb) or 'offline'
+# (local SQLite stand-in with a simulated DBMS_CLOUD_AI.GENERATE, see offline_db.py)
+BACKEND = os.getenv("EVAL_BACKEND", "oracle")
 
-if not PASSWORD or not WALLET_PWD:
-    raise RuntimeError("Missing required environment variables: ORACLE_PASSWORD, ORACLE_WALLET_PWD. Set them in .env file.")
+# Result comparison in the accuracy experiment:
+# 'fingerprint' (stream all rows), 'count', 'minus' (server MINUS ALL) or 'hash' (server STANDARD_HASH)
+ACCURACY_COMPARE_MODE = os.getenv("ACCURACY_COMPARE_MODE", "fingerprint")
+
+# Streaming fetch tuning (accuracy fingerprints and latency timings)
+FETCH_ARRAYSIZE = int(os.getenv("FETCH_ARRAYSIZE", "1000"))
+FETCH_PREFETCHROWS = int(os.getenv("FETCH_PREFETCHROWS", "2"))
+# Client statement cache per connection (python-oracledb default is 20)
+STMT_CACHE_SIZE = int(os.getenv("STMT_CACHE_SIZE", "50"))
+
+# Opt-in on-disk cache for DBMS_CLOUD_AI.GENERATE results (disabled when path is empty)
+GENERATE_CACHE_PATH = os.getenv("GENERATE_CACHE_PATH", "")
+GENERATE_CACHE_TTL = int(os.getenv("GENERATE_CACHE_TTL", "0"))  # seconds, 0 = never expire
+GENERATE_CACHE_MAX_ENTRIES = int(os.getenv("GENERATE_CACHE_MAX_ENTRIES", "0"))  # 0 = unlimited
+GENERATE_CACHE_BYPASS_TIMING = os.getenv("GENERATE_CACHE_BYPASS_TIMING", "1") == "1"  # latency runs measure a cold LLM
+
+# Opt-in on-disk cache for ground-truth results and timings, invalidated when the data version changes
+GT_CACHE_PATH = os.getenv("GT_CACHE_PATH", "")
+
+# Per-query time budgets (seconds): BUDGET_MULTIPLIER x the ground-truth time from BUDGET_HISTORY_FILE,
+# clamped to [BUDGET_MIN, BUDGET_MAX]; BUDGET_DEFAULT for generated SQL without history
+BUDGET_MULTIPLIER = float(os.getenv("BUDGET_MULTIPLIER", "10"))
+BUDGET_MIN = float(os.getenv("BUDGET_MIN", "5"))
+BUDGET_MAX = float(os.getenv("BUDGET_MAX", "300"))
+BUDGET_DEFAULT = float(os.getenv("BUDGET_DEFAULT", "60"))
+BUDGET_HISTORY_FILE = os.getenv("BUDGET_HISTORY_FILE", "latency_results.csv")
+
+# Skip executing generated SQL whose canonical form equals the ground truth's (see sql_canon);
+# off by default, such matches count only toward semantic_match
+STATIC_EQUIVALENCE = os.getenv("STATIC_EQUIVALENCE", "0") == "1"
+
+# Plan capture and cost gate for generated SQL in the accuracy experiment:
+# 'off', 'record' (EXPLAIN only), 'cap' (run with at most PLAN_CAP_SECONDS) or 'skip' (do not run)
+# when the estimated cost exceeds PLAN_COST_MULTIPLE x the ground-truth plan
+PLAN_GATE = os.getenv("PLAN_GATE", "off")
+PLAN_COST_MULTIPLE = float(os.getenv("PLAN_COST_MULTIPLE", "100"))
+PLAN_CAP_SECONDS = float(os.getenv("PLAN_CAP_SECONDS", "10"))
+
+# Append-only Parquet run history (see run_history); disabled when empty.
+# Regressions: a latency percentile more than REGRESSION_LATENCY_PCT above, or a match
+# rate more than REGRESSION_RATE_DROP below, the median of the last REGRESSION_BASELINE_RUNS runs
+RUN_HISTORY_DIR = os.getenv("RUN_HISTORY_DIR", "")
+REGRESSION_BASELINE_RUNS = int(os.getenv("REGRESSION_BASELINE_RUNS", "5"))
+REGRESSION_LATENCY_PCT = float(os.getenv("REGRESSION_LATENCY_PCT", "0.2"))
+REGRESSION_RATE_DROP = float(os.getenv("REGRESSION_RATE_DROP", "0.05"))
+
+# Profile sweep (sweep_experiment.py): JSON spec with "base" attributes, a "vary"
+# matrix of attribute values and/or explicit "profiles"
+SWEEP_MATRIX = os.getenv("SWEEP_MATRIX", "sweep_matrix.json")
+
+# GENERATE scheduler (rate_limit.py): requests and estimated LLM tokens per minute
+# (0 = unlimited; tokens = prompt chars / 4 + GENERATE_TOKENS_PER_CALL), and retries with
+# full-jitter exponential back-off on provider throttling
+GENERATE_RPM = float(os.getenv("GENERATE_RPM", "0"))
+GENERATE_TPM = float(os.getenv("GENERATE_TPM", "0"))
+GENERATE_TOKENS_PER_CALL = int(os.getenv("GENERATE_TOKENS_PER_CALL", "1500"))
+GENERATE_MAX_RETRIES = int(os.getenv("GENERATE_MAX_RETRIES", "5"))
+GENERATE_BACKOFF_BASE = float(os.getenv("GENERATE_BACKOFF_BASE", "1.0"))  # seconds
+GENERATE_BACKOFF_MAX = float(os.getenv("GENERATE_BACKOFF_MAX", "60"))  # seconds
+
+# Span tracing (perf_counter_ns) written as JSONL; tracing is off when empty
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+# Per-query V$MYSTAT deltas (parse calls per execution, i.e. client statement cache
+# effectiveness) added to result rows; always on while tracing, otherwise opt-in since
+# the two stats reads add round trips to every timed query
+QUERY_SESSION_STATS = os.getenv("QUERY_SESSION_STATS", "0") == "1"
+
+# Harness micro-benchmarks (python -m benchmarks): synthetic result sets up to MICROBENCH_MAX_ROWS rows,
+# each case timed for at least MICROBENCH_MIN_TIME seconds. Results are JSON files in MICROBENCH_DIR;
+# a case regresses when its median grows by more than MICROBENCH_TOLERANCE (fraction) over
+# MICROBENCH_BASELINE (default: the newest earlier results file)
+MICROBENCH_MAX_ROWS = int(os.getenv("MICROBENCH_MAX_ROWS", "1000000"))
+MICROBENCH_MIN_TIME = float(os.getenv("MICROBENCH_MIN_TIME", "1.0"))
+MICROBENCH_DIR = os.getenv("MICROBENCH_DIR", "benchmarks/results")
+MICROBENCH_BASELINE = os.getenv("MICROBENCH_BASELINE", "")
+MICROBENCH_TOLERANCE = float(os.getenv("MICROBENCH_TOLERANCE", "0.2"))
+
+# Latency benchmark mode: unrecorded warm-up rounds, then measured rounds in shuffled order.
+# BENCH_REPETITIONS > 1 makes main.py run the benchmark instead of the single-pass latency test.
+BENCH_WARMUP = int(os.getenv("BENCH_WARMUP", "1"))
+BENCH_REPETITIONS = int(os.getenv("BENCH_REPETITIONS", "1"))
+BENCH_SEED = int(os.getenv("BENCH_SEED")) if os.getenv("BENCH_SEED") else None
+BENCH_BOOTSTRAP = int(os.getenv("BENCH_BOOTSTRAP", "2000"))  # bootstrap resamples per CI
+
+# Load generator (load_experiment.py): 'open' = Poisson arrivals at LOAD_RATE req/s,
+# 'closed' = LOAD_USERS virtual users with exponential think time
+LOAD_MODE = os.getenv("LOAD_MODE", "open")
+LOAD_RATE = float(os.getenv("LOAD_RATE", "1.0"))
+LOAD_USERS = int(os.getenv("LOAD_USERS", "4"))
+LOAD_DURATION = float(os.getenv("LOAD_DURATION", "60"))  # seconds
+LOAD_THINK_TIME = float(os.getenv("LOAD_THINK_TIME", "0"))  # mean seconds, closed loop only
+LOAD_WINDOW = float(os.getenv("LOAD_WINDOW", "10"))  # seconds per timeline bucket
+
+# data_setup.py: chunks generated ahead of the inserting thread (0 = generate inline)
+SETUP_PREFETCH_CHUNKS = int(os.getenv("SETUP_PREFETCH_CHUNKS", "2"))
+# data_setup.py: worker processes for parallel loading (1 = serial load on one connection)
+SETUP_WORKERS = int(os.getenv("SETUP_WORKERS", "1"))
+# data_setup.py: 'rows' (Python tuples per row) or 'numpy' (vectorized column batches)
+SETUP_GENERATOR = os.getenv("SETUP_GENERATOR", "rows")
+SETUP_BATCH_ROWS = int(os.getenv("SETUP_BATCH_ROWS", "50000"))  # keys per column batch
+SETUP_INGEST = os.getenv("SETUP_INGEST", "executemany")  # numpy batches: 'executemany' or 'direct_path'
+SETUP_SEED = int(os.getenv("SETUP_SEED", "42"))  # seed for numpy-generated comments
+# data_setup.py: TPC-H-style scale factor (1 = 4M LINEITEM rows), rows per committed checkpoint unit
+# (must not change between a load and its resume), and SETUP_RESET=1 to truncate and reload instead of
+# resuming / topping up from LOAD_CHECKPOINT (a scale top-up is refused once ORDERS, LINEITEM or
+# PARTSUPP have rows, as their foreign keys depend on the scale)
+SETUP_SCALE = float(os.getenv("SETUP_SCALE", "0.01" if BACKEND == "offline" else "1"))
+SETUP_CHECKPOINT_ROWS = int(os.getenv("SETUP_CHECKPOINT_ROWS", "100000"))
+SETUP_RESET = os.getenv("SETUP_RESET", "0") == "1"
+# Physical-design profile (baseline, stats, indexes, inmemory) applied by data_setup.py after loading; empty = none
+SETUP_DESIGN_PROFILE = os.getenv("SETUP_DESIGN_PROFILE", "")
+
+# Physical-design benchmark (design_experiment.py): profiles compared against the first one
+DESIGN_PROFILES = os.getenv("DESIGN_PROFILES", "baseline,stats,indexes,inmemory").split(",")
+DESIGN_QUERY_TIMEOUT = int(os.getenv("DESIGN_QUERY_TIMEOUT", "300"))  # seconds per ground-truth execution
+DESIGN_INMEMORY_WAIT = int(os.getenv("DESIGN_INMEMORY_WAIT", "600"))  # seconds to wait for In-Memory population
+
+# Offline backend (offline_db.py): SQLite database built on first use from data_setup's generators at
+# SETUP_SCALE (default 0.01 offline) plus the questions in OFFLINE_QUERIES_FILE. Simulated GENERATE
+# latency is drawn from OFFLINE_GENERATE_DIST ('lognormal' with median OFFLINE_GENERATE_MS and
+# OFFLINE_GENERATE_SIGMA, 'exponential' with that mean, or 'fixed'); each call independently fails
+# with a throttle or other error, returns wrong SQL, or returns an equivalent rewrite of the ground
+# truth with the given probabilities. Profiles may override these per profile (see offline_db.py).
+OFFLINE_DB_PATH = os.getenv("OFFLINE_DB_PATH", "offline_tpch.db")
+OFFLINE_QUERIES_FILE = os.getenv("OFFLINE_QUERIES_FILE", "TPCH_22_QUERIES.txt")
+OFFLINE_SEED = int(os.getenv("OFFLINE_SEED", "42"))
+OFFLINE_GENERATE_DIST = os.getenv("OFFLINE_GENERATE_DIST", "lognormal")
+OFFLINE_GENERATE_MS = float(os.getenv("OFFLINE_GENERATE_MS", "800"))
+OFFLINE_GENERATE_SIGMA = float(os.getenv("OFFLINE_GENERATE_SIGMA", "0.5"))
+OFFLINE_THROTTLE_RATE = float(os.getenv("OFFLINE_THROTTLE_RATE", "0"))
+OFFLINE_ERROR_RATE = float(os.getenv("OFFLINE_ERROR_RATE", "0"))
+OFFLINE_WRONG_RATE = float(os.getenv("OFFLINE_WRONG_RATE", "0.1"))
+OFFLINE_REWRITE_RATE = float(os.getenv("OFFLINE_REWRITE_RATE", "0.5"))
+
+
+def require_credentials():
+    """Raise when the Oracle credentials are missing; checked when connecting, not at import."""
+    if not PASSWORD or not WALLET_PWD:
+        raise RuntimeError("Missing required environment variables: ORACLE_PASSWORD, ORACLE_WALLET_PWD. Set them in .env file.")
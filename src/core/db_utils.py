@@ -1,23 +1,152 @@
 # db_utils.py
-import oracledb
+import time
 from . import config
+from .tracing import span
 
 
-def get_connection():
-    conn = oracledb.connect(
+def _driver():
+    """DB-API module behind every connection: python-oracledb, or the offline stand-in (EVAL_BACKEND)."""
+    if config.BACKEND == "offline":
+        from . import offline_db
+        return offline_db
+    import oracledb  # imported on first use: it adds ~0.1s to every start-up otherwise
+    return oracledb
+
+
+def _connect_params():
+    if config.BACKEND == "offline":
+        return dict(path=config.OFFLINE_DB_PATH)
+    config.require_credentials()
+    return dict(
         user=config.USER,
         password=config.PASSWORD,
         dsn=config.DSN,
         config_dir=config.WALLET_PATH,
         wallet_location=config.WALLET_PATH,
         wallet_password=config.WALLET_PWD,
+        stmtcachesize=config.STMT_CACHE_SIZE,
     )
 
-    def return_as_string(cursor, name, default_type, size, precision, scale):
-        if default_type == oracledb.DB_TYPE_CLOB:
-            return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
-        if default_type == oracledb.DB_TYPE_BLOB:
-            return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
 
+def return_as_string(cursor, name, default_type, size, precision, scale):
+    import oracledb  # only python-oracledb calls output type handlers, so it is already loaded
+    if default_type == oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if default_type == oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+
+def get_connection():
+    conn = _driver().connect(**_connect_params())
+    conn.outputtypehandler = return_as_string
+    return conn
+
+
+def get_pool(size, session_callback=None):
+    """
+    Create a fixed-size connection pool with `size` sessions.
+
+    `session_callback(connection, requested_tag)` runs once for every newly
+    created session, which is where per-session setup such as
+    DBMS_CLOUD_AI.SET_PROFILE belongs.
+    """
+    return _driver().create_pool(
+        min=size,
+        max=size,
+        increment=0,
+        session_callback=session_callback,
+        **_connect_params(),
+    )
+
+
+def acquire_connection(pool):
+    """Acquire a pooled connection with the same output handlers as get_connection()."""
+    conn = pool.acquire()
+    conn.outputtypehandler = return_as_string
+    return conn
+
+
+async def get_async_connection():
+    """Async counterpart of get_connection() built on oracledb.connect_async."""
+    conn = await _driver().connect_async(**_connect_params())
     conn.outputtypehandler = return_as_string
     return conn
+
+
+def get_async_pool(size):
+    """Create a fixed-size oracledb.AsyncConnectionPool with `size` sessions."""
+    return _driver().create_pool_async(
+        min=size,
+        max=size,
+        increment=0,
+        **_connect_params(),
+    )
+
+
+def _value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return 8
+
+
+def _finish_stream(start, first, end, rows, nbytes):
+    total_s = end - start
+    return {
+        'ttfr_ms': ((first if first is not None else end) - start) * 1000,
+        'ttlr_ms': total_s * 1000,
+        'rows': rows,
+        'rows_per_sec': rows / total_s if total_s > 0 else 0.0,
+        'bytes': nbytes,
+    }
+
+
+def stream_query(cursor, sql, arraysize=None, prefetchrows=None):
+    """
+    Execute `sql` and stream the result with fetchmany, keeping one batch in memory.
+
+    Returns time-to-first-row and time-to-last-row in ms (both measured from
+    the execute call), row count, rows/sec and approximate bytes fetched
+    (string/bytes lengths, 8 bytes for other non-null values).
+    """
+    cursor.arraysize = arraysize or config.FETCH_ARRAYSIZE
+    cursor.prefetchrows = prefetchrows if prefetchrows is not None else config.FETCH_PREFETCHROWS
+    rows = nbytes = 0
+    first = None
+    start = time.perf_counter()
+    with span("execute"):
+        cursor.execute(sql)
+    with span("fetch", arraysize=cursor.arraysize) as fetch_span:
+        while True:
+            batch = cursor.fetchmany()
+            if not batch:
+                break
+            if first is None:
+                first = time.perf_counter()
+            rows += len(batch)
+            nbytes += sum(_value_size(v) for row in batch for v in row)
+        fetch_span.set(rows=rows, bytes=nbytes)
+    return _finish_stream(start, first, time.perf_counter(), rows, nbytes)
+
+
+async def stream_query_async(cursor, sql, arraysize=None, prefetchrows=None):
+    """Async version of stream_query."""
+    cursor.arraysize = arraysize or config.FETCH_ARRAYSIZE
+    cursor.prefetchrows = prefetchrows if prefetchrows is not None else config.FETCH_PREFETCHROWS
+    rows = nbytes = 0
+    first = None
+    start = time.perf_counter()
+    with span("execute"):
+        await cursor.execute(sql)
+    with span("fetch", arraysize=cursor.arraysize) as fetch_span:
+        while True:
+            batch = await cursor.fetchmany()
+            if not batch:
+                break
+            if first is None:
+                first = time.perf_counter()
+            rows += len(batch)
+            nbytes += sum(_value_size(v) for row in batch for v in row)
+        fetch_span.set(rows=rows, bytes=nbytes)
+    return _finish_stream(start, first, time.perf_counter(), rows, nbytes)
@@ -0,0 +1,197 @@
+# generate_cache.py
+import time
+import sqlite3
+import hashlib
+import threading
+import contextvars
+
+from . import config
+from .rate_limit import begin_generate_call, scheduled_generate_select_ai_sql, scheduled_generate_select_ai_sql_async
+
+PROFILE_ATTRIBUTES_SQL = (
+    "SELECT attribute_name, attribute_value FROM USER_CLOUD_AI_PROFILE_ATTRIBUTES "
+    "WHERE profile_name = :profile_name ORDER BY attribute_name"
+)
+
+# Profile set on the sessions of the current thread or task, used for cache
+# keys when GENERATE runs without an explicit profile_name (see sweep_experiment).
+session_profile = contextvars.ContextVar("session_profile", default=None)
+
+
+class GenerateCache:
+    """
+    Persistent SQLite cache for DBMS_CLOUD_AI.GENERATE results.
+
+    Entries are keyed by profile name, profile attributes, prompt and action.
+    `ttl_seconds` expires old entries and `max_entries` evicts the least
+    recently used ones (0 disables either limit). Hit/miss/bypass counters are
+    kept per process.
+    """
+
+    def __init__(self, path, ttl_seconds=0, max_entries=0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self._attributes = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS generate_cache ("
+            "cache_key TEXT PRIMARY KEY, profile_name TEXT, action TEXT, prompt TEXT, "
+            "result TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(profile_name, attributes, prompt, action):
+        raw = "\x1f".join([profile_name or "", attributes or "", prompt, action])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, created_at FROM generate_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE generate_cache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, profile_name, prompt, action, result):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO generate_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, profile_name, action, prompt, result, now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            self._db.execute("DELETE FROM generate_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries:
+            self._db.execute(
+                "DELETE FROM generate_cache WHERE cache_key NOT IN "
+                "(SELECT cache_key FROM generate_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM generate_cache")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM generate_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "bypasses": self.bypasses, "entries": entries}
+
+    def profile_attributes(self, cursor, profile_name):
+        """Return the profile's attributes as one string (memoized per process)."""
+        if profile_name not in self._attributes:
+            try:
+                cursor.execute(PROFILE_ATTRIBUTES_SQL, {"profile_name": profile_name})
+                self._attributes[profile_name] = ";".join(f"{k}={v}" for k, v in cursor.fetchall())
+            except Exception:
+                self._attributes[profile_name] = ""
+        return self._attributes[profile_name]
+
+    async def profile_attributes_async(self, cursor, profile_name):
+        """Async version of profile_attributes."""
+        if profile_name not in self._attributes:
+            try:
+                await cursor.execute(PROFILE_ATTRIBUTES_SQL, {"profile_name": profile_name})
+                rows = await cursor.fetchall()
+                self._attributes[profile_name] = ";".join(f"{k}={v}" for k, v in rows)
+            except Exception:
+                self._attributes[profile_name] = ""
+        return self._attributes[profile_name]
+
+    def generate(self, cursor, prompt, action="showsql", profile_name=None, bypass=False):
+        """
+        Cached generate_select_ai_sql. Returns (sql, cache_hit).
+
+        With `bypass=True` the lookup is skipped so the LLM is always called;
+        the fresh result still refreshes the cache entry.
+        """
+        requested_profile = profile_name
+        profile_name = profile_name or session_profile.get() or config.PROFILE
+        key = self.make_key(profile_name, self.profile_attributes(cursor, profile_name), prompt, action)
+        if bypass:
+            self.bypasses += 1
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, True
+        result = scheduled_generate_select_ai_sql(cursor, prompt, action=action, profile_name=requested_profile)
+        if result is not None:
+            self.put(key, profile_name, prompt, action, result)
+        return result, False
+
+    async def generate_async(self, cursor, prompt, action="showsql", profile_name=None, bypass=False):
+        """Async version of generate."""
+        requested_profile = profile_name
+        profile_name = profile_name or session_profile.get() or config.PROFILE
+        attributes = await self.profile_attributes_async(cursor, profile_name)
+        key = self.make_key(profile_name, attributes, prompt, action)
+        if bypass:
+            self.bypasses += 1
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, True
+        result = await scheduled_generate_select_ai_sql_async(cursor, prompt, action=action, profile_name=requested_profile)
+        if result is not None:
+            self.put(key, profile_name, prompt, action, result)
+        return result, False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_generate_cache():
+    """Return the process-wide cache configured by GENERATE_CACHE_PATH, or None when disabled."""
+    global _cache
+    if not config.GENERATE_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = GenerateCache(
+                config.GENERATE_CACHE_PATH,
+                ttl_seconds=config.GENERATE_CACHE_TTL,
+                max_entries=config.GENERATE_CACHE_MAX_ENTRIES,
+            )
+    return _cache
+
+
+def cached_generate_select_ai_sql(cursor, prompt, action="showsql", bypass=False):
+    """
+    generate_select_ai_sql through the configured cache. Returns (sql, cache_hit).
+
+    Falls through to a direct GENERATE call when caching is disabled. Calls
+    go through the rate-limit scheduler; rate_limit.current_generate_call()
+    afterwards reports the wait and retries of this call.
+    """
+    begin_generate_call()
+    cache = get_generate_cache()
+    if cache is None:
+        return scheduled_generate_select_ai_sql(cursor, prompt, action=action), False
+    return cache.generate(cursor, prompt, action=action, bypass=bypass)
+
+
+async def cached_generate_select_ai_sql_async(cursor, prompt, action="showsql", bypass=False):
+    """Async version of cached_generate_select_ai_sql."""
+    begin_generate_call()
+    cache = get_generate_cache()
+    if cache is None:
+        return await scheduled_generate_select_ai_sql_async(cursor, prompt, action=action), False
+    return await cache.generate_async(cursor, prompt, action=action, bypass=bypass)
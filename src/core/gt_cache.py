@@ -0,0 +1,207 @@
+# gt_cache.py
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from . import config
+from .compare_utils import ResultFingerprint
+
+# Any DDL in the schema (truncate/reload, index changes) moves the first two
+# values; resumed or topped-up loads by data_setup move the checkpoint totals.
+SCHEMA_VERSION_SQL = (
+    "SELECT TO_CHAR(MAX(last_ddl_time), 'YYYYMMDDHH24MISS'), COUNT(*) FROM USER_OBJECTS "
+    "WHERE object_type IN ('TABLE', 'INDEX')"
+)
+CHECKPOINT_VERSION_SQL = (
+    "SELECT COUNT(*), NVL(SUM(row_count), 0), TO_CHAR(MAX(loaded_at), 'YYYYMMDDHH24MISSFF6') FROM LOAD_CHECKPOINT"
+)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and drop trailing semicolons so formatting changes keep the same key."""
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+
+def read_data_version(cursor):
+    """Token that changes whenever the schema's data changes (DDL or checkpointed loads)."""
+    cursor.execute(SCHEMA_VERSION_SQL)
+    parts = [str(v) for v in cursor.fetchone()]
+    try:
+        cursor.execute(CHECKPOINT_VERSION_SQL)
+        parts += [str(v) for v in cursor.fetchone()]
+    except Exception:
+        pass  # schema loaded before LOAD_CHECKPOINT existed
+    return ":".join(parts)
+
+
+async def read_data_version_async(cursor):
+    """Async version of read_data_version."""
+    await cursor.execute(SCHEMA_VERSION_SQL)
+    parts = [str(v) for v in await cursor.fetchone()]
+    try:
+        await cursor.execute(CHECKPOINT_VERSION_SQL)
+        parts += [str(v) for v in await cursor.fetchone()]
+    except Exception:
+        pass
+    return ":".join(parts)
+
+
+class GroundTruthCache:
+    """
+    Persistent SQLite store for ground-truth query results.
+
+    Entries are keyed by normalized SQL, a result kind (e.g. the accuracy
+    compare mode, or 'stream' for latency timings) and the data version of the
+    schema. Entries of other data versions are purged the first time the
+    version is read, so a reload invalidates the cache automatically.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data_version = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS gt_cache ("
+            "cache_key TEXT PRIMARY KEY, data_version TEXT, kind TEXT, sql TEXT, result TEXT, created_at REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(data_version, kind, sql):
+        raw = "\x1f".join([data_version, kind, normalize_sql(sql)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT result FROM gt_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key, data_version, kind, sql, result):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO gt_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data_version, kind, normalize_sql(sql), json.dumps(result), time.time()),
+            )
+            self._db.commit()
+
+    def _set_data_version(self, version):
+        with self._lock:
+            if self._data_version is None:
+                deleted = self._db.execute("DELETE FROM gt_cache WHERE data_version <> ?", (version,)).rowcount
+                self._db.commit()
+                if deleted:
+                    print(f"Ground-truth cache: data changed, dropped {deleted} stale entries")
+                self._data_version = version
+        return self._data_version
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM gt_cache")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM gt_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "data_version": self._data_version}
+
+    def data_version(self, cursor):
+        """Return the schema's data version token (read once per process)."""
+        if self._data_version is None:
+            self._set_data_version(read_data_version(cursor))
+        return self._data_version
+
+    async def data_version_async(self, cursor):
+        """Async version of data_version."""
+        if self._data_version is None:
+            self._set_data_version(await read_data_version_async(cursor))
+        return self._data_version
+
+    def fetch(self, cursor, sql, kind, compute, encode=None, decode=None):
+        """
+        Return (result, cache_hit) for `compute(cursor, sql)` under `kind`.
+
+        `encode`/`decode` convert the result to and from a JSON-compatible value.
+        """
+        version = self.data_version(cursor)
+        key = self.make_key(version, kind, sql)
+        cached = self.get(key)
+        if cached is not None:
+            return (decode(cached) if decode else cached), True
+        result = compute(cursor, sql)
+        self.put(key, version, kind, sql, encode(result) if encode else result)
+        return result, False
+
+    async def fetch_async(self, cursor, sql, kind, compute, encode=None, decode=None):
+        """Async version of fetch; `compute` is a coroutine function."""
+        version = await self.data_version_async(cursor)
+        key = self.make_key(version, kind, sql)
+        cached = self.get(key)
+        if cached is not None:
+            return (decode(cached) if decode else cached), True
+        result = await compute(cursor, sql)
+        self.put(key, version, kind, sql, encode(result) if encode else result)
+        return result, False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_gt_cache():
+    """Return the process-wide cache configured by GT_CACHE_PATH, or None when disabled."""
+    global _cache
+    if not config.GT_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = GroundTruthCache(config.GT_CACHE_PATH)
+    return _cache
+
+
+def cached_gt_fingerprint(cursor, gt_sql, collect):
+    """
+    `collect(cursor, gt_sql)` through the ground-truth cache. Returns (fingerprint, cache_hit).
+
+    Entries are kept per ACCURACY_COMPARE_MODE, since each mode builds a
+    different kind of fingerprint.
+    """
+    cache = get_gt_cache()
+    if cache is None:
+        return collect(cursor, gt_sql), False
+    return cache.fetch(cursor, gt_sql, f"fingerprint:{config.ACCURACY_COMPARE_MODE}", collect,
+                       ResultFingerprint.as_dict, ResultFingerprint.from_dict)
+
+
+async def cached_gt_fingerprint_async(cursor, gt_sql, collect):
+    """Async version of cached_gt_fingerprint."""
+    cache = get_gt_cache()
+    if cache is None:
+        return await collect(cursor, gt_sql), False
+    return await cache.fetch_async(cursor, gt_sql, f"fingerprint:{config.ACCURACY_COMPARE_MODE}", collect,
+                                   ResultFingerprint.as_dict, ResultFingerprint.from_dict)
+
+
+def cached_gt_stream(cursor, gt_sql, stream):
+    """`stream(cursor, gt_sql)` fetch statistics through the ground-truth cache. Returns (stats, cache_hit)."""
+    cache = get_gt_cache()
+    if cache is None:
+        return stream(cursor, gt_sql), False
+    return cache.fetch(cursor, gt_sql, "stream", stream)
+
+
+async def cached_gt_stream_async(cursor, gt_sql, stream):
+    """Async version of cached_gt_stream."""
+    cache = get_gt_cache()
+    if cache is None:
+        return await stream(cursor, gt_sql), False
+    return await cache.fetch_async(cursor, gt_sql, "stream", stream)
@@ -0,0 +1,768 @@
+# offline_db.py
+import os
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from . import config
+from .gt_cache import normalize_sql
+
+try:
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.errors import ErrorLevel
+    from .sql_canon import _conjuncts, _rownum_limit, _set_where
+except ImportError:  # optional; without it only a few Oracle constructs are rewritten with regexes
+    sqlglot = None
+
+# Offline stand-in for python-oracledb (see db_utils._driver): the same
+# connect / create_pool / connect_async / create_pool_async entry points, with
+# connections backed by a local SQLite copy of the TPC-H schema. Statements the
+# harness sends to Autonomous Database are served as follows:
+#
+#   DBMS_CLOUD_AI.GENERATE        simulated: seeded latency, errors and answers
+#   DBMS_CLOUD_AI.SET_PROFILE     sets the connection's profile
+#   DBMS_CLOUD_AI.CREATE_PROFILE  stored in USER_CLOUD_AI_PROFILES / _ATTRIBUTES
+#   DBMS_SESSION.SET_TIME_LIMIT   ignored (call_timeout and cancel() do work)
+#   SELECT ...                    translated from Oracle to SQLite and executed
+#
+# EXPLAIN PLAN, V$ views, MINUS ALL and STANDARD_HASH have no stand-in, so the
+# plan gate, session statistics and the 'minus' / 'hash' compare modes report
+# errors offline.
+
+# Same codes as the real driver, so budget_utils and rate_limit classify them alike
+_TIMEOUT_MESSAGE = "DPY-4024: call timeout of {} ms exceeded"
+_CANCEL_MESSAGE = "ORA-01013: user requested cancel of current operation"
+_THROTTLE_MESSAGE = "ORA-20429: Request failed with status 429 - Too Many Requests (simulated)"
+_ERROR_MESSAGE = "ORA-20500: Request failed with status 500 - Internal Server Error (simulated)"
+
+_GENERATE_RE = re.compile(r"\bDBMS_CLOUD_AI\.GENERATE\s*\(", re.IGNORECASE)
+_PLSQL_RE = re.compile(r"^(BEGIN|DECLARE)\b", re.IGNORECASE)
+
+# Generated data has no time of day, so dates are stored as 'YYYY-MM-DD' text,
+# which compares correctly with the date literals the translation produces.
+BASE_DATE = datetime(1996, 1, 1)
+
+_CATALOG_SQL = """
+CREATE TABLE USER_CLOUD_AI_PROFILES (PROFILE_NAME TEXT PRIMARY KEY, STATUS TEXT, DESCRIPTION TEXT);
+CREATE TABLE USER_CLOUD_AI_PROFILE_ATTRIBUTES (PROFILE_NAME TEXT, ATTRIBUTE_NAME TEXT, ATTRIBUTE_VALUE TEXT,
+    PRIMARY KEY (PROFILE_NAME, ATTRIBUTE_NAME));
+CREATE TABLE USER_OBJECTS (OBJECT_NAME TEXT, OBJECT_TYPE TEXT, LAST_DDL_TIME TEXT);
+CREATE TABLE DUAL (DUMMY TEXT);
+INSERT INTO DUAL VALUES ('X');
+"""
+
+# Profile attributes that override the OFFLINE_* settings for GENERATE calls made with that profile
+PROFILE_SETTINGS = {
+    "generate_dist": ("OFFLINE_GENERATE_DIST", str),
+    "generate_ms": ("OFFLINE_GENERATE_MS", float),
+    "generate_sigma": ("OFFLINE_GENERATE_SIGMA", float),
+    "throttle_rate": ("OFFLINE_THROTTLE_RATE", float),
+    "error_rate": ("OFFLINE_ERROR_RATE", float),
+    "wrong_rate": ("OFFLINE_WRONG_RATE", float),
+    "rewrite_rate": ("OFFLINE_REWRITE_RATE", float),
+}
+
+
+class DatabaseError(Exception):
+    """Error from the offline backend; timeouts and cancels carry the driver's codes."""
+
+
+# Database build --------------------------------------------------------------
+
+_QUESTION_RE = re.compile(r"^Q(\d+):\s*(.+)$")
+_GROUND_TRUTH_RE = re.compile(r"^Ground Truth:\s*(.+)$")
+_SECTION_RE = re.compile(r"^--\s*(\w+) Queries", re.IGNORECASE)
+
+
+def parse_test_queries(path):
+    """[(query_id, nl_question, ground_truth_sql, complexity)] from a TPCH_22_QUERIES.txt-style file."""
+    queries = []
+    complexity = question = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            section = _SECTION_RE.match(line)
+            if section:
+                complexity = section.group(1).lower()
+                continue
+            match = _QUESTION_RE.match(line)
+            if match:
+                question = (int(match.group(1)), match.group(2).strip())
+                continue
+            match = _GROUND_TRUTH_RE.match(line)
+            if match and question:
+                queries.append((*question, match.group(1).strip(), complexity))
+                question = None
+    return queries
+
+
+def _sqlite_value(value):
+    return value.strftime("%Y-%m-%d") if isinstance(value, datetime) else value
+
+
+def build_database(path):
+    """
+    Create the offline database at `path` (replacing any existing one).
+
+    Tables come from data_setup (CREATE_TABLES_SQL and the row generators at
+    SETUP_SCALE, dates counted from BASE_DATE), the test queries from
+    OFFLINE_QUERIES_FILE, and config.PROFILE is registered as a profile.
+    """
+    import data_setup
+
+    building = f"{path}.{os.getpid()}.building"
+    if os.path.exists(building):
+        os.remove(building)
+    db = sqlite3.connect(building)
+    try:
+        for statement in data_setup.CREATE_TABLES_SQL.split(";"):
+            if statement.strip():
+                db.execute(statement.replace("SYSTIMESTAMP", "CURRENT_TIMESTAMP"))
+        db.executescript(_CATALOG_SQL)
+        built_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for table, (columns, _, generate, _, _, _) in data_setup.TABLES.items():
+            keys = data_setup.table_keys(table)
+            marks = ", ".join("?" * len(columns.split(",")))
+            db.executemany(f"INSERT INTO {table} ({columns}) VALUES ({marks})",
+                           (tuple(_sqlite_value(v) for v in row) for row in generate(keys, BASE_DATE)))
+            db.execute(
+                "INSERT INTO LOAD_CHECKPOINT (TABLE_NAME, CHUNK_START, CHUNK_STOP, ROW_COUNT, SCALE_FACTOR, BASE_DATE) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (table, keys.start, keys.stop, len(keys), config.SETUP_SCALE, _sqlite_value(BASE_DATE)),
+            )
+            db.execute("INSERT INTO USER_OBJECTS VALUES (?, 'TABLE', ?)", (table, built_at))
+            print(f"Offline database: {table} {len(keys):,} rows")
+        db.executemany("INSERT INTO NL_SQL_TEST_QUERIES (query_id, nl_question, ground_truth_sql, complexity) "
+                       "VALUES (?, ?, ?, ?)", parse_test_queries(config.OFFLINE_QUERIES_FILE))
+        _store_profile(db, config.PROFILE, {"provider": "offline"}, "Offline Select AI stand-in")
+        db.execute("PRAGMA journal_mode=WAL")
+        db.commit()
+    finally:
+        db.close()
+    os.replace(building, path)
+
+
+def _is_current(path):
+    """True when `path` holds an offline database built at the configured SETUP_SCALE."""
+    if not os.path.exists(path):
+        return False
+    try:
+        db = sqlite3.connect(path)
+        try:
+            scales = {row[0] for row in db.execute("SELECT DISTINCT SCALE_FACTOR FROM LOAD_CHECKPOINT")}
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return False
+    return scales == {config.SETUP_SCALE}
+
+
+def _store_profile(db, name, attributes, description=None):
+    db.execute("INSERT OR REPLACE INTO USER_CLOUD_AI_PROFILES VALUES (?, 'ENABLED', ?)", (name, description))
+    db.execute("DELETE FROM USER_CLOUD_AI_PROFILE_ATTRIBUTES WHERE PROFILE_NAME = ?", (name,))
+    db.executemany(
+        "INSERT INTO USER_CLOUD_AI_PROFILE_ATTRIBUTES VALUES (?, ?, ?)",
+        [(name, key, value if isinstance(value, str) else json.dumps(value)) for key, value in attributes.items()],
+    )
+
+
+# Oracle -> SQLite translation -------------------------------------------------
+
+_DATE_TOKENS = {"YYYY": "%Y", "HH24": "%H", "MM": "%m", "DD": "%d", "MI": "%M", "SS": "%S"}
+_DATE_TOKEN_RE = re.compile(r"YYYY|HH24|MM|DD|MI|SS|FF\d?")
+_EXTRACT_UNITS = {"YEAR": "%Y", "MONTH": "%m", "DAY": "%d", "HOUR": "%H", "MINUTE": "%M", "SECOND": "%S"}
+
+
+def _strftime(fmt, value, integer=False):
+    call = exp.Anonymous(this="STRFTIME", expressions=[exp.Literal.string(fmt), value])
+    return exp.Cast(this=call, to=exp.DataType.build("INT")) if integer else call
+
+
+def _to_sqlite(node):
+    """Rewrite one Oracle-only construct into its SQLite equivalent (sqlglot transform)."""
+    if isinstance(node, (exp.StrToDate, exp.StrToTime)):
+        fmt = node.args.get("format")
+        with_time = fmt is not None and "%H" in fmt.name
+        return exp.Anonymous(this="DATETIME" if with_time else "DATE", expressions=[node.this])
+    if isinstance(node, exp.Extract) and node.this.name.upper() in _EXTRACT_UNITS:
+        return _strftime(_EXTRACT_UNITS[node.this.name.upper()], node.expression, integer=True)
+    if isinstance(node, exp.ToChar) and node.args.get("format") is not None:
+        fmt = node.args["format"].name.upper()
+        if not _DATE_TOKEN_RE.search(fmt):
+            node.set("format", None)
+            return node
+        return _strftime(_DATE_TOKEN_RE.sub(lambda m: _DATE_TOKENS.get(m.group(0), "%f"), fmt), node.this)
+    if isinstance(node, exp.Select) and node.args.get("where") and not any(
+        node.args.get(k) for k in ("order", "group", "limit")
+    ):
+        # ROWNUM is assigned before ORDER BY, so only unordered blocks map onto LIMIT
+        conditions = _conjuncts(node.args["where"].this)
+        for condition in conditions:
+            limit = _rownum_limit(condition)
+            if limit is not None:
+                _set_where(node, [c for c in conditions if c is not condition])
+                return node.limit(limit, copy=False)
+    return node
+
+
+_FETCH_FIRST_RE = re.compile(r"\bFETCH\s+FIRST\s+(\d+)\s+ROWS?\s+ONLY\b", re.IGNORECASE)
+_TO_DATE_RE = re.compile(r"\bTO_DATE\s*\(\s*('[^']*')\s*,\s*'[^']*'\s*\)", re.IGNORECASE)
+_EXTRACT_RE = re.compile(r"\bEXTRACT\s*\(\s*(YEAR|MONTH|DAY)\s+FROM\s+([\w.]+)\s*\)", re.IGNORECASE)
+
+
+def _regex_translate(sql):
+    sql = _FETCH_FIRST_RE.sub(r"LIMIT \1", sql)
+    sql = _TO_DATE_RE.sub(r"DATE(\1)", sql)
+    sql = _EXTRACT_RE.sub(lambda m: f"CAST(STRFTIME('{_EXTRACT_UNITS[m.group(1).upper()]}', {m.group(2)}) AS INT)", sql)
+    return re.sub(r"\bNVL\s*\(", "IFNULL(", sql, flags=re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """
+    SQLite text for an Oracle query (memoized).
+
+    With sqlglot the statement is transpiled, after rewriting TO_DATE, EXTRACT,
+    TO_CHAR date formats and ROWNUM limits; constructs SQLite cannot express
+    raise DatabaseError. Without sqlglot, or when the statement does not parse,
+    FETCH FIRST, TO_DATE, EXTRACT and NVL are rewritten textually.
+    """
+    sql = normalize_sql(sql)
+    if sqlglot is None:
+        return _regex_translate(sql)
+    try:
+        tree = sqlglot.parse_one(sql, read="oracle")
+    except sqlglot.errors.ParseError:
+        return _regex_translate(sql)
+    try:
+        return tree.transform(_to_sqlite, copy=False).sql(dialect="sqlite", unsupported_level=ErrorLevel.RAISE)
+    except sqlglot.errors.UnsupportedError as e:
+        raise DatabaseError(f"offline backend cannot run this statement: {e}") from None
+
+
+# Simulated GENERATE -----------------------------------------------------------
+
+class GenerateOutcome:
+    """What one simulated GENERATE call does: how long it takes, then its error or SQL text."""
+
+    __slots__ = ("delay", "error", "text")
+
+    def __init__(self, delay, error=None, text=None):
+        self.delay = delay
+        self.error = error
+        self.text = text
+
+
+def _latency_ms(rng, settings):
+    mean = settings["OFFLINE_GENERATE_MS"]
+    if mean <= 0 or settings["OFFLINE_GENERATE_DIST"] == "fixed":
+        return max(mean, 0.0)
+    if settings["OFFLINE_GENERATE_DIST"] == "exponential":
+        return rng.expovariate(1 / mean)
+    return rng.lognormvariate(math.log(mean), settings["OFFLINE_GENERATE_SIGMA"])
+
+
+class Simulator:
+    """
+    Deterministic stand-in for DBMS_CLOUD_AI.GENERATE over one offline database.
+
+    The n-th call for a (profile, action, prompt) draws from a generator seeded
+    with OFFLINE_SEED and those values, so a run replays identically whatever
+    the interleaving of sessions. Each call waits a latency drawn from the
+    profile's distribution, then is throttled, fails, answers with wrong SQL,
+    answers with an equivalent rewrite of the ground truth, or answers with the
+    ground truth itself, with the configured probabilities.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        db = sqlite3.connect(path)
+        try:
+            rows = db.execute("SELECT nl_question, ground_truth_sql FROM NL_SQL_TEST_QUERIES").fetchall()
+        finally:
+            db.close()
+        self.ground_truth = {question.strip(): sql for question, sql in rows}
+        self.calls = {}
+        self._settings = {}
+        self._lock = threading.Lock()
+
+    def settings(self, connection, profile):
+        """OFFLINE_* settings for `profile`, with its PROFILE_SETTINGS attributes applied."""
+        with self._lock:
+            cached = self._settings.get(profile)
+        if cached is not None:
+            return cached
+        settings = {name: getattr(config, name) for name, _ in PROFILE_SETTINGS.values()}
+        rows = connection._query(
+            "SELECT attribute_name, attribute_value FROM USER_CLOUD_AI_PROFILE_ATTRIBUTES WHERE profile_name = ?",
+            (profile,),
+        )
+        for attribute, value in rows:
+            if attribute.lower() in PROFILE_SETTINGS:
+                name, kind = PROFILE_SETTINGS[attribute.lower()]
+                settings[name] = kind(json.loads(value) if kind is float else value)
+        with self._lock:
+            self._settings[profile] = settings
+        return settings
+
+    def forget(self, profile):
+        with self._lock:
+            self._settings.pop(profile, None)
+
+    def generate(self, connection, prompt, action, profile):
+        settings = self.settings(connection, profile)
+        with self._lock:
+            key = (profile, action, prompt)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            rng = random.Random(f"{config.OFFLINE_SEED}:{profile}:{action}:{prompt}:{self.calls[key]}")
+        delay = _latency_ms(rng, settings) / 1000
+        draw = rng.random()
+        threshold = settings["OFFLINE_THROTTLE_RATE"]
+        if draw < threshold:
+            return GenerateOutcome(delay / 10, error=_THROTTLE_MESSAGE)  # rejected before the model runs
+        threshold += settings["OFFLINE_ERROR_RATE"]
+        if draw < threshold:
+            return GenerateOutcome(delay, error=_ERROR_MESSAGE)
+        gt_sql = self.ground_truth.get(prompt.strip())
+        if gt_sql is None:
+            return GenerateOutcome(delay, text="SELECT NULL FROM DUAL")
+        threshold += settings["OFFLINE_WRONG_RATE"]
+        if draw < threshold:
+            return GenerateOutcome(delay, text=f"SELECT COUNT(*) FROM ({gt_sql})")
+        threshold += settings["OFFLINE_REWRITE_RATE"]
+        if draw < threshold:
+            # Same rows as the ground truth but a different canonical form, so the SQL is still executed
+            return GenerateOutcome(delay, text=f"SELECT * FROM ({gt_sql})")
+        return GenerateOutcome(delay, text=gt_sql)
+
+
+_simulators = {}
+_simulators_lock = threading.Lock()
+
+
+def get_simulator(path=None):
+    """Return the Simulator for `path` (default OFFLINE_DB_PATH), building the database first if needed."""
+    path = os.path.abspath(path or config.OFFLINE_DB_PATH)
+    with _simulators_lock:
+        if path not in _simulators:
+            if not _is_current(path):
+                print(f"Building offline database {path} (scale {config.SETUP_SCALE})...")
+                build_database(path)
+            _simulators[path] = Simulator(path)
+        return _simulators[path]
+
+
+# Connections ----------------------------------------------------------------
+
+def _description(*names):
+    return [(name, None, None, None, None, None, None) for name in names]
+
+
+class Connection:
+    """A session on the offline database, with the parts of oracledb.Connection the harness uses."""
+
+    def __init__(self, path=None, pool=None):
+        self.simulator = get_simulator(path)
+        self._db = sqlite3.connect(self.simulator.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._pool = pool
+        self._fresh = True
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self.call_timeout = 0
+        self.outputtypehandler = None
+        self.profile = None
+
+    def cursor(self):
+        return Cursor(self)
+
+    def cancel(self):
+        """Interrupt the running call (ORA-01013), as oracledb.Connection.cancel does."""
+        self._cancel.set()
+        self._db.interrupt()
+
+    def _timed_out(self):
+        return 1 if self._cancel.is_set() or time.monotonic() > self._deadline else 0
+
+    def _call(self, function, *args):
+        """One round trip: run `function` under call_timeout, mapping interrupts to the driver's errors."""
+        with self._lock:
+            self._cancel.clear()
+            if self.call_timeout:
+                self._deadline = time.monotonic() + self.call_timeout / 1000
+                self._db.set_progress_handler(self._timed_out, 1000)
+            try:
+                return function(*args)
+            except sqlite3.OperationalError as e:
+                if str(e) != "interrupted":
+                    raise DatabaseError(str(e)) from e
+                if self._cancel.is_set():
+                    raise DatabaseError(_CANCEL_MESSAGE) from None
+                raise DatabaseError(_TIMEOUT_MESSAGE.format(self.call_timeout)) from None
+            except sqlite3.Error as e:
+                raise DatabaseError(str(e)) from e
+            finally:
+                if self.call_timeout:
+                    self._db.set_progress_handler(None, 0)
+
+    def _query(self, sql, parameters=()):
+        return self._call(lambda: self._db.execute(sql, parameters).fetchall())
+
+    def _wait(self, seconds):
+        """Sleep through a simulated server call, honouring call_timeout and cancel()."""
+        limit = self.call_timeout / 1000 if self.call_timeout else None
+        self._cancel.clear()
+        if self._cancel.wait(seconds if limit is None else min(seconds, limit)):
+            raise DatabaseError(_CANCEL_MESSAGE)
+        if limit is not None and seconds > limit:
+            raise DatabaseError(_TIMEOUT_MESSAGE.format(self.call_timeout))
+
+    def _plsql(self, block, binds):
+        """Run one of the PL/SQL calls the harness makes."""
+        upper = block.upper()
+        if "DBMS_CLOUD_AI.SET_PROFILE" in upper:
+            self.profile = binds["profile_name"]
+        elif "DBMS_CLOUD_AI.CREATE_PROFILE" in upper:
+            name = binds["profile_name"]
+            self._call(_store_profile, self._db, name, json.loads(binds["attributes"]), binds.get("description"))
+            self.simulator.forget(name)
+        elif "DBMS_SESSION.SET_TIME_LIMIT" not in upper:
+            raise DatabaseError(f"offline backend cannot run this PL/SQL block: {block[:80]}")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ping(self):
+        pass
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class Cursor:
+    """oracledb.Cursor stand-in: execute, parse, fetchone / fetchmany / fetchall and description."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self._cursor = None
+        self._rows = None
+
+    def _set_rows(self, description, rows):
+        self.description = description
+        self._cursor = None
+        self._rows = list(rows)
+
+    def _generated(self, statement, parameters):
+        """The simulated outcome when `statement` is a GENERATE call, else None."""
+        if not _GENERATE_RE.search(statement):
+            return None
+        binds = parameters or {}
+        profile = binds.get("profile_name") or self.connection.profile
+        return self.connection.simulator.generate(
+            self.connection, binds["prompt"], binds.get("action", "showsql"), profile
+        )
+
+    def _finish_generate(self, outcome):
+        if outcome.error:
+            raise DatabaseError(outcome.error)
+        self._set_rows(_description("DBMS_CLOUD_AI.GENERATE"), [(outcome.text,)])
+
+    def _run(self, statement, parameters):
+        text = normalize_sql(statement)
+        if _PLSQL_RE.match(text):
+            self._set_rows(None, [])
+            self.connection._plsql(text, parameters or {})
+            return
+        sql = translate(text)
+        self._rows = None
+        self._cursor = self.connection._db.cursor()
+        self.connection._call(self._cursor.execute, sql, parameters or ())
+        self.description = self._cursor.description
+
+    def execute(self, statement, parameters=None):
+        outcome = self._generated(statement, parameters)
+        if outcome is not None:
+            self.connection._wait(outcome.delay)
+            self._finish_generate(outcome)
+        else:
+            self._run(statement, parameters)
+
+    def parse(self, statement):
+        self._run(f"SELECT * FROM ({statement}) WHERE 1 = 0", None)
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        if self._rows is not None:
+            batch, self._rows = self._rows[:size], self._rows[size:]
+            return batch
+        if self._cursor is None:
+            return []
+        return self.connection._call(self._cursor.fetchmany, size)
+
+    def fetchone(self):
+        batch = self.fetchmany(1)
+        return batch[0] if batch else None
+
+    def fetchall(self):
+        rows = []
+        while True:
+            batch = self.fetchmany()
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def close(self):
+        self._cursor = self._rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """Fixed-size pool like oracledb.create_pool(min=max, increment=0); session_callback runs once per session."""
+
+    def __init__(self, path, size, session_callback=None):
+        self.path = path
+        self.max = size
+        self.session_callback = session_callback
+        self.opened = 0
+        self._idle = []
+        self._available = threading.Condition()
+
+    def acquire(self):
+        with self._available:
+            while not self._idle and self.opened >= self.max:
+                self._available.wait()
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self.opened += 1
+                conn = None
+        if conn is None:
+            try:
+                conn = Connection(self.path, pool=self)
+            except BaseException:
+                with self._available:
+                    self.opened -= 1
+                    self._available.notify()
+                raise
+        if conn._fresh:
+            conn._fresh = False
+            if self.session_callback is not None:
+                self.session_callback(conn, None)
+        return conn
+
+    def release(self, conn):
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def close(self, force=False):
+        with self._available:
+            for conn in self._idle:
+                conn._db.close()
+            self._idle = []
+
+
+# Async facade: SQL runs on worker threads (sqlite3 releases the GIL while it
+# executes), simulated GENERATE latency is an event-loop sleep.
+
+class AsyncConnection:
+    """oracledb.AsyncConnection stand-in wrapping a Connection."""
+
+    def __init__(self, connection, pool=None):
+        self._sync = connection
+        self._pool = pool
+        self._wake = None
+        self.outputtypehandler = None
+
+    @property
+    def call_timeout(self):
+        return self._sync.call_timeout
+
+    @call_timeout.setter
+    def call_timeout(self, value):
+        self._sync.call_timeout = value
+
+    def cursor(self):
+        return AsyncCursor(self)
+
+    def cancel(self):
+        self._sync.cancel()
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _wait(self, seconds):
+        limit = self.call_timeout / 1000 if self.call_timeout else None
+        self._wake = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds if limit is None else min(seconds, limit))
+        except asyncio.TimeoutError:
+            if limit is not None and seconds > limit:
+                raise DatabaseError(_TIMEOUT_MESSAGE.format(self.call_timeout)) from None
+            return
+        finally:
+            self._wake = None
+        raise DatabaseError(_CANCEL_MESSAGE)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.release(self)
+        else:
+            await asyncio.to_thread(self._sync.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+
+class AsyncCursor:
+    """oracledb.AsyncCursor stand-in."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._sync = Cursor(connection._sync)
+
+    arraysize = property(lambda self: self._sync.arraysize, lambda self, v: setattr(self._sync, "arraysize", v))
+    prefetchrows = property(lambda self: self._sync.prefetchrows, lambda self, v: setattr(self._sync, "prefetchrows", v))
+    description = property(lambda self: self._sync.description)
+
+    async def execute(self, statement, parameters=None):
+        outcome = await asyncio.to_thread(self._sync._generated, statement, parameters)
+        if outcome is not None:
+            await self.connection._wait(outcome.delay)
+            self._sync._finish_generate(outcome)
+        else:
+            await asyncio.to_thread(self._sync._run, statement, parameters)
+
+    async def parse(self, statement):
+        await asyncio.to_thread(self._sync.parse, statement)
+
+    async def fetchmany(self, size=None):
+        if self._sync._rows is not None:
+            return self._sync.fetchmany(size)
+        return await asyncio.to_thread(self._sync.fetchmany, size)
+
+    async def fetchone(self):
+        batch = await self.fetchmany(1)
+        return batch[0] if batch else None
+
+    async def fetchall(self):
+        return await asyncio.to_thread(self._sync.fetchall)
+
+    def close(self):
+        self._sync.close()
+
+
+class _AsyncAcquire:
+    """Result of AsyncConnectionPool.acquire(): awaitable, or usable with `async with`."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    def __await__(self):
+        return self._pool._acquire().__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._pool._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._pool.release(self._conn)
+        return False
+
+
+class AsyncConnectionPool:
+    """Fixed-size pool like oracledb.create_pool_async(min=max, increment=0)."""
+
+    def __init__(self, path, size):
+        self.path = path
+        self.max = size
+        self.opened = 0
+        self._idle = []
+        self._available = None
+
+    def acquire(self):
+        return _AsyncAcquire(self)
+
+    async def _acquire(self):
+        if self._available is None:
+            self._available = asyncio.Condition()
+        async with self._available:
+            while not self._idle and self.opened >= self.max:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self.opened += 1
+        try:
+            return AsyncConnection(await asyncio.to_thread(Connection, self.path), pool=self)
+        except BaseException:
+            async with self._available:
+                self.opened -= 1
+                self._available.notify()
+            raise
+
+    async def release(self, conn):
+        async with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    async def close(self, force=False):
+        for conn in self._idle:
+            conn._sync._db.close()
+        self._idle = []
+
+
+# oracledb-compatible entry points (db_utils passes path=OFFLINE_DB_PATH; other parameters are ignored)
+
+def connect(path=None, **params):
+    return Connection(path)
+
+
+def create_pool(min=1, max=1, increment=0, session_callback=None, path=None, **params):
+    return ConnectionPool(path, max, session_callback)
+
+
+async def connect_async(path=None, **params):
+    return AsyncConnection(await asyncio.to_thread(Connection, path))
+
+
+def create_pool_async(min=1, max=1, increment=0, path=None, **params):
+    return AsyncConnectionPool(path, max)
@@ -0,0 +1,102 @@
+# plan_utils.py
+import re
+import uuid
+
+from . import config
+from .tracing import span
+
+_PLAN_ROWS_SQL = (
+    "SELECT id, operation, options, object_name, cost, cardinality FROM PLAN_TABLE "
+    "WHERE statement_id = :statement_id ORDER BY id"
+)
+_PLAN_HASH_SQL = "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :statement_id, 'BASIC'))"
+_PLAN_DELETE_SQL = "DELETE FROM PLAN_TABLE WHERE statement_id = :statement_id"
+_PLAN_HASH_RE = re.compile(r"Plan hash value: (\d+)")
+
+
+def _explain_statement(sql):
+    # EXPLAIN PLAN does not accept a bind for STATEMENT_ID; the id is generated here, never user input.
+    statement_id = "EVAL_" + uuid.uuid4().hex[:16]
+    return statement_id, f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}"
+
+
+def _summarize_plan(rows, xplan_lines):
+    """Build the plan summary dict from PLAN_TABLE rows and DBMS_XPLAN output."""
+    plan_hash = None
+    for (line,) in xplan_lines:
+        match = _PLAN_HASH_RE.search(line or "")
+        if match:
+            plan_hash = int(match.group(1))
+            break
+    root = rows[0] if rows else (None,) * 6
+    full_scans = sorted({
+        name for _, operation, options, name, _, _ in rows
+        if operation == "TABLE ACCESS" and options and "FULL" in options and name
+    })
+    return {
+        'plan_hash': plan_hash,
+        'cost': root[4],
+        'cardinality': root[5],
+        'full_scans': ",".join(full_scans),
+    }
+
+
+def explain_plan(cursor, sql):
+    """
+    EXPLAIN PLAN for `sql` without executing it.
+
+    Returns a dict with the plan hash value, estimated cost and cardinality of
+    the root operation, and the tables read with full scans.
+    """
+    statement_id, explain_sql = _explain_statement(sql)
+    binds = {"statement_id": statement_id}
+    with span("explain"):
+        cursor.execute(explain_sql)
+        try:
+            cursor.execute(_PLAN_ROWS_SQL, binds)
+            rows = cursor.fetchall()
+            cursor.execute(_PLAN_HASH_SQL, binds)
+            xplan_lines = cursor.fetchall()
+        finally:
+            cursor.execute(_PLAN_DELETE_SQL, binds)
+    return _summarize_plan(rows, xplan_lines)
+
+
+async def explain_plan_async(cursor, sql):
+    """Async version of explain_plan."""
+    statement_id, explain_sql = _explain_statement(sql)
+    binds = {"statement_id": statement_id}
+    with span("explain"):
+        await cursor.execute(explain_sql)
+        try:
+            await cursor.execute(_PLAN_ROWS_SQL, binds)
+            rows = await cursor.fetchall()
+            await cursor.execute(_PLAN_HASH_SQL, binds)
+            xplan_lines = await cursor.fetchall()
+        finally:
+            await cursor.execute(_PLAN_DELETE_SQL, binds)
+    return _summarize_plan(rows, xplan_lines)
+
+
+def cost_ratio(ai_plan, gt_plan):
+    """Estimated AI cost over GT cost, or None when either cost is unknown."""
+    if not ai_plan or not gt_plan or ai_plan['cost'] is None or not gt_plan['cost']:
+        return None
+    return ai_plan['cost'] / gt_plan['cost']
+
+
+def exceeds_cost_gate(ai_plan, gt_plan):
+    """True when the AI plan is estimated to cost more than PLAN_COST_MULTIPLE times the GT plan."""
+    ratio = cost_ratio(ai_plan, gt_plan)
+    return ratio is not None and ratio > config.PLAN_COST_MULTIPLE
+
+
+def plan_columns(prefix, plan):
+    """Result-row columns for one side's plan (empty values when no plan was captured)."""
+    plan = plan or {}
+    return {
+        f'{prefix}_plan_hash': plan.get('plan_hash'),
+        f'{prefix}_plan_cost': plan.get('cost'),
+        f'{prefix}_plan_cardinality': plan.get('cardinality'),
+        f'{prefix}_full_scans': plan.get('full_scans', ''),
+    }
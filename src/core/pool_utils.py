@@ -0,0 +1,39 @@
+# pool_utils.py
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from .db_utils import get_pool, acquire_connection
+from .select_ai_utils import init_ai_session
+
+
+def create_eval_pool(workers, profile_name=None):
+    """
+    Create a connection pool with one session per worker.
+
+    Every session runs init_ai_session exactly once, when it is first created,
+    so workers can call generate_select_ai_sql without further setup.
+    """
+    profile_name = profile_name or config.PROFILE
+
+    def init_session(connection, requested_tag):
+        with connection.cursor() as cursor:
+            init_ai_session(cursor, profile_name)
+
+    return get_pool(workers, session_callback=init_session)
+
+
+def map_queries(pool, rows, evaluate, workers):
+    """
+    Run `evaluate(cursor, *row)` for every row over `workers` pooled sessions.
+
+    Results are returned in the order of `rows`, so callers can build the same
+    DataFrame they would get from a serial loop. `None` results are dropped.
+    """
+    def run_one(row):
+        with acquire_connection(pool) as conn:
+            with conn.cursor() as cursor:
+                return evaluate(cursor, *row)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_one, rows))
+    return [r for r in results if r is not None]
@@ -0,0 +1,238 @@
+# rate_limit.py
+import re
+import time
+import random
+import asyncio
+import threading
+import contextvars
+
+from . import config
+from .select_ai_utils import generate_select_ai_sql, generate_select_ai_sql_async
+from .tracing import span
+
+# DBMS_CLOUD maps provider HTTP errors to ORA-20000 + status: 429 Too Many
+# Requests, 503 Service Unavailable, 504 Gateway Timeout.
+THROTTLE_ERRORS = ("ORA-20429", "ORA-20503", "ORA-20504")
+_THROTTLE_TEXT = re.compile(r"too many requests|rate limit|throttl|quota exceeded", re.IGNORECASE)
+
+# Adaptive back-off: the configured rates are scaled by a factor that halves
+# on every throttle and recovers additively on success, never below _MIN_FACTOR.
+_MIN_FACTOR = 0.1
+_RECOVERY_STEP = 0.05
+
+
+def is_throttle(error):
+    """True when `error` is the provider rejecting or shedding load rather than a real failure."""
+    message = str(error)
+    return any(code in message for code in THROTTLE_ERRORS) or bool(_THROTTLE_TEXT.search(message))
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket of `rate_per_min` units per minute, holding
+    at most one minute's worth. Reservations may overdraw it; the caller then
+    waits until the balance is back to zero.
+    """
+
+    def __init__(self, rate_per_min):
+        self.rate_per_min = rate_per_min
+        self.level = float(rate_per_min)
+        self.updated = time.monotonic()
+
+    def reserve(self, cost, factor, now):
+        """Take `cost` units at `factor` x the configured rate; returns seconds to wait first."""
+        rate = self.rate_per_min * factor / 60.0
+        self.level = min(self.rate_per_min, self.level + (now - self.updated) * rate)
+        self.updated = now
+        self.level -= cost
+        return max(0.0, -self.level / rate)
+
+
+class GenerateCall:
+    """Scheduling overhead of one GENERATE call: time waited and spent in throttled attempts."""
+
+    __slots__ = ("wait_ms", "failed_ms", "retries", "throttled")
+
+    def __init__(self):
+        self.wait_ms = 0.0
+        self.failed_ms = 0.0
+        self.retries = 0
+        self.throttled = False
+
+    def overhead_ms(self):
+        return self.wait_ms + self.failed_ms
+
+    def columns(self):
+        return {
+            'generate_wait_ms': round(self.overhead_ms(), 2),
+            'generate_retries': self.retries,
+        }
+
+
+_current_call = contextvars.ContextVar("generate_call", default=None)
+
+
+def begin_generate_call():
+    """Start recording a new GENERATE call in this thread or task; returns its GenerateCall."""
+    call = GenerateCall()
+    _current_call.set(call)
+    return call
+
+
+def current_generate_call():
+    """The GenerateCall recorded last in this thread or task (empty when none)."""
+    return _current_call.get() or GenerateCall()
+
+
+class GenerateScheduler:
+    """
+    Token-bucket scheduler for DBMS_CLOUD_AI.GENERATE.
+
+    Calls are paced to `requests_per_min` and an estimated `tokens_per_min`
+    (prompt characters / 4 plus `tokens_per_call` for schema metadata and the
+    completion); 0 disables a limit. Throttle errors (is_throttle) halve the
+    effective rates and are retried up to `max_retries` times after a
+    full-jitter exponential delay.
+    """
+
+    def __init__(self, requests_per_min=0, tokens_per_min=0, tokens_per_call=0,
+                 max_retries=0, backoff_base=1.0, backoff_max=60.0):
+        self.requests = TokenBucket(requests_per_min) if requests_per_min else None
+        self.tokens = TokenBucket(tokens_per_min) if tokens_per_min else None
+        self.tokens_per_call = tokens_per_call
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.factor = 1.0
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.wait_s = 0.0
+        self._lock = threading.Lock()
+
+    def estimate_tokens(self, prompt):
+        return len(prompt) // 4 + self.tokens_per_call
+
+    def reserve(self, prompt):
+        """Reserve capacity for one call; returns the seconds to wait before making it."""
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, self.factor, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(self.estimate_tokens(prompt), self.factor, now))
+            self.wait_s += wait
+        return wait
+
+    def on_throttle(self):
+        with self._lock:
+            self.throttles += 1
+            self.factor = max(_MIN_FACTOR, self.factor / 2)
+
+    def on_success(self):
+        with self._lock:
+            self.factor = min(1.0, self.factor + _RECOVERY_STEP)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential delay before retry number `attempt` (0-based)."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        with self._lock:
+            self.retries += 1
+            self.wait_s += delay
+        return delay
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "retries": self.retries, "throttles": self.throttles,
+                    "wait_s": round(self.wait_s, 2), "rate_factor": round(self.factor, 2)}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide GenerateScheduler configured by the GENERATE_* settings."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GenerateScheduler(
+                requests_per_min=config.GENERATE_RPM,
+                tokens_per_min=config.GENERATE_TPM,
+                tokens_per_call=config.GENERATE_TOKENS_PER_CALL,
+                max_retries=config.GENERATE_MAX_RETRIES,
+                backoff_base=config.GENERATE_BACKOFF_BASE,
+                backoff_max=config.GENERATE_BACKOFF_MAX,
+            )
+    return _scheduler
+
+
+def _throttled(scheduler, call, error, attempt, elapsed):
+    """Account for a failed attempt; returns the retry delay, or re-raises when not retryable."""
+    if not is_throttle(error):
+        raise error
+    call.failed_ms += elapsed * 1000
+    if attempt >= scheduler.max_retries:
+        call.throttled = True
+        raise error
+    scheduler.on_throttle()
+    call.retries += 1
+    delay = scheduler.backoff(attempt)
+    call.wait_ms += delay * 1000
+    print(f"GENERATE throttled ({str(error)[:80]}); retry {attempt + 1} in {delay:.1f}s")
+    return delay
+
+
+def scheduled_generate_select_ai_sql(cursor, prompt, action="showsql", profile_name=None):
+    """
+    generate_select_ai_sql paced by the scheduler, retrying throttled calls.
+
+    Waiting and failed attempts are added to current_generate_call(), so
+    callers can report them apart from the generation time itself.
+    """
+    scheduler = get_scheduler()
+    call = _current_call.get() or begin_generate_call()
+    attempt = 0
+    while True:
+        wait = scheduler.reserve(prompt)
+        if wait > 0:
+            with span("generate_wait", seconds=round(wait, 3)):
+                time.sleep(wait)
+            call.wait_ms += wait * 1000
+        start = time.perf_counter()
+        try:
+            result = generate_select_ai_sql(cursor, prompt, action=action, profile_name=profile_name)
+        except Exception as e:
+            delay = _throttled(scheduler, call, e, attempt, time.perf_counter() - start)
+            with span("generate_backoff", attempt=attempt, seconds=round(delay, 3)):
+                time.sleep(delay)
+            attempt += 1
+            continue
+        scheduler.on_success()
+        return result
+
+
+async def scheduled_generate_select_ai_sql_async(cursor, prompt, action="showsql", profile_name=None):
+    """Async version of scheduled_generate_select_ai_sql."""
+    scheduler = get_scheduler()
+    call = _current_call.get() or begin_generate_call()
+    attempt = 0
+    while True:
+        wait = scheduler.reserve(prompt)
+        if wait > 0:
+            with span("generate_wait", seconds=round(wait, 3)):
+                await asyncio.sleep(wait)
+            call.wait_ms += wait * 1000
+        start = time.perf_counter()
+        try:
+            result = await generate_select_ai_sql_async(cursor, prompt, action=action, profile_name=profile_name)
+        except Exception as e:
+            delay = _throttled(scheduler, call, e, attempt, time.perf_counter() - start)
+            with span("generate_backoff", attempt=attempt, seconds=round(delay, 3)):
+                await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        scheduler.on_success()
+        return result
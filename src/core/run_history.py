@@ -0,0 +1,297 @@
+# run_history.py
+import os
+import re
+import glob
+import time
+import uuid
+import threading
+import subprocess
+import importlib.util
+from datetime import datetime, timezone
+
+from . import config
+from .gt_cache import read_data_version, read_data_version_async
+from .tracing import get_tracer
+
+# Optional; run history is disabled without it. pyarrow is imported where Parquet
+# is read or written: pyarrow.dataset loads pandas, which would slow every start-up.
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+RUN_COLUMNS = ["run_id", "started_at", "profile", "git_commit", "data_version"]
+
+# Summary metrics stored once per run: match rates (mean of boolean columns)
+# and latency percentiles, for whichever of these columns a result has.
+RATE_COLUMNS = ["ai_success", "exact_match", "semantic_match"]
+LATENCY_COLUMNS = ["total_ai_latency_ms", "llm_latency_ms", "ai_exe_ms", "gt_exe_ms"]
+PERCENTILES = (50, 95, 99)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+class RunInfo:
+    """Identity of one evaluation run; every stored row carries these columns."""
+
+    def __init__(self, run_id=None, profile=None, data_version=""):
+        tracer = get_tracer()
+        self.run_id = run_id or (tracer.trace_id if tracer is not None else uuid.uuid4().hex[:16])
+        self.started_at = datetime.now(timezone.utc)
+        self.profile = profile or config.PROFILE
+        self.git_commit = _git_commit()
+        self.data_version = data_version
+
+    def columns(self, profile=None):
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "profile": profile or self.profile,
+            "git_commit": self.git_commit,
+            "data_version": self.data_version,
+        }
+
+
+_run = None
+_run_lock = threading.Lock()
+
+
+def current_run():
+    """Return the process-wide RunInfo, created on first use."""
+    global _run
+    with _run_lock:
+        if _run is None:
+            _run = RunInfo()
+    return _run
+
+
+def begin_run(cursor):
+    """Create the current run if needed and record the schema's data version from `cursor`."""
+    run = current_run()
+    if not run.data_version:
+        try:
+            run.data_version = read_data_version(cursor)
+        except Exception as e:
+            print(f"Run history: data version unavailable ({e})")
+    return run
+
+
+async def begin_run_async(cursor):
+    """Async version of begin_run."""
+    run = current_run()
+    if not run.data_version:
+        try:
+            run.data_version = await read_data_version_async(cursor)
+        except Exception as e:
+            print(f"Run history: data version unavailable ({e})")
+    return run
+
+
+def summarize_run(df):
+    """One summary dict for a run's result rows: query count, match rates and latency percentiles."""
+    summary = {"n_queries": len(df)}
+    for column in RATE_COLUMNS:
+        if column in df.columns:
+            summary[f"{column}_rate"] = float(df[column].astype(float).mean())
+    for column in LATENCY_COLUMNS:
+        if column in df.columns:
+            values = df[column].astype(float).dropna()
+            for p in PERCENTILES:
+                summary[f"{column}_p{p}"] = float(values.quantile(p / 100)) if len(values) else float("nan")
+    return summary
+
+
+class RunHistory:
+    """
+    Append-only Parquet store of experiment results across runs.
+
+    Layout under `root` (hive-style directories, one file per append, never
+    rewritten; <part> is <run_id>-<profile>-<unique suffix>, so several
+    profiles or repeated appends within one run each keep their own files):
+
+        kind=<kind>/run_date=YYYY-MM-DD/<part>.parquet  - per-query result rows
+        kind=runs/run_date=YYYY-MM-DD/<part>-<kind>.parquet - one summary row
+
+    Every row carries RUN_COLUMNS. Reads prune files by date from the paths
+    and use pyarrow.dataset with column projection and filter pushdown, so
+    comparing thousands of runs only touches the summary files.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, kind, run, name):
+        directory = os.path.join(self.root, f"kind={kind}", f"run_date={run.started_at:%Y-%m-%d}")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{name}.parquet")
+
+    def append(self, kind, df, run=None, profile=None):
+        """Store one run's result rows for `kind` plus its summary row. Returns the summary dict."""
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        run = run or current_run()
+        identity = run.columns(profile)
+        rows = df.assign(**identity)[RUN_COLUMNS + [c for c in df.columns if c not in RUN_COLUMNS]]
+        part = f"{run.run_id}-{re.sub(r'[^A-Za-z0-9_.]+', '_', identity['profile'])}-{uuid.uuid4().hex[:8]}"
+        # Exclusive create ("x"): an existing file is never overwritten
+        with open(self._path(kind, run, part), "xb") as f:
+            pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), f)
+
+        summary = {**identity, "kind": kind, "recorded_at": time.time(), **summarize_run(df)}
+        with open(self._path("runs", run, f"{part}-{kind}"), "xb") as f:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame([summary]), preserve_index=False), f)
+        return summary
+
+    def _files(self, kind, since=None):
+        files = sorted(glob.glob(os.path.join(self.root, f"kind={kind}", "run_date=*", "*.parquet")))
+        if since is not None:
+            since = str(since)[:10]
+            files = [f for f in files if os.path.basename(os.path.dirname(f))[len("run_date="):] >= since]
+        return files
+
+    def run_files(self, kind, run_id):
+        """Result files stored for `kind` by run `run_id` (one per append)."""
+        return [f for f in self._files(kind) if os.path.basename(f).startswith(f"{run_id}-")]
+
+    def read(self, kind, columns=None, filter=None, since=None):
+        """
+        Load stored rows of `kind` as a DataFrame.
+
+        `columns` projects, `filter` is a pyarrow.dataset expression (e.g.
+        ds.field("profile") == "EVAL_PROFILE") and `since` (a date) skips
+        older partitions. Files written before a column existed read it as null.
+        """
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        files = self._files(kind, since)
+        if not files:
+            return pd.DataFrame(columns=columns or [])
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+        dataset = ds.dataset(files, schema=schema, format="parquet")
+        return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+    def runs(self, kind=None, profile=None, since=None):
+        """Run summaries (one row per run and kind), oldest first."""
+        import pyarrow.dataset as ds
+
+        filters = []
+        if kind is not None:
+            filters.append(ds.field("kind") == kind)
+        if profile is not None:
+            filters.append(ds.field("profile") == profile)
+        expression = None
+        for f in filters:
+            expression = f if expression is None else expression & f
+        df = self.read("runs", filter=expression, since=since)
+        return df.sort_values(["started_at", "recorded_at"]).reset_index(drop=True) if not df.empty else df
+
+    def latest(self, kind, profile=None):
+        """Result rows of the most recent stored run of `kind`, or None when there is none."""
+        import pyarrow.dataset as ds
+
+        summaries = self.runs(kind, profile)
+        if summaries.empty:
+            return None
+        latest = summaries.iloc[-1]
+        df = self.read(kind, filter=(ds.field("run_id") == latest["run_id"]) & (ds.field("profile") == latest["profile"]))
+        return df.drop(columns=RUN_COLUMNS)
+
+
+def detect_regressions(history, kind, run_id=None, baseline_runs=None,
+                       latency_tolerance=None, rate_tolerance=None):
+    """
+    Compare one run's summary against the median of the runs before it.
+
+    The baseline is the previous `baseline_runs` runs of the same kind and
+    profile; latency percentiles are only compared with runs on the same data
+    version. A latency percentile regresses when it grows by more than
+    `latency_tolerance` (fraction), a match rate when it drops by more than
+    `rate_tolerance` (absolute). Returns a DataFrame with one row per metric.
+    """
+    import pandas as pd
+
+    baseline_runs = baseline_runs or config.REGRESSION_BASELINE_RUNS
+    latency_tolerance = config.REGRESSION_LATENCY_PCT if latency_tolerance is None else latency_tolerance
+    rate_tolerance = config.REGRESSION_RATE_DROP if rate_tolerance is None else rate_tolerance
+
+    runs = history.runs(kind)
+    if runs.empty:
+        return pd.DataFrame()
+    position = runs.index[-1] if run_id is None else runs.index[runs["run_id"] == run_id][-1]
+    current = runs.loc[position]
+    earlier = runs.loc[:position - 1]
+    earlier = earlier[earlier["profile"] == current["profile"]]
+
+    rows = []
+    for metric in runs.columns:
+        if metric.endswith("_rate"):
+            previous = earlier.tail(baseline_runs)
+            higher_is_worse = False
+        elif metric.rsplit("_", 1)[-1] in {f"p{p}" for p in PERCENTILES}:
+            previous = earlier[earlier["data_version"] == current["data_version"]].tail(baseline_runs)
+            higher_is_worse = True
+        else:
+            continue
+        values = previous[metric].dropna()
+        if values.empty or pd.isna(current[metric]):
+            continue
+        baseline = float(values.median())
+        value = float(current[metric])
+        if higher_is_worse:
+            regressed = baseline > 0 and value > baseline * (1 + latency_tolerance)
+        else:
+            regressed = value < baseline - rate_tolerance
+        rows.append({"metric": metric, "baseline": baseline, "current": value,
+                     "change": value - baseline, "baseline_runs": len(values), "regressed": regressed})
+    return pd.DataFrame(rows)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_run_history():
+    """Return the store configured by RUN_HISTORY_DIR, or None when disabled or pyarrow is missing."""
+    global _history
+    if not config.RUN_HISTORY_DIR or not HAVE_PYARROW:
+        return None
+    with _history_lock:
+        if _history is None:
+            _history = RunHistory(config.RUN_HISTORY_DIR)
+    return _history
+
+
+def record_results(kind, df, profile=None):
+    """Append a run's results to the run history when enabled; failures are reported, not raised."""
+    history = get_run_history()
+    if history is None:
+        return None
+    try:
+        summary = history.append(kind, df, profile=profile)
+        print(f"Run history: stored {len(df)} {kind} rows for run {summary['run_id']}")
+        return summary
+    except Exception as e:
+        print(f"Run history error: {e}")
+        return None
+
+
+def load_latest(kind, csv_path):
+    """Latest stored results of `kind` from the run history, falling back to `csv_path`."""
+    import pandas as pd
+
+    history = get_run_history()
+    if history is not None:
+        df = history.latest(kind)
+        if df is not None:
+            return df
+    return pd.read_csv(csv_path)
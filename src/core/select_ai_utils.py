@@ -1,4 +1,20 @@
-import oracledb
+
+from .tracing import span
+
+# Fixed statement texts with bind variables: one parse per session, then
+# every call is served from the client statement cache.
+GENERATE_SQL = "SELECT DBMS_CLOUD_AI.GENERATE(prompt => :prompt, action => :action) FROM DUAL"
+GENERATE_PROFILE_SQL = (
+    "SELECT DBMS_CLOUD_AI.GENERATE(prompt => :prompt, profile_name => :profile_name, action => :action) FROM DUAL"
+)
+
+
+def _generate_statement(prompt, action, profile_name):
+    binds = {"prompt": prompt, "action": action}
+    if profile_name is None:
+        return GENERATE_SQL, binds
+    binds["profile_name"] = profile_name
+    return GENERATE_PROFILE_SQL, binds
 
 
 def create_ai_profile(cursor, profile_name, attributes_json, description=None):
@@ -31,34 +47,62 @@ def create_ai_profile(cursor, profile_name, attributes_json, description=None):
 
 def init_ai_session(cursor, profile_name="EVAL_PROFILE"):
     """Initialize the Select AI profile for the current session."""
-    cursor.execute(
-        "BEGIN DBMS_CLOUD_AI.SET_PROFILE(:profile_name); END;",
-        {"profile_name": profile_name},
-    )
+    with span("init_ai_session", profile=profile_name):
+        cursor.execute(
+            "BEGIN DBMS_CLOUD_AI.SET_PROFILE(:profile_name); END;",
+            {"profile_name": profile_name},
+        )
 
 
-def generate_select_ai_sql(cursor, prompt, action="showsql"):
+def generate_select_ai_sql(cursor, prompt, action="showsql", profile_name=None):
     """
     Call DBMS_CLOUD_AI.GENERATE for a natural language prompt.
 
     By default uses action='showsql' so that only SQL generation latency
     is measured and the database does not execute the generated SQL.
+    The prompt, action and (optional) profile are bind variables, so quotes
+    in the question are safe and the statement text never changes. Without
+    `profile_name` the session profile from init_ai_session is used.
     """
-    gen_cmd = (
-        "SELECT DBMS_CLOUD_AI.GENERATE("
-        f"prompt => '{prompt}', "
-        f"action => '{action}'"
-        ") FROM DUAL"
-    )
-    cursor.execute(gen_cmd)
-    row = cursor.fetchone()
+    sql, binds = _generate_statement(prompt, action, profile_name)
+    with span("generate_select_ai_sql", action=action):
+        cursor.execute(sql, binds)
+        row = cursor.fetchone()
     return row[0] if row else None
 
 
-def set_time_limit(cursor, seconds):
-    """Set an execution time limit for the current session (in seconds)."""
-    cursor.execute(
-        "BEGIN DBMS_SESSION.SET_TIME_LIMIT(:limit_sec); END;",
-        {"limit_sec": seconds},
-    )
+def count_rows(cursor, sql):
+    """Return the number of rows produced by `sql`, wrapped in COUNT(*) on the server."""
+    with span("execute", wrapper="count"):
+        cursor.execute(f"SELECT COUNT(*) FROM ({sql})")
+        return cursor.fetchone()[0]
+
+
+# Async variants for oracledb.AsyncCursor (see oracledb.connect_async /
+# oracledb.create_pool_async). They issue exactly the same statements as the
+# synchronous helpers above so timings stay comparable.
+
+async def init_ai_session_async(cursor, profile_name="EVAL_PROFILE"):
+    """Async version of init_ai_session."""
+    with span("init_ai_session", profile=profile_name):
+        await cursor.execute(
+            "BEGIN DBMS_CLOUD_AI.SET_PROFILE(:profile_name); END;",
+            {"profile_name": profile_name},
+        )
+
+
+async def generate_select_ai_sql_async(cursor, prompt, action="showsql", profile_name=None):
+    """Async version of generate_select_ai_sql."""
+    sql, binds = _generate_statement(prompt, action, profile_name)
+    with span("generate_select_ai_sql", action=action):
+        await cursor.execute(sql, binds)
+        row = await cursor.fetchone()
+    return row[0] if row else None
+
 
+async def count_rows_async(cursor, sql):
+    """Async version of count_rows."""
+    with span("execute", wrapper="count"):
+        await cursor.execute(f"SELECT COUNT(*) FROM ({sql})")
+        row = await cursor.fetchone()
+    return row[0]
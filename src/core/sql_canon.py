@@ -0,0 +1,334 @@
+# sql_canon.py
+import re
+from functools import lru_cache
+
+from .gt_cache import normalize_sql
+
+try:
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+except ImportError:  # optional; without it only whitespace/case differences are recognized
+    sqlglot = None
+
+_STRING_OR_WORD = re.compile(r"('(?:[^']|'')*'|\"[^\"]*\")|[^'\"]+")
+_ROW_LIMIT = re.compile(r"\b(ROWNUM|FETCH\s+(FIRST|NEXT)|LIMIT)\b")
+
+
+def _text_canonical(sql):
+    """Fallback canonical form: collapsed whitespace, upper case outside literals and quoted names."""
+    parts = []
+    for match in _STRING_OR_WORD.finditer(normalize_sql(sql)):
+        parts.append(match.group(1) or match.group(0).upper())
+    return "".join(parts)
+
+
+# AST rewrites (sqlglot). Each takes and returns a tree; they are applied in
+# the order of _rewrite so later steps see the normalized shape of earlier ones.
+
+def _conjuncts(condition):
+    return list(condition.flatten()) if isinstance(condition, exp.And) else [condition]
+
+
+def _and_all(conditions):
+    conditions = list(conditions)
+    if not conditions:
+        return None
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = exp.and_(result, condition, copy=False)
+    return result
+
+
+def _set_where(select, conditions):
+    condition = _and_all(conditions)
+    select.set("where", exp.Where(this=condition) if condition is not None else None)
+
+
+def _rownum_limit(where):
+    """N for `ROWNUM <= N` / `ROWNUM < N` / `N >= ROWNUM` / `N > ROWNUM`, else None."""
+    def is_rownum(node):
+        return isinstance(node, exp.Column) and not node.table and node.name.upper() == "ROWNUM"
+
+    def count(node):
+        return int(node.this) if isinstance(node, exp.Literal) and node.is_int else None
+
+    left, right = where.this, where.expression
+    if isinstance(where, (exp.LTE, exp.LT)) and is_rownum(left) and count(right) is not None:
+        return count(right) - (isinstance(where, exp.LT))
+    if isinstance(where, (exp.GTE, exp.GT)) and is_rownum(right) and count(left) is not None:
+        return count(left) - (isinstance(where, exp.GT))
+    return None
+
+
+def _unwrap_rownum(node):
+    """SELECT * FROM (<query>) WHERE ROWNUM <= N  ->  <query> FETCH FIRST N ROWS ONLY."""
+    if not isinstance(node, exp.Select) or not node.args.get("where"):
+        return node
+    source = node.args.get("from_")
+    if (
+        len(node.expressions) != 1 or not isinstance(node.expressions[0], exp.Star)
+        or source is None or not isinstance(source.this, exp.Subquery)
+        or not isinstance(source.this.this, exp.Select)
+        or node.args.get("joins") or node.args.get("group") or node.args.get("order")
+    ):
+        return node
+    limit = _rownum_limit(node.args["where"].this)
+    inner = source.this.this
+    if limit is None or inner.args.get("limit"):
+        return node
+    return inner.limit(limit, copy=False)
+
+
+def _fetch_to_limit(node):
+    """FETCH FIRST N ROWS ONLY and LIMIT N share one form."""
+    fetch = node.args.get("limit") if isinstance(node, exp.Select) else None
+    if isinstance(fetch, exp.Fetch):
+        options = fetch.args.get("limit_options")
+        if not (options and (options.args.get("percent") or options.args.get("with_ties"))) and fetch.args.get("count"):
+            node.set("limit", exp.Limit(expression=fetch.args["count"]))
+    return node
+
+
+def _selects_star(select):
+    """True when the select list has `*` or `t.*`: its columns then depend on the FROM clause."""
+    return any(isinstance(e, exp.Star) or (isinstance(e, exp.Column) and isinstance(e.this, exp.Star))
+               for e in select.expressions)
+
+
+def _table_aliases(tree):
+    """{alias: table name} for every aliased table, or None when an alias is reused."""
+    aliases = {}
+    for table in tree.find_all(exp.Table):
+        alias = table.alias or table.name
+        if aliases.setdefault(alias, table.name) != table.name:
+            return None
+    return aliases
+
+
+def _anti_join_to_not_exists(node):
+    """
+    a LEFT JOIN b ON <cond> WHERE b.k IS NULL  ->  NOT EXISTS (SELECT 1 FROM b WHERE <cond>)
+
+    Only when <cond> is an AND of equalities, the IS NULL test is on one of b's
+    join keys (an equality never holds for NULL, so the key is NULL exactly
+    when no b row matched) and b is referenced nowhere else. OR conditions or
+    a test on a nullable non-key column of b would change the result, and so
+    would a `*` select list, which includes b's columns.
+    """
+    if not isinstance(node, exp.Select) or not node.args.get("where") or _selects_star(node):
+        return node
+    for join in list(node.args.get("joins") or []):
+        table = join.this
+        if join.side != "LEFT" or not isinstance(table, exp.Table) or not join.args.get("on"):
+            continue
+        alias = table.alias or table.name
+        on = join.args["on"]
+        equalities = _conjuncts(on)
+        if not all(isinstance(c, exp.EQ) for c in equalities):
+            continue
+        join_keys = {
+            side.name for c in equalities for side in (c.this, c.expression)
+            if isinstance(side, exp.Column) and side.table == alias
+        }
+        conditions = _conjuncts(node.args["where"].this)
+        null_tests = [
+            c for c in conditions
+            if isinstance(c, exp.Is) and isinstance(c.expression, exp.Null)
+            and isinstance(c.this, exp.Column) and c.this.table == alias and c.this.name in join_keys
+        ]
+        if len(null_tests) != 1:
+            continue
+        rest = [c for c in conditions if c is not null_tests[0]]
+        others = [e for k, e in node.args.items() if k not in ("joins", "where")] + rest
+        others += [j for j in node.args["joins"] if j is not join]
+        if any(c.table == alias for e in others for v in (e if isinstance(e, list) else [e])
+               if isinstance(v, exp.Expression) for c in v.find_all(exp.Column)):
+            continue
+        subquery = exp.select("1").from_(table.copy()).where(on.copy())
+        rest.append(exp.Not(this=exp.Exists(this=subquery)))
+        node.set("joins", [j for j in node.args["joins"] if j is not join] or None)
+        _set_where(node, rest)
+    return node
+
+
+def _exists_select_one(node):
+    """The select list of an EXISTS subquery is irrelevant."""
+    if isinstance(node, exp.Exists) and isinstance(node.this, exp.Select):
+        node.this.set("expressions", [exp.Literal.number(1)])
+    return node
+
+
+def _inner_joins_to_where(node):
+    """
+    JOIN b ON <cond> (inner) -> FROM a, b WHERE <cond>, with the FROM list sorted by table.
+
+    Not applied to a `*` select list, whose column order follows the FROM list.
+    """
+    if not isinstance(node, exp.Select) or _selects_star(node):
+        return node
+    joins = node.args.get("joins") or []
+    if any(j.side or j.kind not in (None, "", "INNER") or j.args.get("using") for j in joins):
+        return node
+    moved = [j.args["on"] for j in joins if j.args.get("on")]
+    if moved:
+        for join in joins:
+            join.set("on", None)
+            join.set("kind", None)
+        existing = _conjuncts(node.args["where"].this) if node.args.get("where") else []
+        _set_where(node, existing + moved)
+    source = node.args.get("from_")
+    sources = [source.this] + [j.this for j in joins] if source else []
+    if sources and all(isinstance(s, exp.Table) for s in sources):
+        sources.sort(key=lambda s: (s.name, s.alias))
+        source.set("this", sources[0])
+        node.set("joins", [exp.Join(this=s) for s in sources[1:]] or None)
+    return node
+
+
+def _connective_operands(node):
+    """
+    Operands of the AND (or OR) chain at `node`, parentheses removed.
+
+    Only nested chains of the same connective are merged: a parenthesized
+    OR inside an AND stays one operand.
+    """
+    operands = []
+    for side in (node.this, node.expression):
+        while isinstance(side, exp.Paren):
+            side = side.this
+        if type(side) is type(node):
+            operands.extend(_connective_operands(side))
+        else:
+            operands.append(side)
+    return operands
+
+
+def _order_predicates(node):
+    """Sort AND/OR operands, put comparison operands in a fixed order and sort IN lists."""
+    if isinstance(node, (exp.And, exp.Or)):
+        # Operands that are themselves AND/OR chains are parenthesized so precedence survives
+        operands = sorted((exp.Paren(this=c) if isinstance(c, (exp.And, exp.Or)) else c
+                           for c in _connective_operands(node)), key=lambda c: c.sql())
+        result = operands[0]
+        for operand in operands[1:]:
+            result = node.__class__(this=result, expression=operand)
+        return result
+    if isinstance(node, (exp.GT, exp.GTE)):
+        flipped = exp.LT if isinstance(node, exp.GT) else exp.LTE
+        return flipped(this=node.expression, expression=node.this)
+    if isinstance(node, (exp.EQ, exp.NEQ)) and node.this.sql() > node.expression.sql():
+        return node.__class__(this=node.expression, expression=node.this)
+    if isinstance(node, exp.In) and node.expressions and all(isinstance(e, exp.Literal) for e in node.expressions):
+        node.set("expressions", sorted(node.expressions, key=lambda e: e.sql()))
+    return node
+
+
+def _normalize_aliases(tree):
+    """
+    Replace table aliases with table names.
+
+    Tables that appear once lose their alias and columns qualified by it are
+    qualified by the table name instead; self-joins keep their aliases.
+    Qualifiers are only dropped when the statement reads a single table:
+    otherwise same-named columns of different tables (l.x vs u.x) would
+    compare equal.
+    """
+    aliases = _table_aliases(tree)
+    if aliases is None:
+        return tree
+    counts = {}
+    for name in aliases.values():
+        counts[name] = counts.get(name, 0) + 1
+    single_table = len(list(tree.find_all(exp.Table))) == 1
+    for column in tree.find_all(exp.Column):
+        if column.table in aliases:
+            name = aliases[column.table]
+            if single_table:
+                column.set("table", None)
+            else:
+                column.set("table", exp.to_identifier(name if counts[name] == 1 else column.table))
+    for table in tree.find_all(exp.Table):
+        if counts[table.name] == 1:
+            table.set("alias", None)
+    return tree
+
+
+def _normalize_output(tree):
+    """
+    Column names and, without a row limit, row order do not take part in
+    result comparison. ORDER BY references to output aliases are inlined first.
+    """
+    if not isinstance(tree, exp.Select):
+        return tree
+    outputs = {e.alias: e.this for e in tree.expressions if isinstance(e, exp.Alias)}
+    order = tree.args.get("order")
+    if order and not tree.args.get("limit"):
+        tree.set("order", None)
+    elif order:
+        for ordered in order.expressions:
+            target = ordered.this
+            if isinstance(target, exp.Column) and not target.table and target.name in outputs:
+                ordered.set("this", outputs[target.name].copy())
+    tree.set("expressions", [e.this if isinstance(e, exp.Alias) else e for e in tree.expressions])
+    return tree
+
+
+def _postorder(tree, rewrite):
+    """Apply `rewrite` to every node, children before parents, so sort keys see normalized operands."""
+    for node in reversed(list(tree.walk())):
+        new = rewrite(node)
+        if new is not node:
+            if node is tree:
+                tree = new
+            else:
+                node.replace(new)
+    return tree
+
+
+def _rewrite(tree):
+    tree = normalize_identifiers(tree, dialect="oracle")
+    tree = tree.transform(_unwrap_rownum, copy=False)
+    tree = tree.transform(_fetch_to_limit, copy=False)
+    tree = tree.transform(_anti_join_to_not_exists, copy=False)
+    tree = tree.transform(_exists_select_one, copy=False)
+    tree = _normalize_aliases(tree)
+    tree = tree.transform(_inner_joins_to_where, copy=False)
+    tree = _postorder(tree, _order_predicates)
+    return _normalize_output(tree)
+
+
+@lru_cache(maxsize=4096)
+def canonicalize(sql):
+    """
+    Canonical text of `sql` for static equivalence checks (memoized).
+
+    With sqlglot the statement is parsed (Oracle dialect) and rewritten:
+    identifiers case-folded, table aliases replaced by table names, output
+    column names dropped, inner joins moved to WHERE, AND/OR operands sorted,
+    top-level ORDER BY dropped unless rows are limited, ROWNUM top-N and
+    FETCH FIRST unified, and LEFT JOIN ... IS NULL anti-joins turned into
+    NOT EXISTS. Without sqlglot, or when the statement does not parse, only
+    whitespace and keyword case are normalized.
+    """
+    if sqlglot is not None:
+        try:
+            return _rewrite(sqlglot.parse_one(normalize_sql(sql), read="oracle")).sql(dialect="oracle")
+        except Exception:
+            pass
+    return _text_canonical(sql)
+
+
+def has_row_limit(sql):
+    """True when `sql` limits its rows anywhere (ROWNUM, FETCH FIRST/NEXT or LIMIT outside literals)."""
+    if not isinstance(sql, str):
+        return False
+    return any(not m.group(1) and _ROW_LIMIT.search(m.group(0).upper())
+               for m in _STRING_OR_WORD.finditer(canonicalize(sql)))
+
+
+def statically_equivalent(ai_sql, gt_sql):
+    """True when both statements have the same canonical form, so they must return the same rows."""
+    if not isinstance(ai_sql, str) or not isinstance(gt_sql, str):
+        return False
+    return canonicalize(ai_sql) == canonicalize(gt_sql)
@@ -0,0 +1,272 @@
+# tracing.py
+import json
+import time
+import uuid
+import atexit
+import threading
+import contextvars
+
+from . import config
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# V$MYSTAT statistics attached to per-query spans when the session can read them.
+# Statements served from the client statement cache (stmtcachesize) issue no
+# parse call at all, so parse calls per execution measure that cache directly;
+# 'session cursor cache hits' is the server-side session cursor cache, which
+# only makes the parse calls that do reach the server cheaper.
+SESSION_STATS = {
+    "SQL*Net roundtrips to/from client": "round_trips",
+    "bytes sent via SQL*Net to client": "bytes_to_client",
+    "bytes received via SQL*Net from client": "bytes_from_client",
+    "parse count (total)": "parses",
+    "parse count (hard)": "hard_parses",
+    "execute count": "executions",
+    "session cursor cache hits": "server_cursor_cache_hits",
+}
+
+
+class _NoopSpan:
+    """Returned by span() when tracing is off; every operation is a no-op."""
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "start_ns", "_token")
+
+    recording = True
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"[:200]
+        self.tracer.record(self, end_ns)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """
+    Collects nested spans timed with perf_counter_ns and appends them to a JSONL file.
+
+    One line is written per finished span with its trace id (one per Tracer),
+    parent span id, start time (epoch ns), duration and attributes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.trace_id = uuid.uuid4().hex[:16]
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def record(self, span, end_ns):
+        line = json.dumps({
+            "trace_id": self.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start_ns": span.start_ns + self._epoch_offset_ns,
+            "duration_ns": end_ns - span.start_ns,
+            "thread": threading.current_thread().name,
+            "attrs": span.attrs,
+        }, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Return the process-wide tracer configured by TRACE_FILE, or None when tracing is off."""
+    global _tracer
+    if not config.TRACE_FILE:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(config.TRACE_FILE)
+            atexit.register(_tracer.close)
+    return _tracer
+
+
+def span(name, **attrs):
+    """Context manager for a nested span; a shared no-op object when tracing is off."""
+    if not config.TRACE_FILE:
+        return _NOOP_SPAN
+    return get_tracer().span(name, **attrs)
+
+
+# Session statistics (round trips and SQL*Net bytes) -----------------------
+
+_STATS_SQL = (
+    "SELECT n.name, s.value FROM V$MYSTAT s JOIN V$STATNAME n ON n.statistic# = s.statistic# "
+    "WHERE n.name IN (" + ", ".join(f"'{name}'" for name in SESSION_STATS) + ")"
+)
+
+
+def session_stats(connection):
+    """Read SESSION_STATS for this session, or None when V$MYSTAT is not readable."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(_STATS_SQL)
+            return {SESSION_STATS[name]: value for name, value in cursor.fetchall()}
+    except Exception:
+        return None
+
+
+async def session_stats_async(connection):
+    """Async version of session_stats."""
+    try:
+        cursor = connection.cursor()
+        await cursor.execute(_STATS_SQL)
+        rows = await cursor.fetchall()
+        return {SESSION_STATS[name]: value for name, value in rows}
+    except Exception:
+        return None
+
+
+def stats_delta(before, after):
+    if before is None or after is None:
+        return {}
+    return {key: after[key] - before[key] for key in before if key in after}
+
+
+def statement_columns(delta):
+    """Result-row columns for one query's stats delta: parse calls, executions and their ratio."""
+    if "parses" not in delta or "executions" not in delta:
+        return {}
+    executions = delta["executions"]
+    return {
+        "parse_calls": delta["parses"],
+        "executions": executions,
+        "parses_per_execution": round(delta["parses"] / executions, 3) if executions else float("nan"),
+        "server_cursor_cache_hits": delta.get("server_cursor_cache_hits", 0),
+    }
+
+
+def _record_stats(query_span, result, delta):
+    query_span.set(**delta)
+    if isinstance(result, dict):
+        result.update(statement_columns(delta))
+
+
+def trace_query(evaluate, experiment):
+    """
+    Wrap a per-query function `evaluate(cursor, qid, ...)` in a 'query' span.
+
+    While tracing or with QUERY_SESSION_STATS, round trips, SQL*Net bytes,
+    parse calls and executions for the query are read from V$MYSTAT where
+    available (the two stats reads themselves are included in the deltas).
+    They go to the span, and the parse columns (statement_columns) to the
+    result row.
+    """
+    def run(cursor, qid, *rest):
+        with span("query", experiment=experiment, query_id=qid) as query_span:
+            if not (query_span.recording or config.QUERY_SESSION_STATS):
+                return evaluate(cursor, qid, *rest)
+            before = session_stats(cursor.connection)
+            result = evaluate(cursor, qid, *rest)
+            _record_stats(query_span, result, stats_delta(before, session_stats(cursor.connection)))
+            return result
+    return run
+
+
+def trace_query_async(evaluate, experiment):
+    """Async version of trace_query."""
+    async def run(cursor, qid, *rest):
+        with span("query", experiment=experiment, query_id=qid) as query_span:
+            if not (query_span.recording or config.QUERY_SESSION_STATS):
+                return await evaluate(cursor, qid, *rest)
+            before = await session_stats_async(cursor.connection)
+            result = await evaluate(cursor, qid, *rest)
+            _record_stats(query_span, result, stats_delta(before, await session_stats_async(cursor.connection)))
+            return result
+    return run
+
+
+def statement_cache_summary(df):
+    """One line on client statement cache effectiveness from result rows, or None without parse columns."""
+    if "parse_calls" not in df.columns or df["parse_calls"].isna().all():
+        return None
+    parses, executions = int(df["parse_calls"].sum()), int(df["executions"].sum())
+    ratio = f"{parses / executions:.3f}" if executions else "n/a"
+    return (f"Parse calls: {parses:,} for {executions:,} executions ({ratio} per execution, "
+            f"client statement cache size {config.STMT_CACHE_SIZE}); "
+            f"server session cursor cache hits: {int(df['server_cursor_cache_hits'].sum()):,}")
+
+
+# Loading traces back for the report ----------------------------------------
+
+def load_trace(path, trace_id=None):
+    """
+    Load a JSONL trace into a DataFrame with one row per span (duration_ms added).
+
+    Only the most recent trace in the file is returned unless `trace_id` is given.
+    """
+    import pandas as pd
+
+    with open(path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    df = pd.DataFrame(spans)
+    if df.empty:
+        return df
+    if trace_id is None:
+        trace_id = df.loc[df["start_ns"].idxmax(), "trace_id"]
+    df = df[df["trace_id"] == trace_id].copy()
+    df["duration_ms"] = df["duration_ns"] / 1e6
+    return df
+
+
+def summarize_trace(df):
+    """Per span name: count, total, mean, median and P95 duration in ms."""
+    return (
+        df.groupby("name")["duration_ms"]
+        .agg(count="count", total_ms="sum", mean_ms="mean", median_ms="median",
+             p95_ms=lambda s: s.quantile(0.95))
+        .sort_values("total_ms", ascending=False)
+    )
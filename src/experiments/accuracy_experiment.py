@@ -1,107 +1,273 @@
 # accuracy_eval.py
-import sys
 import time
-import pandas as pd
 
-sys.path.insert(0, '/Users/sanjaymishra/oracle26ai-eval')
-from src.core.select_ai_utils import init_ai_session, generate_select_ai_sql, set_time_limit
+from src.core import config
+from src.core.select_ai_utils import init_ai_session, count_rows
+from src.core.generate_cache import cached_generate_select_ai_sql
+from src.core.gt_cache import cached_gt_fingerprint
+from src.core.compare_utils import (
+    ResultFingerprint,
+    ServerHashUnsupported,
+    fingerprint_query,
+    server_fingerprint,
+    server_rows_match,
+)
+from src.core.pool_utils import map_queries
+from src.core.budget_utils import get_budgets, query_budget, run_with_budget
+from src.core.plan_utils import explain_plan, exceeds_cost_gate, cost_ratio, plan_columns
+from src.core.sql_canon import has_row_limit, statically_equivalent
+from src.core.run_history import begin_run, record_results
+from src.core.rate_limit import GenerateCall, current_generate_call
+from src.core.tracing import span, statement_cache_summary, trace_query
 
-def is_semantically_equivalent(ai_res, gt_res, ai_query, gt_sql):
-    """Check if results are semantically equivalent (same row count & pattern match)"""
-    if not ai_res or not gt_res:
+def is_semantically_equivalent(ai_fp, gt_fp, ai_query, gt_sql, rows_match=None):
+    """Check if results are semantically equivalent (same rows, or same row count & same canonical SQL)"""
+    if ai_fp is None or gt_fp is None:
         return False
     
-    # Exact match (best case)
-    if set(tuple(x) for x in ai_res) == set(tuple(x) for x in gt_res):
+    # Exact match (best case): same multiset of rows
+    if rows_match if rows_match is not None else ai_fp.matches(gt_fp):
         return True
     
-    # Same row count with known SQL pattern equivalences
-    if len(ai_res) == len(gt_res) and len(ai_res) > 0:
-        ai_upper = ai_query.upper() if isinstance(ai_query, str) else ""
-        gt_upper = gt_sql.upper()
-        
-        patterns = [
-            ('FETCH FIRST' in ai_upper and 'ROWNUM' in gt_upper),
-            ('LEFT JOIN' in ai_upper and 'NOT EXISTS' in gt_upper),
-            ('NOT EXISTS' in ai_upper and 'LEFT JOIN' in gt_upper),
-        ]
-        
-        if any(patterns):
-            return True
+    # Same row count and statically equivalent SQL (e.g. FETCH FIRST vs ROWNUM
+    # picking different rows among ties, see sql_canon.canonicalize)
+    if ai_fp.row_count == gt_fp.row_count and ai_fp.row_count > 0:
+        return statically_equivalent(ai_query, gt_sql)
     
     return False
 
-def run_accuracy_test(cursor):
+def is_static_match(ai_query, gt_sql):
+    """
+    True when the AI SQL need not run (STATIC_EQUIVALENCE): it has the ground
+    truth's canonical form and neither statement limits its rows, since
+    ROWNUM / FETCH FIRST may break ties differently.
+    """
+    return (config.STATIC_EQUIVALENCE and not has_row_limit(ai_query) and not has_row_limit(gt_sql)
+            and statically_equivalent(ai_query, gt_sql))
+
+def collect_result(cursor, sql):
+    """
+    Summarize the result of `sql` for comparison.
+
+    ACCURACY_COMPARE_MODE selects how:
+      fingerprint (default) - stream all rows through an order-insensitive fingerprint
+      count                 - only wrap the query in COUNT(*)
+      minus                 - COUNT(*) here, rows diffed server-side by compare_results
+      hash                  - server-side STANDARD_HASH + SUM aggregate
+    """
+    mode = config.ACCURACY_COMPARE_MODE
+    if mode in ("count", "minus"):
+        return ResultFingerprint.from_count(count_rows(cursor, sql))
+    if mode == "hash":
+        try:
+            return server_fingerprint(cursor, sql)
+        except ServerHashUnsupported:
+            pass
+    return fingerprint_query(cursor, sql, batch_size=config.FETCH_ARRAYSIZE)
+
+def compare_results(cursor, ai_query, ai_fp, gt_sql, gt_fp):
+    """
+    Finish a comparison that needs both sides. Returns (ai_fp, gt_fp, rows_match).
+
+    In 'minus' mode equal-sized results are diffed with MINUS ALL on the
+    server and rows_match carries the answer. In 'hash' mode a side that fell
+    back to a client fingerprint forces the other side onto the client too.
+    Otherwise rows_match is None and the fingerprints decide.
+    """
+    if ai_fp is None or gt_fp is None:
+        return ai_fp, gt_fp, None
+    mode = config.ACCURACY_COMPARE_MODE
+    if mode == "minus":
+        if ai_fp.row_count != gt_fp.row_count:
+            return ai_fp, gt_fp, False
+        try:
+            return ai_fp, gt_fp, server_rows_match(cursor, ai_query, gt_sql)
+        except Exception as e:
+            print(f"Server diff failed: {e}")
+            return ai_fp, gt_fp, False
+    if ai_fp.kind != gt_fp.kind:
+        if ai_fp.kind == "server":
+            ai_fp = fingerprint_query(cursor, ai_query, batch_size=config.FETCH_ARRAYSIZE)
+        else:
+            gt_fp = fingerprint_query(cursor, gt_sql, batch_size=config.FETCH_ARRAYSIZE)
+    return ai_fp, gt_fp, None
+
+def collect_ground_truth(cursor, gt_sql):
+    """collect_result for ground-truth SQL through the ground-truth cache. Returns (fingerprint, cache_hit)."""
+    return cached_gt_fingerprint(cursor, gt_sql, collect_result)
+
+def capture_plans(cursor, ai_query, gt_sql):
+    """EXPLAIN the AI and GT statements; a side that cannot be explained gets None."""
+    plans = []
+    for label, sql in (("AI", ai_query), ("GT", gt_sql)):
+        try:
+            plans.append(explain_plan(cursor, sql))
+        except Exception as e:
+            print(f"{label} Explain Error: {e}")
+            plans.append(None)
+    return plans
+
+def apply_cost_gate(qid, ai_plan, gt_plan, ai_budget):
+    """
+    Apply PLAN_GATE to a generated query. Returns (run_ai, ai_budget).
+
+    'skip' does not execute generated SQL estimated above PLAN_COST_MULTIPLE
+    times the GT cost; 'cap' runs it with at most PLAN_CAP_SECONDS.
+    """
+    if not exceeds_cost_gate(ai_plan, gt_plan):
+        return True, ai_budget
+    print(f"AI Q{qid}: estimated cost {cost_ratio(ai_plan, gt_plan):.1f}x ground truth ({config.PLAN_GATE})")
+    if config.PLAN_GATE == "skip":
+        return False, ai_budget
+    if config.PLAN_GATE == "cap":
+        return True, min(ai_budget, config.PLAN_CAP_SECONDS)
+    return True, ai_budget
+
+def evaluate_accuracy_query(cursor, qid, nl, gt_sql, comp):
+    """Generate, execute and compare a single test query; returns one result row."""
+    print(f"Testing Q{qid}: {nl[:50]}...")
+    budgets = get_budgets()
+    
+    ai_query = None
+    ai_fp = None
+    ai_outcome = "error"
+    # 1. AI SQL Generation
+    start = time.time()
+    try:
+        ai_query, _ = cached_generate_select_ai_sql(cursor, nl, action="showsql")
+    except Exception as e:
+        print(f"AI Error Q{qid}: {e}")
+    generate_call = current_generate_call()
+    if generate_call.throttled:
+        ai_outcome = "throttled"
+
+    # 2. Generated SQL statically equivalent to the ground truth is not run
+    # (STATIC_EQUIVALENCE); otherwise optional plan capture and cost gate
+    # (PLAN_GATE), then AI Execution - fingerprint (or count) the result within
+    # the query's budget
+    ai_plan = gt_plan = None
+    static_match = is_static_match(ai_query, gt_sql)
+    if static_match:
+        ai_outcome = "static"
+    run_ai, ai_budget = ai_query is not None and not static_match, budgets.ai_budget(qid)
+    if run_ai and config.PLAN_GATE != "off":
+        ai_plan, gt_plan = capture_plans(cursor, ai_query, gt_sql)
+        run_ai, ai_budget = apply_cost_gate(qid, ai_plan, gt_plan, ai_budget)
+        if not run_ai:
+            ai_outcome = "skipped"
+    if run_ai:
+        with span("ai_sql"):
+            ai_fp, ai_outcome = run_with_budget(cursor, collect_result, ai_query, ai_budget, f"AI Q{qid}")
+    ai_ok = ai_outcome in ("ok", "static")
+    # Rate-limit waits and throttled attempts are reported separately (generate_wait_ms)
+    latency = time.time() - start - generate_call.overhead_ms() / 1000 if ai_ok else 0
+
+    # 2. Ground Truth Execution - fingerprint (or count) the result
+    with span("gt_sql") as gt_span:
+        gt_result, gt_outcome = run_with_budget(cursor, collect_ground_truth, gt_sql, budgets.gt_budget(qid), f"GT Q{qid}")
+        gt_fp, gt_cached = gt_result or (None, False)
+        gt_span.set(cached=gt_cached, outcome=gt_outcome)
+
+    if static_match:
+        # Not executed: nothing to compare, and the AI columns stay empty
+        rows_match = gt_fp is not None
+    else:
+        with span("compare", mode=config.ACCURACY_COMPARE_MODE):
+            try:
+                with query_budget(cursor.connection, budgets.ai_budget(qid)):
+                    ai_fp, gt_fp, rows_match = compare_results(cursor, ai_query, ai_fp, gt_sql, gt_fp)
+            except Exception as e:
+                print(f"Compare Error Q{qid}: {e}")
+                rows_match = False
+    return build_accuracy_row(qid, nl, gt_sql, comp, ai_query, ai_ok, ai_fp, gt_fp, latency, rows_match,
+                              ai_outcome, gt_outcome, ai_plan, gt_plan, static_match, generate_call)
+
+def build_accuracy_row(qid, nl, gt_sql, comp, ai_query, ai_ok, ai_fp, gt_fp, latency, rows_match=None,
+                       ai_outcome="ok", gt_outcome="ok", ai_plan=None, gt_plan=None, static_match=False,
+                       generate_call=None):
+    """
+    Assemble one accuracy result row (shared by the sync and async loops).
+
+    `ai_outcome`/`gt_outcome` are 'ok', 'timeout' or 'error' (see
+    budget_utils.run_with_budget), 'skipped' for AI SQL stopped by the
+    cost gate or 'static' for AI SQL not executed (`static_match`, see
+    is_static_match); its fingerprint, row count and plan are then empty,
+    `rows_match` says whether the ground truth ran and the row counts
+    toward semantic_match only, since no rows were compared.
+    `ai_plan`/`gt_plan` come from plan_utils.explain_plan.
+    `generate_call` (rate_limit.GenerateCall) adds the GENERATE wait and
+    retries, which are not part of latency_sec; an AI outcome of 'throttled'
+    means GENERATE was still throttled after all retries.
+    """
+    # 3. Compare Results (fingerprint or server-side diff; row count in count mode)
+    if rows_match is None:
+        rows_match = ai_fp is not None and gt_fp is not None and ai_fp.matches(gt_fp)
+    exact_match = ai_ok and rows_match and not static_match
+    semantic_match = ai_ok and ((static_match and rows_match)
+                                or is_semantically_equivalent(ai_fp, gt_fp, ai_query, gt_sql, rows_match))
+    
+    # Convert results to string for CSV storage
+    ai_results_str = "[not executed]" if static_match else f"[{ai_fp.row_count if ai_fp else 0} rows]"
+    gt_results_str = f"[{gt_fp.row_count if gt_fp else 0} rows]"
+    
+    return {
+        'query_id': qid,
+        'nl_question': nl,
+        'ground_truth_sql': gt_sql,
+        'ai_query': ai_query,
+        'ai_results': ai_results_str,
+        'gt_results': gt_results_str,
+        'ai_fingerprint': ai_fp.hexdigest() if ai_fp else '',
+        'gt_fingerprint': gt_fp.hexdigest() if gt_fp else '',
+        'complexity': comp,
+        'ai_success': ai_ok,
+        'ai_outcome': ai_outcome,
+        'gt_outcome': gt_outcome,
+        'exact_match': exact_match,
+        'semantic_match': semantic_match,
+        'static_match': static_match,
+        'latency_sec': round(latency, 2),
+        **(generate_call or GenerateCall()).columns(),
+        **plan_columns('ai', ai_plan),
+        **plan_columns('gt', gt_plan),
+        'plan_cost_ratio': cost_ratio(ai_plan, gt_plan),
+    }
+
+def run_accuracy_test(cursor, pool=None, workers=1, query_ids=None):
+    """
+    Run the accuracy experiment over NL_SQL_TEST_QUERIES (only `query_ids` when given).
+
+    With a `pool` (see pool_utils.create_eval_pool) the queries are spread over
+    `workers` pooled sessions; otherwise they run serially on `cursor`.
+    """
     init_ai_session(cursor)
+    begin_run(cursor)
     
     # No longer need TO_CHAR because of oracledb.defaults.fetch_lobs = False
     cursor.execute("SELECT query_id, nl_question, ground_truth_sql, complexity FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
-    rows = cursor.fetchall()
+    rows = [row for row in cursor.fetchall() if query_ids is None or row[0] in query_ids]
     
-    results = []
-    for qid, nl, gt_sql, comp in rows:
-        print(f"Testing Q{qid}: {nl[:50]}...")
-        
-        ai_query = None
-        ai_count = 0
-        gt_count = 0
-        try:
-            # 1. AI SQL Generation
-            start = time.time()
-            ai_query = generate_select_ai_sql(cursor, nl, action="showsql")
-
-            # 2. AI Execution - wrap with COUNT(*) for performance
-            if qid == 21:
-                set_time_limit(cursor, 300)  # 5 min timeout
-
-            count_query = f"SELECT COUNT(*) FROM ({ai_query})"
-            cursor.execute(count_query)
-            ai_count = cursor.fetchone()[0]
-            latency = time.time() - start
-            ai_ok = True
-        except Exception as e:
-            ai_count, latency, ai_ok = 0, 0, False
-            print(f"AI Error Q{qid}: {e}")
+    evaluate = trace_query(evaluate_accuracy_query, "accuracy")
+    if pool is not None:
+        results = map_queries(pool, rows, evaluate, workers)
+    else:
+        results = [evaluate(cursor, *row) for row in rows]
 
-        # 2. Ground Truth Execution - wrap with COUNT(*) for performance
-        try:
-            if qid == 21:
-                cursor.execute("BEGIN DBMS_SESSION.SET_TIME_LIMIT(300); END;", ())  # 5 min timeout
-            
-            count_query = f"SELECT COUNT(*) FROM ({gt_sql})"
-            cursor.execute(count_query)
-            gt_count = cursor.fetchone()[0]
-        except Exception as e:
-            gt_count = 0
-            print(f"GT Error Q{qid}: {e}")
-
-        # 3. Compare Results (Count-based comparison)
-        exact_match = (ai_count == gt_count) if ai_ok else False
-        semantic_match = (ai_count == gt_count) if ai_ok else False
-        
-        # Convert results to string for CSV storage
-        ai_results_str = f"[{ai_count} rows]"
-        gt_results_str = f"[{gt_count} rows]"
-        
-        results.append({
-            'query_id': qid,
-            'nl_question': nl,
-            'ground_truth_sql': gt_sql,
-            'ai_query': ai_query,
-            'ai_results': ai_results_str,
-            'gt_results': gt_results_str,
-            'complexity': comp,
-            'ai_success': ai_ok,
-            'exact_match': exact_match,
-            'semantic_match': semantic_match,
-            'latency_sec': round(latency, 2)
-        })
+    return save_accuracy_results(results)
+
+def save_accuracy_results(results, profile=None):
+    """
+    Write accuracy rows to accuracy_results.csv and the run history, print
+    metrics and return the DataFrame.
+    """
+    import pandas as pd
 
     results_df = pd.DataFrame(results)
     
-    # Save to CSV
+    # Save to CSV (latest run) and append to the run history
     results_df.to_csv('accuracy_results.csv', index=False)
     print("\nResults saved to accuracy_results.csv")
+    record_results("accuracy", results_df, profile)
     
     # Calculate metrics
     print("\n" + "-"*60)
@@ -110,6 +276,18 @@ def run_accuracy_test(cursor):
     print(f"Overall Success Rate: {results_df['ai_success'].mean():.2%}")
     print(f"Exact Match Rate: {results_df['exact_match'].mean():.2%}")
     print(f"Semantic Match Rate: {results_df['semantic_match'].mean():.2%}")
+    print(f"Statically equivalent (AI SQL not executed): {results_df['static_match'].sum()}")
+    print(f"Timeouts: AI {(results_df['ai_outcome'] == 'timeout').sum()}, GT {(results_df['gt_outcome'] == 'timeout').sum()}")
+    print(f"GENERATE: {results_df['generate_retries'].sum()} retries, {results_df['generate_wait_ms'].sum() / 1000:.1f}s "
+          f"rate-limit wait, {(results_df['ai_outcome'] == 'throttled').sum()} throttled after retries")
+    parse_stats = statement_cache_summary(results_df)
+    if parse_stats:
+        print(parse_stats)
+    if results_df['plan_cost_ratio'].notna().any():
+        print(f"Skipped by cost gate: {(results_df['ai_outcome'] == 'skipped').sum()}")
+        costly = results_df[results_df['plan_cost_ratio'] > config.PLAN_COST_MULTIPLE]
+        print(f"Generated SQL estimated over {config.PLAN_COST_MULTIPLE:g}x GT cost: {len(costly)} "
+              f"({costly['semantic_match'].sum()} of them semantically correct)")
     
     print("\nBY COMPLEXITY:")
     by_comp = results_df.groupby('complexity')[['exact_match', 'semantic_match']].mean()
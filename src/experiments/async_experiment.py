@@ -0,0 +1,229 @@
+# async_experiment.py
+import time
+import asyncio
+
+from src.core import config
+from src.core.db_utils import get_async_pool, return_as_string, stream_query_async
+from src.core.select_ai_utils import init_ai_session_async, count_rows_async
+from src.core.compare_utils import (
+    ResultFingerprint,
+    ServerHashUnsupported,
+    fingerprint_query_async,
+    server_fingerprint_async,
+    server_rows_match_async,
+)
+from src.core.generate_cache import cached_generate_select_ai_sql_async
+from src.core.gt_cache import cached_gt_fingerprint_async, cached_gt_stream_async
+from src.core.tracing import span, trace_query_async
+from src.core.budget_utils import get_budgets, query_budget_async, run_with_budget_async
+from src.core.plan_utils import explain_plan_async
+from src.core.run_history import begin_run_async
+from src.core.rate_limit import current_generate_call
+from src.experiments.accuracy_experiment import apply_cost_gate, build_accuracy_row, is_static_match, save_accuracy_results
+from src.experiments.latency_experiment import build_latency_row, save_latency_results
+
+
+async def collect_result_async(cursor, sql):
+    """Async version of accuracy_experiment.collect_result."""
+    mode = config.ACCURACY_COMPARE_MODE
+    if mode in ("count", "minus"):
+        return ResultFingerprint.from_count(await count_rows_async(cursor, sql))
+    if mode == "hash":
+        try:
+            return await server_fingerprint_async(cursor, sql)
+        except ServerHashUnsupported:
+            pass
+    return await fingerprint_query_async(cursor, sql, batch_size=config.FETCH_ARRAYSIZE)
+
+
+async def compare_results_async(cursor, ai_query, ai_fp, gt_sql, gt_fp):
+    """Async version of accuracy_experiment.compare_results."""
+    if ai_fp is None or gt_fp is None:
+        return ai_fp, gt_fp, None
+    mode = config.ACCURACY_COMPARE_MODE
+    if mode == "minus":
+        if ai_fp.row_count != gt_fp.row_count:
+            return ai_fp, gt_fp, False
+        try:
+            return ai_fp, gt_fp, await server_rows_match_async(cursor, ai_query, gt_sql)
+        except Exception as e:
+            print(f"Server diff failed: {e}")
+            return ai_fp, gt_fp, False
+    if ai_fp.kind != gt_fp.kind:
+        if ai_fp.kind == "server":
+            ai_fp = await fingerprint_query_async(cursor, ai_query, batch_size=config.FETCH_ARRAYSIZE)
+        else:
+            gt_fp = await fingerprint_query_async(cursor, gt_sql, batch_size=config.FETCH_ARRAYSIZE)
+    return ai_fp, gt_fp, None
+
+
+async def collect_ground_truth_async(cursor, gt_sql):
+    """Async version of accuracy_experiment.collect_ground_truth."""
+    return await cached_gt_fingerprint_async(cursor, gt_sql, collect_result_async)
+
+
+async def stream_ground_truth_async(cursor, gt_sql):
+    """Async version of latency_experiment.stream_ground_truth."""
+    return await cached_gt_stream_async(cursor, gt_sql, stream_query_async)
+
+
+async def capture_plans_async(cursor, ai_query, gt_sql):
+    """Async version of accuracy_experiment.capture_plans."""
+    plans = []
+    for label, sql in (("AI", ai_query), ("GT", gt_sql)):
+        try:
+            plans.append(await explain_plan_async(cursor, sql))
+        except Exception as e:
+            print(f"{label} Explain Error: {e}")
+            plans.append(None)
+    return plans
+
+
+async def evaluate_accuracy_query_async(cursor, qid, nl, gt_sql, comp):
+    """Async version of accuracy_experiment.evaluate_accuracy_query."""
+    print(f"Testing Q{qid}: {nl[:50]}...")
+    budgets = get_budgets()
+
+    ai_query = None
+    ai_fp = None
+    ai_outcome = "error"
+    start = time.time()
+    try:
+        ai_query, _ = await cached_generate_select_ai_sql_async(cursor, nl, action="showsql")
+    except Exception as e:
+        print(f"AI Error Q{qid}: {e}")
+    generate_call = current_generate_call()
+    if generate_call.throttled:
+        ai_outcome = "throttled"
+
+    ai_plan = gt_plan = None
+    static_match = is_static_match(ai_query, gt_sql)
+    if static_match:
+        ai_outcome = "static"
+    run_ai, ai_budget = ai_query is not None and not static_match, budgets.ai_budget(qid)
+    if run_ai and config.PLAN_GATE != "off":
+        ai_plan, gt_plan = await capture_plans_async(cursor, ai_query, gt_sql)
+        run_ai, ai_budget = apply_cost_gate(qid, ai_plan, gt_plan, ai_budget)
+        if not run_ai:
+            ai_outcome = "skipped"
+    if run_ai:
+        with span("ai_sql"):
+            ai_fp, ai_outcome = await run_with_budget_async(
+                cursor, collect_result_async, ai_query, ai_budget, f"AI Q{qid}")
+    ai_ok = ai_outcome in ("ok", "static")
+    latency = time.time() - start - generate_call.overhead_ms() / 1000 if ai_ok else 0
+
+    with span("gt_sql") as gt_span:
+        gt_result, gt_outcome = await run_with_budget_async(
+            cursor, collect_ground_truth_async, gt_sql, budgets.gt_budget(qid), f"GT Q{qid}")
+        gt_fp, gt_cached = gt_result or (None, False)
+        gt_span.set(cached=gt_cached, outcome=gt_outcome)
+
+    if static_match:
+        rows_match = gt_fp is not None
+    else:
+        with span("compare", mode=config.ACCURACY_COMPARE_MODE):
+            try:
+                async with query_budget_async(cursor.connection, budgets.ai_budget(qid)):
+                    ai_fp, gt_fp, rows_match = await compare_results_async(cursor, ai_query, ai_fp, gt_sql, gt_fp)
+            except Exception as e:
+                print(f"Compare Error Q{qid}: {e}")
+                rows_match = False
+    return build_accuracy_row(qid, nl, gt_sql, comp, ai_query, ai_ok, ai_fp, gt_fp, latency, rows_match,
+                              ai_outcome, gt_outcome, ai_plan, gt_plan, static_match, generate_call)
+
+
+async def time_latency_query_async(cursor, qid, nl, gt_sql):
+    """Async version of latency_experiment.time_latency_query."""
+    print(f"Timing Q{qid}: {nl[:50]}...")
+    budgets = get_budgets()
+
+    try:
+        start_llm = time.time()
+        generated_sql, llm_cached = await cached_generate_select_ai_sql_async(
+            cursor, nl, action="showsql", bypass=config.GENERATE_CACHE_BYPASS_TIMING)
+        generate_call = current_generate_call()
+        llm_ms = (time.time() - start_llm) * 1000 - generate_call.overhead_ms()
+    except Exception as e:
+        print(f"Latency Error Q{qid}: {e}")
+        return None
+
+    with span("ai_sql"):
+        ai_stats, ai_outcome = await run_with_budget_async(
+            cursor, stream_query_async, generated_sql, budgets.ai_budget(qid), f"Latency Q{qid} AI")
+
+    with span("gt_sql") as gt_span:
+        gt_result, gt_outcome = await run_with_budget_async(
+            cursor, stream_ground_truth_async, gt_sql, budgets.gt_budget(qid), f"Latency Q{qid} GT")
+        gt_stats, gt_cached = gt_result or (None, False)
+        gt_span.set(cached=gt_cached, outcome=gt_outcome)
+
+    if "error" in (ai_outcome, gt_outcome):
+        return None
+    return build_latency_row(qid, nl, gt_sql, generated_sql, llm_ms, ai_stats, gt_stats, llm_cached, gt_cached,
+                             ai_outcome, gt_outcome, generate_call)
+
+
+async def _run_queries(pool, rows, evaluate, sessions, profile_name):
+    """
+    Drain `rows` with `sessions` worker tasks, each holding one pooled session.
+
+    Each worker runs init_ai_session once for its session; all GENERATE calls and SQL
+    executions overlap on the running event loop. Results keep the order of
+    `rows` and `None` results are dropped.
+    """
+    queue = asyncio.Queue()
+    for index, row in enumerate(rows):
+        queue.put_nowait((index, row))
+    results = [None] * len(rows)
+
+    async def worker():
+        async with pool.acquire() as conn:
+            conn.outputtypehandler = return_as_string
+            cursor = conn.cursor()
+            await init_ai_session_async(cursor, profile_name)
+            while True:
+                try:
+                    index, row = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[index] = await evaluate(cursor, *row)
+
+    await asyncio.gather(*(worker() for _ in range(min(sessions, len(rows)) or 1)))
+    return [r for r in results if r is not None]
+
+
+async def run_async_experiments(sessions=None, profile_name=None):
+    """
+    Run the accuracy and latency experiments on one event loop over an async pool.
+
+    Produces the same DataFrames and CSV files as run_accuracy_test and
+    run_latency_test. `sessions` defaults to config.WORKERS.
+    """
+    sessions = sessions or config.WORKERS
+    profile_name = profile_name or config.PROFILE
+    pool = get_async_pool(sessions)
+    try:
+        async with pool.acquire() as conn:
+            conn.outputtypehandler = return_as_string
+            cursor = conn.cursor()
+            await cursor.execute("SELECT query_id, nl_question, ground_truth_sql, complexity FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
+            rows = await cursor.fetchall()
+            await begin_run_async(cursor)
+
+        acc_results = await _run_queries(pool, rows, trace_query_async(evaluate_accuracy_query_async, "accuracy"),
+                                         sessions, profile_name)
+        acc_df = save_accuracy_results(acc_results, profile_name)
+
+        lat_rows = [(qid, nl, gt_sql) for qid, nl, gt_sql, _ in rows]
+        lat_results = await _run_queries(pool, lat_rows, trace_query_async(time_latency_query_async, "latency"),
+                                         sessions, profile_name)
+        lat_df = save_latency_results(lat_results, profile_name)
+    finally:
+        await pool.close(force=True)
+
+    return acc_df, lat_df
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async_experiments())
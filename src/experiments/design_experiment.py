@@ -0,0 +1,79 @@
+# design_experiment.py
+from src.core import config
+from src.core.db_utils import stream_query
+from src.core.physical_design import apply_profile
+
+
+def time_ground_truth(cursor, qid, gt_sql):
+    """Stream one ground-truth query; returns time-to-last-row in ms, or NaN on error/timeout."""
+    try:
+        return stream_query(cursor, gt_sql)['ttlr_ms']
+    except Exception as e:
+        print(f"GT Error Q{qid}: {e}")
+        return float('nan')
+
+
+def run_design_benchmark(cursor, profiles=None, warmup=None, repetitions=None):
+    """
+    Time the ground-truth queries under each physical-design profile.
+
+    For every profile in `profiles` (default DESIGN_PROFILES) the schema is
+    switched with apply_profile, each query runs `warmup` times unrecorded and
+    `repetitions` times measured, and the median is compared with the first
+    profile. Each execution is capped by DESIGN_QUERY_TIMEOUT via call_timeout.
+    The last profile stays applied. Results go to design_benchmark.csv.
+    """
+    import numpy as np
+    import pandas as pd
+
+    profiles = profiles or config.DESIGN_PROFILES
+    warmup = config.BENCH_WARMUP if warmup is None else warmup
+    repetitions = config.BENCH_REPETITIONS if repetitions is None else repetitions
+
+    cursor.execute("SELECT query_id, ground_truth_sql FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
+    queries = cursor.fetchall()
+
+    connection = cursor.connection
+    previous_timeout = connection.call_timeout
+    connection.call_timeout = config.DESIGN_QUERY_TIMEOUT * 1000
+    samples = []
+    try:
+        for profile in profiles:
+            apply_profile(cursor, profile)
+            print(f"Timing {len(queries)} ground-truth queries under '{profile}'")
+            for qid, gt_sql in queries:
+                for _ in range(warmup):
+                    time_ground_truth(cursor, qid, gt_sql)
+                for rep in range(repetitions):
+                    samples.append({'profile': profile, 'query_id': qid, 'round': rep,
+                                    'gt_exe_ms': time_ground_truth(cursor, qid, gt_sql)})
+    finally:
+        connection.call_timeout = previous_timeout
+
+    df = pd.DataFrame(samples)
+    medians = df.groupby(['query_id', 'profile'])['gt_exe_ms'].median().unstack('profile')[profiles]
+    baseline = profiles[0]
+    result = medians.round(2)
+    for profile in profiles[1:]:
+        result[f'speedup_{profile}'] = (medians[baseline] / medians[profile]).round(2)
+    result = result.reset_index()
+    result.to_csv('design_benchmark.csv', index=False)
+    print("\nResults saved to design_benchmark.csv")
+
+    print(f"\nGROUND-TRUTH MEDIAN EXECUTION TIME BY PROFILE (ms, {repetitions} runs each)")
+    print(result.to_string(index=False))
+    print(f"\nGEOMETRIC-MEAN SPEEDUP VS '{baseline}':")
+    for profile in profiles[1:]:
+        ratios = (medians[baseline] / medians[profile]).dropna()
+        ratios = ratios[ratios > 0]
+        geo = float(np.exp(np.log(ratios).mean())) if len(ratios) else float('nan')
+        print(f"  {profile:10}: {geo:.2f}x over {len(ratios)} queries")
+
+    return result
+
+
+if __name__ == "__main__":
+    from src.core.db_utils import get_connection
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            run_design_benchmark(cursor)
@@ -0,0 +1,135 @@
+# latency_benchmark.py
+import random
+import numpy as np
+import pandas as pd
+
+from src.core import config
+from src.core.select_ai_utils import init_ai_session
+from src.core.tracing import trace_query
+from src.experiments.latency_experiment import time_latency_query
+
+METRICS = ['llm_latency_ms', 'ai_exe_ms', 'gt_exe_ms', 'total_ai_latency_ms']
+
+
+def bootstrap_median_ci(values, n_resamples=2000, confidence=0.95, rng=None):
+    """Percentile bootstrap confidence interval for the median of `values`."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return (float(values[0]), float(values[0])) if len(values) else (np.nan, np.nan)
+    rng = rng or np.random.default_rng()
+    resamples = rng.choice(values, size=(n_resamples, len(values)), replace=True)
+    medians = np.median(resamples, axis=1)
+    alpha = (1 - confidence) / 2
+    return float(np.quantile(medians, alpha)), float(np.quantile(medians, 1 - alpha))
+
+
+def flag_outliers(values, k=1.5):
+    """Tukey fences: True for values outside [Q1 - k*IQR, Q3 + k*IQR]."""
+    values = np.asarray(values, dtype=float)
+    q1, q3 = np.nanpercentile(values, [25, 75])
+    iqr = q3 - q1
+    return (values < q1 - k * iqr) | (values > q3 + k * iqr)
+
+
+def summarize_samples(samples_df, n_resamples=2000, seed=None):
+    """
+    Reduce repeated latency samples to one row per query.
+
+    Each metric column holds the per-query median, with `<metric>_ci_low` /
+    `<metric>_ci_high` bootstrap bounds. Samples flagged as outliers on
+    total_ai_latency_ms are counted in `n_outliers`.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for qid, group in samples_df.groupby('query_id', sort=True):
+        row = {
+            'query_id': qid,
+            'nl_question': group['nl_question'].iloc[0],
+            'n_samples': len(group),
+            'n_outliers': int(group['outlier'].sum()),
+            'n_timeouts': int((group['ai_outcome'] == 'timeout').sum()),
+        }
+        for metric in METRICS:
+            values = group[metric].dropna()  # timed-out executions have NaN timings
+            low, high = bootstrap_median_ci(values, n_resamples, rng=rng)
+            row[metric] = round(float(values.median()), 2)
+            row[f'{metric}_ci_low'] = round(low, 2)
+            row[f'{metric}_ci_high'] = round(high, 2)
+        row['overhead_ratio'] = round(row['llm_latency_ms'] / row['ai_exe_ms'], 2) if row['ai_exe_ms'] > 0 else 0
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def run_latency_benchmark(cursor, warmup=None, repetitions=None, seed=None, query_ids=None):
+    """
+    Repeated-measurement version of run_latency_test.
+
+    Runs `warmup` unrecorded rounds and then `repetitions` measured rounds,
+    shuffling the query order every round. Raw samples go to
+    latency_samples.csv (with round number and outlier flag) and per-query
+    medians with bootstrap confidence intervals to latency_benchmark.csv.
+    GENERATE_CACHE_BYPASS_TIMING (on by default) keeps a configured GENERATE
+    cache out of the timings; with it off every round after the first
+    measures cache hits. `query_ids`
+    restricts the benchmark to those queries.
+    """
+    warmup = config.BENCH_WARMUP if warmup is None else warmup
+    repetitions = config.BENCH_REPETITIONS if repetitions is None else repetitions
+    seed = config.BENCH_SEED if seed is None else seed
+    rng = random.Random(seed)
+
+    init_ai_session(cursor)
+    cursor.execute("SELECT query_id, nl_question, ground_truth_sql FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
+    queries = [row for row in cursor.fetchall() if query_ids is None or row[0] in query_ids]
+    evaluate = trace_query(time_latency_query, "latency_benchmark")
+
+    for w in range(warmup):
+        print(f"\nWarm-up round {w + 1}/{warmup}")
+        order = queries[:]
+        rng.shuffle(order)
+        for row in order:
+            evaluate(cursor, *row)
+
+    samples = []
+    for rep in range(repetitions):
+        print(f"\nMeasured round {rep + 1}/{repetitions}")
+        order = queries[:]
+        rng.shuffle(order)
+        for position, row in enumerate(order):
+            result = evaluate(cursor, *row)
+            if result is not None:
+                result['round'] = rep
+                result['position'] = position
+                samples.append(result)
+
+    if not samples:
+        print("\nNo latency samples collected (every query failed or was skipped); nothing saved.")
+        return pd.DataFrame()
+
+    samples_df = pd.DataFrame(samples)
+    samples_df['outlier'] = samples_df.groupby('query_id')['total_ai_latency_ms'].transform(flag_outliers)
+    samples_df.to_csv('latency_samples.csv', index=False)
+    print("\nSamples saved to latency_samples.csv")
+
+    summary_df = summarize_samples(samples_df, config.BENCH_BOOTSTRAP, seed)
+    summary_df.to_csv('latency_benchmark.csv', index=False)
+    print("Per-query summary saved to latency_benchmark.csv")
+
+    print(f"\nLATENCY BENCHMARK ({warmup} warm-up, {repetitions} measured rounds, {len(samples_df)} samples)")
+    print(f"Median of per-query medians: {summary_df['total_ai_latency_ms'].median():.2f} ms")
+    print(f"P95 over all samples: {samples_df['total_ai_latency_ms'].quantile(0.95):.2f} ms")
+    print(f"Outlier samples: {int(samples_df['outlier'].sum())}")
+    print("\nPER-QUERY MEDIAN TOTAL LATENCY (95% bootstrap CI):")
+    for _, row in summary_df.iterrows():
+        print(f"  Q{row['query_id']}: {row['total_ai_latency_ms']:.2f} ms "
+              f"[{row['total_ai_latency_ms_ci_low']:.2f}, {row['total_ai_latency_ms_ci_high']:.2f}]"
+              f"{' (' + str(row['n_outliers']) + ' outliers)' if row['n_outliers'] else ''}")
+
+    return summary_df
+
+
+if __name__ == "__main__":
+    from src.core.db_utils import get_connection
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            run_latency_benchmark(cursor)
@@ -1,99 +1,174 @@
-import sys
 import time
-import pandas as pd
 
-sys.path.insert(0, '/Users/sanjaymishra/oracle26ai-eval')
-from src.core.select_ai_utils import init_ai_session, generate_select_ai_sql, set_time_limit
+from src.core import config
+from src.core.select_ai_utils import init_ai_session
+from src.core.generate_cache import cached_generate_select_ai_sql
+from src.core.gt_cache import cached_gt_stream
+from src.core.db_utils import stream_query
+from src.core.pool_utils import map_queries
+from src.core.budget_utils import get_budgets, run_with_budget
+from src.core.run_history import begin_run, record_results
+from src.core.rate_limit import GenerateCall, current_generate_call
+from src.core.tracing import span, statement_cache_summary, trace_query
 
-def run_latency_test(cursor):
+def stream_ground_truth(cursor, gt_sql):
+    """stream_query for ground-truth SQL through the ground-truth cache. Returns (stats, cache_hit)."""
+    return cached_gt_stream(cursor, gt_sql, stream_query)
+
+def time_latency_query(cursor, qid, nl, gt_sql):
+    """
+    Time generation and execution of a single test query.
+
+    Returns one result row, or None on error. Executions that overrun their
+    budget (budget_utils) still produce a row, with a 'timeout' outcome.
+    """
+    print(f"Timing Q{qid}: {nl[:50]}...")
+    budgets = get_budgets()
+    
+    try:
+        # STAGE 1: Measure LLM Generation (The 'Thinking' phase)
+        # action => 'showsql' stops Oracle from running the query, giving us pure LLM time.
+        start_llm = time.time()
+        generated_sql, llm_cached = cached_generate_select_ai_sql(
+            cursor, nl, action="showsql", bypass=config.GENERATE_CACHE_BYPASS_TIMING)
+        # Rate-limit waits and throttled attempts are not LLM time (see generate_wait_ms)
+        generate_call = current_generate_call()
+        llm_ms = (time.time() - start_llm) * 1000 - generate_call.overhead_ms()
+    except Exception as e:
+        print(f"Latency Error Q{qid}: {e}")
+        return None
+
+    # STAGE 2: Measure Oracle Execution (The 'Doing' phase)
+    # Execute full SQL and measure TRUE execution time (including network transfer)
+    with span("ai_sql"):
+        ai_stats, ai_outcome = run_with_budget(cursor, stream_query, generated_sql, budgets.ai_budget(qid),
+                                               f"Latency Q{qid} AI")
+    
+    # STAGE 3: Get Ground Truth Results (measure true execution time)
+    with span("gt_sql") as gt_span:
+        gt_result, gt_outcome = run_with_budget(cursor, stream_ground_truth, gt_sql, budgets.gt_budget(qid),
+                                                f"Latency Q{qid} GT")
+        gt_stats, gt_cached = gt_result or (None, False)
+        gt_span.set(cached=gt_cached, outcome=gt_outcome)
+
+    if "error" in (ai_outcome, gt_outcome):
+        return None
+    return build_latency_row(qid, nl, gt_sql, generated_sql, llm_ms, ai_stats, gt_stats, llm_cached, gt_cached,
+                             ai_outcome, gt_outcome, generate_call)
+
+def _stat(stats, key):
+    return stats[key] if stats is not None else float('nan')
+
+def build_latency_row(qid, nl, gt_sql, generated_sql, llm_ms, ai_stats, gt_stats, llm_cached=False, gt_cached=False,
+                      ai_outcome="ok", gt_outcome="ok", generate_call=None):
+    """
+    Assemble one latency result row (shared by the sync and async loops).
+
+    `ai_stats`/`gt_stats` come from db_utils.stream_query; the execution time
+    columns are time-to-last-row, i.e. execute plus full transfer. With
+    `gt_cached` the ground-truth stats come from the ground-truth cache. A
+    side that timed out has stats None and NaN timing columns. `llm_ms`
+    excludes the rate-limit wait and retries in `generate_call`, which get
+    their own columns.
+    """
+    exe_ms = _stat(ai_stats, 'ttlr_ms')
+    gt_ms = _stat(gt_stats, 'ttlr_ms')
+    total_ms = llm_ms + exe_ms
+
+    return {
+        'query_id': qid,
+        'nl_question': nl,
+        'generated_sql': generated_sql,
+        'ground_truth_sql': gt_sql,
+        'ai_results': f"[{ai_stats['rows']} rows]" if ai_stats else "[timeout]",
+        'gt_results': f"[{gt_stats['rows']} rows]" if gt_stats else "[timeout]",
+        'llm_latency_ms': round(llm_ms, 2),
+        **(generate_call or GenerateCall()).columns(),
+        'ai_exe_ms': round(exe_ms, 2),
+        'gt_exe_ms': round(gt_ms, 2),
+        'total_ai_latency_ms': round(total_ms, 2),
+        'overhead_ratio': round(llm_ms / exe_ms, 2) if exe_ms > 0 else 0,
+        'ai_outcome': ai_outcome,
+        'gt_outcome': gt_outcome,
+        'llm_cached': llm_cached,
+        'gt_cached': gt_cached,
+        'ai_ttfr_ms': round(_stat(ai_stats, 'ttfr_ms'), 2),
+        'ai_rows_per_sec': round(_stat(ai_stats, 'rows_per_sec'), 1),
+        'ai_bytes': _stat(ai_stats, 'bytes'),
+        'gt_ttfr_ms': round(_stat(gt_stats, 'ttfr_ms'), 2),
+        'gt_rows_per_sec': round(_stat(gt_stats, 'rows_per_sec'), 1),
+        'gt_bytes': _stat(gt_stats, 'bytes'),
+    }
+
+def run_latency_test(cursor, pool=None, workers=1, query_ids=None):
     """
     Measures the breakdown of latency into:
     1. LLM Generation (Thinking)
     2. Oracle Execution (Doing)
+
+    With a `pool` (see pool_utils.create_eval_pool) the queries are spread over
+    `workers` pooled sessions; per-query timings are measured exactly as in the
+    serial loop on `cursor`. `query_ids` restricts the run to those queries.
     """
     init_ai_session(cursor)
+    begin_run(cursor)
     
     # Fetch test queries from your Ground Truth table
     cursor.execute("SELECT query_id, nl_question, ground_truth_sql FROM NL_SQL_TEST_QUERIES")
-    rows = cursor.fetchall()
+    rows = [row for row in cursor.fetchall() if query_ids is None or row[0] in query_ids]
     
-    results = []
-
-    for row in rows:
-        qid, nl, gt_sql = row
-        print(f"Timing Q{qid}: {nl[:50]}...")
-        
-        try:
-            # STAGE 1: Measure LLM Generation (The 'Thinking' phase)
-            # action => 'showsql' stops Oracle from running the query, giving us pure LLM time.
-            start_llm = time.time()
-            generated_sql = generate_select_ai_sql(cursor, nl, action="showsql")
-            llm_ms = (time.time() - start_llm) * 1000
-
-            # STAGE 2: Measure Oracle Execution (The 'Doing' phase)
-            # Execute full SQL and measure TRUE execution time (including network transfer)
-            if qid == 21:
-                set_time_limit(cursor, 60)  # 60 sec timeout for Q21
-
-            start_exe = time.time()
-            cursor.execute(generated_sql)
-            ai_results = cursor.fetchall()  # Fetch actual results for true latency
-            exe_ms = (time.time() - start_exe) * 1000
-            ai_count = len(ai_results)
-            ai_results = f"[{ai_count} rows]"
-            
-            # STAGE 3: Get Ground Truth Results (measure true execution time)
-            if qid == 21:
-                set_time_limit(cursor, 60)  # 60 sec timeout for Q21
-
-            start_gt = time.time()
-            cursor.execute(gt_sql)
-            gt_results = cursor.fetchall()  # Fetch actual results
-            gt_ms = (time.time() - start_gt) * 1000
-            gt_count = len(gt_results)
-            gt_results = f"[{gt_count} rows]"
-            
-            total_ms = llm_ms + exe_ms
-            
-            # Results already stored as count strings above
-            ai_results_str = ai_results
-            gt_results_str = gt_results
-
-            results.append({
-                'query_id': qid,
-                'nl_question': nl,
-                'generated_sql': generated_sql,
-                'ground_truth_sql': gt_sql,
-                'ai_results': ai_results_str,
-                'gt_results': gt_results_str,
-                'llm_latency_ms': round(llm_ms, 2),
-                'ai_exe_ms': round(exe_ms, 2),
-                'gt_exe_ms': round(gt_ms, 2),
-                'total_ai_latency_ms': round(total_ms, 2),
-                'overhead_ratio': round(llm_ms / exe_ms, 2) if exe_ms > 0 else 0
-            })
-
-        except Exception as e:
-            print(f"Latency Error Q{qid}: {e}")
+    evaluate = trace_query(time_latency_query, "latency")
+    if pool is not None:
+        results = map_queries(pool, rows, evaluate, workers)
+    else:
+        results = [r for r in (evaluate(cursor, *row) for row in rows) if r is not None]
+
+    return save_latency_results(results)
+
+def save_latency_results(results, profile=None):
+    """
+    Write latency rows to latency_results.csv and the run history, print
+    statistics and return the DataFrame. Rows served from the GENERATE cache
+    (llm_cached, see GENERATE_CACHE_BYPASS_TIMING) are left out of the LLM,
+    overhead and end-to-end statistics.
+    """
+    import pandas as pd
 
     df = pd.DataFrame(results)
+    if df.empty:
+        print("\nNo latency results collected (every query failed); nothing saved.")
+        return df
     
-    # Save to CSV
+    # Save to CSV (latest run) and append to the run history
     df.to_csv('latency_results.csv', index=False)
     print("\nResults saved to latency_results.csv")
+    record_results("latency", df, profile)
+    cold = df[~df['llm_cached'].astype(bool)]
     
     # Statistical analysis
     print("\nLATENCY STATISTICS (TRUE END-TO-END EXECUTION TIME)")
-    print(f"Mean: {df['total_ai_latency_ms'].mean():.2f} ms")
-    print(f"Median: {df['total_ai_latency_ms'].median():.2f} ms")
-    print(f"P95: {df['total_ai_latency_ms'].quantile(0.95):.2f} ms")
-    print(f"P99: {df['total_ai_latency_ms'].quantile(0.99):.2f} ms")
+    if len(cold) < len(df):
+        print(f"GENERATE cache hits: {len(df) - len(cold)} of {len(df)} queries (excluded from LLM and end-to-end timings)")
+    print(f"Mean: {cold['total_ai_latency_ms'].mean():.2f} ms")
+    print(f"Median: {cold['total_ai_latency_ms'].median():.2f} ms")
+    print(f"P95: {cold['total_ai_latency_ms'].quantile(0.95):.2f} ms")
+    print(f"P99: {cold['total_ai_latency_ms'].quantile(0.99):.2f} ms")
+    print(f"Timeouts: AI {(df['ai_outcome'] == 'timeout').sum()}, GT {(df['gt_outcome'] == 'timeout').sum()} (excluded from timings)")
     
     print("\n=== BREAKDOWN ANALYSIS ===")
-    print(f"Avg LLM Generation Time: {df['llm_latency_ms'].mean():.2f} ms")
+    print(f"Avg LLM Generation Time: {cold['llm_latency_ms'].mean():.2f} ms")
+    print(f"GENERATE Rate-Limit Wait: {df['generate_wait_ms'].sum() / 1000:.1f}s total, {df['generate_retries'].sum()} retries (excluded from generation time)")
     print(f"Avg AI SQL Execution Time: {df['ai_exe_ms'].mean():.2f} ms (includes network transfer)")
     print(f"Avg Ground Truth Execution Time: {df['gt_exe_ms'].mean():.2f} ms")
-    print(f"Avg Overhead Ratio (LLM/AI-Exe): {(df['llm_latency_ms'] / df['ai_exe_ms']).mean():.2f}x")
+    print(f"Avg Overhead Ratio (LLM/AI-Exe): {(cold['llm_latency_ms'] / cold['ai_exe_ms']).mean():.2f}x")
+    
+    print("\n=== FETCH ANALYSIS (server execution vs transfer) ===")
+    print(f"Avg AI Time-to-First-Row: {df['ai_ttfr_ms'].mean():.2f} ms, Time-to-Last-Row: {df['ai_exe_ms'].mean():.2f} ms")
+    print(f"Avg GT Time-to-First-Row: {df['gt_ttfr_ms'].mean():.2f} ms, Time-to-Last-Row: {df['gt_exe_ms'].mean():.2f} ms")
+    print(f"Total Bytes Fetched: AI {df['ai_bytes'].sum():,} / GT {df['gt_bytes'].sum():,}")
+    parse_stats = statement_cache_summary(df)
+    if parse_stats:
+        print(parse_stats)
     
     return df
 
@@ -0,0 +1,209 @@
+# load_experiment.py
+import sys
+import time
+import queue
+import random
+import threading
+
+from src.core import config
+from src.core.budget_utils import get_budgets, query_budget
+from src.core.rate_limit import begin_generate_call, scheduled_generate_select_ai_sql
+from src.core.db_utils import stream_query, acquire_connection
+from src.core.pool_utils import create_eval_pool
+from src.core.tracing import span
+
+_STOP = object()
+
+
+def run_request(cursor, qid, nl):
+    """
+    One load-test request: GENERATE the SQL for `nl` through the GENERATE
+    scheduler and stream its full result within the query's budget (see
+    budget_utils), so a runaway query fails with QueryTimeout instead of
+    holding its session.
+    """
+    with span("load_request", query_id=qid):
+        begin_generate_call()
+        generated_sql = scheduled_generate_select_ai_sql(cursor, nl, action="showsql")
+        with query_budget(cursor.connection, get_budgets().ai_budget(qid)):
+            return stream_query(cursor, generated_sql)['rows']
+
+
+def _record(samples, lock, request_no, qid, t0, intended, start, end, error):
+    sample = {
+        'request_no': request_no,
+        'query_id': qid,
+        'intended_s': round(intended - t0, 4),
+        'start_s': round(start - t0, 4),
+        'end_s': round(end - t0, 4),
+        'queue_ms': round((start - intended) * 1000, 2),
+        'service_ms': round((end - start) * 1000, 2),
+        # Measured from the intended start, so requests delayed behind slow
+        # ones are charged for the wait (coordinated-omission correction).
+        'latency_ms': round((end - intended) * 1000, 2),
+        'ok': error is None,
+        'error': error or '',
+    }
+    with lock:
+        samples.append(sample)
+
+
+def _timed_request(cursor, request_no, qid, nl, t0, intended, samples, lock):
+    start = time.perf_counter()
+    error = None
+    try:
+        run_request(cursor, qid, nl)
+    except Exception as e:
+        error = str(e)[:200]
+    _record(samples, lock, request_no, qid, t0, intended, start, time.perf_counter(), error)
+
+
+def _open_loop(pool, queries, rate, users, duration, rng, samples, lock, t0):
+    """Poisson arrivals at `rate` req/s, served by `users` sessions through a FIFO queue."""
+    pending = queue.Queue()
+
+    def worker():
+        with acquire_connection(pool) as conn:
+            with conn.cursor() as cursor:
+                while True:
+                    item = pending.get()
+                    if item is _STOP:
+                        return
+                    _timed_request(cursor, *item, t0, samples, lock)
+
+    threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(users)]
+    for t in threads:
+        t.start()
+
+    # Arrival times follow a fixed schedule that does not wait for responses.
+    intended = t0
+    request_no = 0
+    while True:
+        intended += rng.expovariate(rate)
+        if intended - t0 >= duration:
+            break
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        qid, nl = rng.choice(queries)
+        pending.put((request_no, qid, nl, intended))
+        request_no += 1
+
+    for _ in threads:
+        pending.put(_STOP)
+    for t in threads:
+        t.join()
+
+
+def _closed_loop(pool, queries, users, duration, think_time, seed, samples, lock, t0):
+    """`users` virtual users, each issuing its next request `think_time` seconds after the last one ends."""
+    counter = iter(range(sys.maxsize))
+
+    def user(index):
+        user_rng = random.Random(None if seed is None else seed + index)
+        with acquire_connection(pool) as conn:
+            with conn.cursor() as cursor:
+                while time.perf_counter() - t0 < duration:
+                    qid, nl = user_rng.choice(queries)
+                    _timed_request(cursor, next(counter), qid, nl, t0, time.perf_counter(), samples, lock)
+                    if think_time:
+                        time.sleep(user_rng.expovariate(1 / think_time))
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"user-{i}") for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def load_timeline(df, window):
+    """Per `window`-second bucket (by completion time): throughput, latency percentiles and queueing delay."""
+    import pandas as pd
+
+    df = df.assign(window_start_s=(df['end_s'] // window) * window)
+    grouped = df.groupby('window_start_s')
+    timeline = pd.DataFrame({
+        'completed': grouped.size(),
+        'errors': grouped['ok'].apply(lambda s: int((~s).sum())),
+        'throughput_rps': grouped.size() / window,
+        'p50_ms': grouped['latency_ms'].quantile(0.50),
+        'p95_ms': grouped['latency_ms'].quantile(0.95),
+        'p99_ms': grouped['latency_ms'].quantile(0.99),
+        'mean_queue_ms': grouped['queue_ms'].mean(),
+    })
+    return timeline.round(2).reset_index()
+
+
+def run_load_test(pool, queries, mode=None, rate=None, users=None, duration=None, think_time=None, seed=None):
+    """
+    Drive GENERATE plus execution of `queries` [(query_id, nl_question), ...] under load.
+
+    mode 'open' issues Poisson arrivals at `rate` req/s regardless of how fast
+    responses come back, served by `users` pooled sessions; latency_ms counts
+    from the scheduled arrival, so queueing behind a saturated tier shows up.
+    mode 'closed' runs `users` virtual users back to back with exponential
+    think time. Requests are paced by the GENERATE scheduler and bounded by
+    the query budgets, as in the experiments. Writes load_samples.csv and
+    load_timeline.csv and returns the samples DataFrame (empty, with nothing
+    written, when no request ran).
+    """
+    mode = mode or config.LOAD_MODE
+    rate = rate or config.LOAD_RATE
+    users = users or config.LOAD_USERS
+    duration = duration or config.LOAD_DURATION
+    think_time = config.LOAD_THINK_TIME if think_time is None else think_time
+    seed = config.BENCH_SEED if seed is None else seed
+
+    samples = []
+    lock = threading.Lock()
+    print(f"\nLoad test: {mode} loop, {users} sessions, {duration}s"
+          + (f", {rate} req/s offered" if mode == "open" else f", think time {think_time}s"))
+
+    t0 = time.perf_counter()
+    if mode == "open":
+        _open_loop(pool, queries, rate, users, duration, random.Random(seed), samples, lock, t0)
+    elif mode == "closed":
+        _closed_loop(pool, queries, users, duration, think_time, seed, samples, lock, t0)
+    else:
+        raise ValueError(f"Unknown load mode: {mode}")
+    elapsed = time.perf_counter() - t0
+
+    import pandas as pd
+    if not samples:
+        print("\nNo load-test requests ran (duration too short for the offered rate?); nothing saved.")
+        return pd.DataFrame()
+
+    df = pd.DataFrame(samples).sort_values('request_no')
+    df.to_csv('load_samples.csv', index=False)
+    timeline = load_timeline(df, config.LOAD_WINDOW)
+    timeline.to_csv('load_timeline.csv', index=False)
+    print("\nSamples saved to load_samples.csv, timeline to load_timeline.csv")
+
+    ok = df[df['ok']]
+    print("\nLOAD TEST RESULTS")
+    print(f"Requests: {len(df)} ({len(df) - len(ok)} errors) in {elapsed:.1f}s")
+    if mode == "open":
+        print(f"Offered rate: {rate:.2f} req/s")
+    print(f"Achieved throughput: {len(ok) / elapsed:.2f} req/s")
+    if not ok.empty:
+        print(f"Latency P50/P95/P99: {ok['latency_ms'].quantile(0.50):.2f} / "
+              f"{ok['latency_ms'].quantile(0.95):.2f} / {ok['latency_ms'].quantile(0.99):.2f} ms")
+        print(f"Service time P50/P95: {ok['service_ms'].quantile(0.50):.2f} / {ok['service_ms'].quantile(0.95):.2f} ms")
+        print(f"Queueing delay mean/max: {ok['queue_ms'].mean():.2f} / {ok['queue_ms'].max():.2f} ms")
+    print("\nOVER TIME:")
+    print(timeline.to_string(index=False))
+
+    return df
+
+
+if __name__ == "__main__":
+    from src.core.db_utils import get_connection
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT query_id, nl_question FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
+            queries = cursor.fetchall()
+    pool = create_eval_pool(config.LOAD_USERS)
+    try:
+        run_load_test(pool, queries)
+    finally:
+        pool.close(force=True)
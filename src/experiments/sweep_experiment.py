@@ -0,0 +1,198 @@
+# sweep_experiment.py
+import json
+import asyncio
+import hashlib
+import itertools
+
+from src.core import config
+from src.core.db_utils import get_async_pool, return_as_string
+from src.core.select_ai_utils import create_ai_profile, init_ai_session_async
+from src.core.generate_cache import session_profile
+from src.core.run_history import begin_run_async, record_results
+from src.core.tracing import span, trace_query_async
+from src.experiments.async_experiment import evaluate_accuracy_query_async, time_latency_query_async
+
+PROFILE_EXISTS_SQL = "SELECT COUNT(*) FROM USER_CLOUD_AI_PROFILES WHERE profile_name = :profile_name"
+
+
+def profile_name_for(attributes):
+    """Stable profile name for an attribute set, so re-running a sweep reuses its profiles."""
+    digest = hashlib.sha1(json.dumps(attributes, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"SWEEP_{digest.upper()}"
+
+
+def expand_matrix(spec):
+    """
+    Expand a sweep spec into [(profile_name, attributes)].
+
+    `spec` keys (all optional):
+      base     - attributes shared by every profile (credential_name, object_list, ...)
+      vary     - {attribute: [values]}; every combination becomes one profile
+      profiles - explicit [{"name": ..., "attributes": {...}}] entries, merged over base
+    Profiles without a name are named after their attributes (profile_name_for).
+    """
+    base = spec.get("base", {})
+    profiles = []
+    vary = spec.get("vary", {})
+    if vary:
+        keys = sorted(vary)
+        for values in itertools.product(*(vary[k] for k in keys)):
+            attributes = {**base, **dict(zip(keys, values))}
+            profiles.append((profile_name_for(attributes), attributes))
+    for entry in spec.get("profiles", []):
+        attributes = {**base, **entry.get("attributes", {})}
+        profiles.append((entry.get("name") or profile_name_for(attributes), attributes))
+    return profiles
+
+
+def load_matrix(path=None):
+    """Read the sweep spec JSON (SWEEP_MATRIX) and expand it."""
+    with open(path or config.SWEEP_MATRIX, encoding="utf-8") as f:
+        return expand_matrix(json.load(f))
+
+
+def ensure_profiles(cursor, profiles):
+    """Create the sweep profiles that do not exist yet; existing ones are reused unchanged."""
+    for name, attributes in profiles:
+        cursor.execute(PROFILE_EXISTS_SQL, {"profile_name": name})
+        if cursor.fetchone()[0]:
+            print(f"Reusing profile {name}")
+            continue
+        create_ai_profile(cursor, name, json.dumps(attributes), description="Select AI evaluation sweep")
+        print(f"Created profile {name}: {json.dumps(attributes, sort_keys=True)}")
+
+
+async def _evaluate_for_profile(profile_name, cursor, row, evaluate, time_query):
+    # gather() runs every coroutine in its own task, so this only tags this profile's GENERATE cache keys
+    session_profile.set(profile_name)
+    qid, nl, gt_sql, comp = row
+    with span("sweep_query", profile=profile_name, query_id=qid):
+        acc_row = await evaluate(cursor, qid, nl, gt_sql, comp)
+        lat_row = await time_query(cursor, qid, nl, gt_sql)
+    return acc_row, lat_row
+
+
+async def run_sweep(profiles):
+    """
+    Evaluate every profile in `profiles` ([(name, attributes)], created beforehand
+    with ensure_profiles) on the same queries, concurrently.
+
+    Each profile holds one session with its profile set. Queries run in
+    lockstep rounds: all profiles evaluate query N at the same time, and the
+    next round starts when the slowest finishes, so provider load and drift
+    over the run hit every profile equally. The start order within a round is
+    rotated. Returns (accuracy_df, latency_df) with a 'profile' column.
+    """
+    import pandas as pd
+
+    names = [name for name, _ in profiles]
+    pool = get_async_pool(len(names))
+    evaluate = trace_query_async(evaluate_accuracy_query_async, "accuracy")
+    time_query = trace_query_async(time_latency_query_async, "latency")
+    acc_rows, lat_rows = [], []
+    try:
+        cursors = {}
+        for name in names:
+            conn = await pool.acquire()
+            conn.outputtypehandler = return_as_string
+            cursors[name] = conn.cursor()
+            await init_ai_session_async(cursors[name], name)
+        cursor = cursors[names[0]]
+        await cursor.execute("SELECT query_id, nl_question, ground_truth_sql, complexity FROM NL_SQL_TEST_QUERIES ORDER BY query_id")
+        rows = await cursor.fetchall()
+        await begin_run_async(cursor)
+
+        for round_no, row in enumerate(rows):
+            shift = round_no % len(names)
+            order = names[shift:] + names[:shift]
+            outcomes = await asyncio.gather(
+                *(_evaluate_for_profile(name, cursors[name], row, evaluate, time_query) for name in order),
+                return_exceptions=True,
+            )
+            for name, outcome in zip(order, outcomes):
+                if isinstance(outcome, Exception):
+                    print(f"Sweep Error {name} Q{row[0]}: {outcome}")
+                    continue
+                acc_row, lat_row = outcome
+                if acc_row is not None:
+                    acc_rows.append({'profile': name, **acc_row})
+                if lat_row is not None:
+                    lat_rows.append({'profile': name, **lat_row})
+    finally:
+        await pool.close(force=True)
+
+    return pd.DataFrame(acc_rows), pd.DataFrame(lat_rows)
+
+
+def compare_profiles(acc_df, lat_df):
+    """One row per query with each profile's match flags and latencies side by side."""
+    import pandas as pd
+
+    tables = []
+    if not acc_df.empty:
+        tables.append(acc_df.pivot_table(index='query_id', columns='profile', aggfunc='first',
+                                         values=['ai_success', 'exact_match', 'semantic_match']))
+    if not lat_df.empty:
+        tables.append(lat_df.pivot_table(index='query_id', columns='profile', aggfunc='first',
+                                         values=['llm_latency_ms', 'ai_exe_ms', 'total_ai_latency_ms']))
+    if not tables:
+        return pd.DataFrame()
+    table = tables[0].join(tables[1:], how='outer') if len(tables) > 1 else tables[0]
+    table.columns = [f"{profile}:{metric}" for metric, profile in table.columns]
+    return table[sorted(table.columns)].reset_index()
+
+
+def summarize_profiles(acc_df, lat_df):
+    """Per profile: match rates, timeouts and latency percentiles."""
+    import pandas as pd
+
+    if acc_df.empty:
+        return pd.DataFrame()
+    summary = acc_df.groupby('profile').agg(
+        queries=('query_id', 'count'),
+        success_rate=('ai_success', 'mean'),
+        exact_rate=('exact_match', 'mean'),
+        semantic_rate=('semantic_match', 'mean'),
+        ai_timeouts=('ai_outcome', lambda s: (s == 'timeout').sum()),
+    )
+    if not lat_df.empty:
+        latency = lat_df.groupby('profile').agg(
+            llm_p50_ms=('llm_latency_ms', 'median'),
+            llm_p95_ms=('llm_latency_ms', lambda s: s.quantile(0.95)),
+            total_p50_ms=('total_ai_latency_ms', 'median'),
+            total_p95_ms=('total_ai_latency_ms', lambda s: s.quantile(0.95)),
+        )
+        summary = summary.join(latency, how='outer')
+    return summary.round(3)
+
+
+def save_sweep_results(acc_df, lat_df, profiles):
+    """Write sweep_comparison.csv and sweep_summary.csv, record each profile in the run history and print the summary."""
+    comparison = compare_profiles(acc_df, lat_df)
+    comparison.to_csv('sweep_comparison.csv', index=False)
+    summary = summarize_profiles(acc_df, lat_df)
+    summary.to_csv('sweep_summary.csv')
+    print("\nResults saved to sweep_comparison.csv, sweep_summary.csv")
+    for name, _ in profiles:
+        if not acc_df.empty and (acc_df['profile'] == name).any():
+            record_results("accuracy", acc_df[acc_df['profile'] == name].drop(columns='profile'), name)
+        if not lat_df.empty and (lat_df['profile'] == name).any():
+            record_results("latency", lat_df[lat_df['profile'] == name].drop(columns='profile'), name)
+
+    print("\n" + "-"*60)
+    print("PROFILE COMPARISON")
+    print("-"*60)
+    for name, attributes in profiles:
+        print(f"  {name}: {json.dumps(attributes, sort_keys=True)}")
+    print(summary.to_string())
+    return comparison, summary
+
+
+if __name__ == "__main__":
+    from src.core.db_utils import get_connection
+    profiles = load_matrix()
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            ensure_profiles(cursor, profiles)
+    acc_df, lat_df = asyncio.run(run_sweep(profiles))
+    save_sweep_results(acc_df, lat_df, profiles)
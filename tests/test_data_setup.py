@@ -0,0 +1,30 @@
+# test_data_setup.py
+import pytest
+
+import data_setup
+
+
+def test_plan_units_skips_committed_units():
+    loaded = {"SUPPLIER": [(1, 11, 0.001, 10)]}
+    units = [u for u in data_setup.plan_units(loaded, scale=0.001, unit_rows=10) if u[0] == "SUPPLIER"]
+    assert units == []
+    units = [u for u in data_setup.plan_units(loaded, scale=0.002, unit_rows=10) if u[0] == "SUPPLIER"]
+    assert units == [("SUPPLIER", 11, 21)]
+
+
+def test_resume_with_same_unit_size_and_scale():
+    data_setup.check_resumable({"ORDERS": [(1, 11, 0.001, 10)]}, scale=0.001, unit_rows=10)
+
+
+def test_parent_table_scale_top_up():
+    data_setup.check_resumable({"CUSTOMER": [(1, 11, 0.001, 10)]}, scale=0.01, unit_rows=10)
+
+
+@pytest.mark.parametrize("loaded, scale, unit_rows", [
+    ({"CUSTOMER": [(1, 11, 0.001, 10)]}, 0.001, 20),  # unit size changed
+    ({"CUSTOMER": [(1, 11, 0.001, None)]}, 0.001, 10),  # unit size not recorded
+    ({"ORDERS": [(1, 11, 0.001, 10)]}, 0.01, 10),  # child table top-up
+])
+def test_refused(loaded, scale, unit_rows):
+    with pytest.raises(ValueError):
+        data_setup.check_resumable(loaded, scale=scale, unit_rows=unit_rows)
@@ -0,0 +1,28 @@
+# test_rate_limit.py
+import pytest
+
+from src.core.rate_limit import GenerateCall, GenerateScheduler, _throttled
+
+THROTTLE = Exception("ORA-20429: Too many requests")
+
+
+def test_retry_counts_failed_attempt():
+    call = GenerateCall()
+    _throttled(GenerateScheduler(max_retries=2, backoff_base=0, backoff_max=0), call, THROTTLE, 0, 0.5)
+    assert call.failed_ms == 500
+    assert call.retries == 1 and not call.throttled
+
+
+def test_last_attempt_counts_when_retries_run_out():
+    call = GenerateCall()
+    with pytest.raises(Exception):
+        _throttled(GenerateScheduler(max_retries=1), call, THROTTLE, 1, 0.25)
+    assert call.failed_ms == 250
+    assert call.throttled
+
+
+def test_other_errors_are_not_throttle_cost():
+    call = GenerateCall()
+    with pytest.raises(Exception):
+        _throttled(GenerateScheduler(max_retries=3), call, Exception("ORA-00942: table or view does not exist"), 0, 0.25)
+    assert call.failed_ms == 0 and not call.throttled
@@ -0,0 +1,48 @@
+# test_run_history.py
+import pytest
+
+pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+
+from src.core import config, run_history
+from src.experiments.sweep_experiment import save_sweep_results
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """A fresh run history under a temporary RUN_HISTORY_DIR, with a new current run."""
+    monkeypatch.setattr(config, "RUN_HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(run_history, "_history", None)
+    monkeypatch.setattr(run_history, "_run", None)
+    monkeypatch.chdir(tmp_path)
+    return run_history.get_run_history()
+
+
+def _rows(profile, qids=(1, 2)):
+    return [{'profile': profile, 'query_id': q, 'ai_success': True, 'exact_match': q == 1,
+             'semantic_match': True, 'ai_outcome': 'ok', 'llm_latency_ms': 10.0 * q, 'ai_exe_ms': 1.0,
+             'total_ai_latency_ms': 11.0 * q} for q in qids]
+
+
+def test_appends_never_overwrite(history):
+    run = run_history.current_run()
+    df = pd.DataFrame(_rows("P"))
+    for _ in range(3):
+        history.append("accuracy", df.drop(columns='profile'), profile="P")
+    assert len(history.run_files("accuracy", run.run_id)) == 3
+    assert len(history.runs("accuracy")) == 3
+
+
+def test_sweep_keeps_every_profile(history):
+    profiles = [("PROFILE_A", {}), ("PROFILE_B", {})]
+    acc_df = pd.DataFrame(_rows("PROFILE_A") + _rows("PROFILE_B"))
+    lat_df = acc_df[['profile', 'query_id', 'llm_latency_ms', 'ai_exe_ms', 'total_ai_latency_ms']]
+    save_sweep_results(acc_df, lat_df, profiles)
+
+    run_id = run_history.current_run().run_id
+    for kind in ("accuracy", "latency"):
+        assert len(history.run_files(kind, run_id)) == 2
+        summaries = history.runs(kind)
+        assert sorted(summaries.loc[summaries['run_id'] == run_id, 'profile']) == ["PROFILE_A", "PROFILE_B"]
+        for name, _ in profiles:
+            assert len(history.latest(kind, name)) == 2
@@ -0,0 +1,76 @@
+# test_sql_canon.py
+import pytest
+
+pytest.importorskip("sqlglot")
+
+from src.core.sql_canon import canonicalize, has_row_limit, statically_equivalent
+
+ANTI_JOIN = ("SELECT c.c_name FROM customer c LEFT JOIN orders o ON c.c_custkey {op} o.o_custkey "
+             "WHERE o.{column} IS NULL")
+NOT_EXISTS = "SELECT c.c_name FROM customer c WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE c.c_custkey {op} o.o_custkey)"
+
+
+@pytest.mark.parametrize("a, b", [
+    # case, whitespace, aliases and output column names
+    ("select C.c_name n from CUSTOMER C where c.c_acctbal > 0", "SELECT c_name FROM customer WHERE 0 < c_acctbal"),
+    ("SELECT o.o_orderkey, l.l_linenumber FROM orders o JOIN lineitem l ON o.o_orderkey = l.l_orderkey",
+     "SELECT orders.o_orderkey, lineitem.l_linenumber FROM orders, lineitem WHERE lineitem.l_orderkey = orders.o_orderkey"),
+    # predicate order
+    ("SELECT a FROM t WHERE x = 1 AND y = 2 AND z = 3", "SELECT a FROM t WHERE z = 3 AND (y = 2 AND x = 1)"),
+    ("SELECT a FROM t WHERE x = 1 OR (y = 2 AND z = 3)", "SELECT a FROM t WHERE (z = 3 AND y = 2) OR x = 1"),
+    ("SELECT a FROM t WHERE (x = 1 OR y = 2) AND z = 3", "SELECT a FROM t WHERE z = 3 AND (y = 2 OR x = 1)"),
+    ("SELECT a FROM t WHERE b IN (3, 1, 2)", "SELECT a FROM t WHERE b IN (1, 2, 3)"),
+    # row order only matters with a row limit
+    ("SELECT a FROM t ORDER BY a", "SELECT a FROM t"),
+    # ROWNUM top-N vs FETCH FIRST
+    ("SELECT * FROM (SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC) WHERE ROWNUM <= 10",
+     "SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC FETCH FIRST 10 ROWS ONLY"),
+    ("SELECT * FROM (SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC) WHERE ROWNUM < 11",
+     "SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC FETCH FIRST 10 ROWS ONLY"),
+    # anti-join vs NOT EXISTS on a join key
+    (ANTI_JOIN.format(op="=", column="o_custkey"), NOT_EXISTS.format(op="=")),
+])
+def test_equivalent(a, b):
+    assert statically_equivalent(a, b)
+
+
+@pytest.mark.parametrize("a, b", [
+    # AND binds tighter than OR
+    ("SELECT a FROM t WHERE x = 1 OR (y = 2 AND z = 3)", "SELECT a FROM t WHERE (x = 1 OR y = 2) AND z = 3"),
+    ("SELECT a FROM t WHERE x = 1 OR y = 2 AND z = 3", "SELECT a FROM t WHERE (x = 1 OR y = 2) AND z = 3"),
+    # same column name in different tables
+    ("SELECT l.x FROM lineitem l, usr u", "SELECT u.x FROM lineitem l, usr u"),
+    # `*` takes its columns (and their order) from the FROM clause
+    ("SELECT * FROM orders JOIN lineitem ON o_orderkey = l_orderkey",
+     "SELECT * FROM lineitem JOIN orders ON o_orderkey = l_orderkey"),
+    ("SELECT o.* FROM orders o JOIN lineitem l ON o.o_orderkey = l.l_orderkey",
+     "SELECT o.* FROM lineitem l JOIN orders o ON o.o_orderkey = l.l_orderkey"),
+    ("SELECT * FROM customer c LEFT JOIN orders o ON c.c_custkey = o.o_custkey WHERE o.o_custkey IS NULL",
+     "SELECT * FROM customer c WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE c.c_custkey = o.o_custkey)"),
+    # anti-join on a non-equality or on a non-key column
+    (ANTI_JOIN.format(op=">", column="o_custkey"), NOT_EXISTS.format(op=">")),
+    (ANTI_JOIN.format(op="=", column="o_comment"), NOT_EXISTS.format(op="=")),
+    # different limits or row order under a limit
+    ("SELECT * FROM (SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC) WHERE ROWNUM < 10",
+     "SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC FETCH FIRST 10 ROWS ONLY"),
+    ("SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC FETCH FIRST 10 ROWS ONLY",
+     "SELECT o_orderkey FROM orders ORDER BY o_totalprice FETCH FIRST 10 ROWS ONLY"),
+])
+def test_not_equivalent(a, b):
+    assert not statically_equivalent(a, b)
+
+
+def test_mixed_and_or_keeps_parentheses():
+    assert canonicalize("SELECT a FROM t WHERE (x = 1 OR y = 2) AND z = 3") == \
+        "SELECT A FROM T WHERE (1 = X OR 2 = Y) AND 3 = Z"
+
+
+def test_non_strings_are_not_equivalent():
+    assert not statically_equivalent(None, "SELECT 1 FROM dual")
+
+
+def test_has_row_limit():
+    assert has_row_limit("SELECT a FROM t FETCH FIRST 1 ROWS ONLY")
+    assert has_row_limit("SELECT * FROM (SELECT a FROM t) WHERE ROWNUM <= 5")
+    assert not has_row_limit("SELECT 'ROWNUM' FROM t")
+    assert not has_row_limit(None)
@@ -1,6 +1,3 @@
-import sys
-sys.path.insert(0, '/Users/sanjaymishra/oracle26ai-eval')
-
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns